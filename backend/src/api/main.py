@@ -1,13 +1,34 @@
 """FastAPI application main file."""
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi import FastAPI, File, UploadFile, Form, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
 import logging
 
 from src.config.settings import settings
+from src.api.middleware import UploadSizeLimitMiddleware
 from src.services.transcription import TranscriptionService
-from src.services.analysis import AnalysisService
+from src.services.analysis import ANALYSIS_MODES, AnalysisService
+from src.services.analysis_jobs import get_analysis_job_store
+from src.services.alert_rules import get_alert_rules_engine
+from src.services.analysis_store import DEFAULT_PAGE_SIZE, AnalysisStore, get_analysis_store
+from src.services.analytics_segments import get_analytics_segments, run_compaction_loop
+from src.services.live_transcription import LiveTranscriptionSession
+from src.services.news_correlation import NewsCorrelationService
+from src.services.correlation import CorrelationEngine
+from src.services.correlation_jobs import CORRELATION_PRIORITY_BATCH, get_correlation_scheduler
+from src.services.circuit_breaker import circuit_breaker_states
+from src.services.claim_cache import get_claim_verification_cache
+from src.services.hedging import get_request_hedger
+from src.services.lexical_prefilter import get_lexical_prefilter_stats
+from src.services.model_routing import stage_stats
+from src.services.openai_scheduler import get_openai_scheduler
+from src.services.request_context import Deadline, DeadlineExceeded, resolve_deadline_seconds, start_deadline
+from src.services.semantic_cache import get_semantic_cache
+from src.services.signal_timeseries import get_signal_timeseries
+from src.services.tiered_detection import get_tiered_detection_stats
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -32,6 +53,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversized audio uploads before (Content-Length) and while the body is read
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    paths=["/api/transcribe"],
+    max_bytes=settings.max_audio_size_mb * 1024 * 1024
+)
+
 # Initialize services
 try:
     transcription_service = TranscriptionService()
@@ -42,6 +70,23 @@ except (ValueError, TypeError, Exception) as e:
     analysis_service = None
 
 
+@app.on_event("startup")
+async def start_analytics_compaction():
+    """Compact stored analyses into analytics segments every ANALYTICS_COMPACTION_SECONDS."""
+    if get_analysis_store() is not None and settings.analytics_compaction_seconds > 0:
+        app.state.analytics_compaction = asyncio.create_task(
+            run_compaction_loop(get_analytics_segments(), settings.analytics_compaction_seconds)
+        )
+
+
+@app.on_event("shutdown")
+async def stop_analytics_compaction():
+    """Stop periodic analytics compaction."""
+    task = getattr(app.state, "analytics_compaction", None)
+    if task:
+        task.cancel()
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -60,7 +105,89 @@ async def health_check():
         "services": {
             "transcription": transcription_service is not None,
             "analysis": analysis_service is not None
-        }
+        },
+        "circuitBreakers": circuit_breaker_states()
+    }
+
+
+@app.get("/api/metrics")
+async def metrics():
+    """OpenAI scheduler, hedging, per-stage model, detection tier, correlation, in-flight analysis, store, analytics, semantic cache, claim cache and prefilter counters."""
+    store = get_analysis_store()
+    return {
+        "openai": get_openai_scheduler().stats(),
+        "hedging": get_request_hedger().stats(),
+        "modelStages": stage_stats(),
+        "airlineDetectionTiers": get_tiered_detection_stats().stats(),
+        "analysisJobs": get_analysis_job_store().stats(),
+        "newsCorrelation": get_correlation_scheduler().stats(),
+        "analysisSingleflight": analysis_service.in_flight.stats() if analysis_service else None,
+        "analysisStore": store.stats() if store else None,
+        "alertRules": get_alert_rules_engine().stats(),
+        "signalTimeSeries": get_signal_timeseries().stats(),
+        "analyticsSegments": get_analytics_segments().stats() if store else None,
+        "semanticCache": get_semantic_cache().stats() if settings.semantic_cache_enabled else None,
+        "claimCache": get_claim_verification_cache().stats() if settings.claim_cache_enabled else None,
+        "lexicalPrefilter": get_lexical_prefilter_stats().stats()
+    }
+
+
+def _start_request_deadline(requested_seconds: Optional[float]) -> Optional[Deadline]:
+    """Start the request's time budget (client value capped, or the configured default)."""
+    return start_deadline(resolve_deadline_seconds(requested_seconds))
+
+
+def _check_analysis_mode(mode: str) -> str:
+    """Validate an analysis mode parameter (see ANALYSIS_MODES)."""
+    if mode not in ANALYSIS_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown analysis mode '{mode}'. Supported modes: {', '.join(ANALYSIS_MODES)}"
+        )
+    return mode
+
+
+async def _record_analysis(transcription_text: str, analysis: Dict[str, Any], analysis_id: Optional[str] = None) -> None:
+    """Persist an analysis for /api/insights and /api/alerts (a storage failure never fails the request)."""
+    store = get_analysis_store()
+    if store is None:
+        return
+    try:
+        await store.save(transcription_text, analysis, analysis_id)
+    except Exception as e:
+        logger.error(f"Failed to store analysis: {str(e)}", exc_info=True)
+
+
+def _require_analysis_store() -> AnalysisStore:
+    """Get the analysis store, or fail with 503 when it is disabled."""
+    store = get_analysis_store()
+    if store is None:
+        raise HTTPException(status_code=503, detail="Analysis store is disabled (ANALYSIS_STORE_ENABLED=false)")
+    return store
+
+
+def _build_transcription_response(transcription_text: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the combined transcription + analysis response body."""
+    # Determine primary airline for response
+    primary_airline = analysis.get("primaryAirline")
+    if not primary_airline and analysis.get("airlineSpecifications"):
+        # Get primary from specifications (marked with isPrimary)
+        primary_spec = next(
+            (spec for spec in analysis.get("airlineSpecifications", []) if spec.get("isPrimary")),
+            analysis.get("airlineSpecifications", [{}])[0]
+        )
+        primary_airline = primary_spec.get("airline", settings.default_unknown_airline)
+    elif not primary_airline:
+        primary_airline = settings.default_unknown_airline
+    
+    return {
+        "transcription": transcription_text,
+        "airline": primary_airline,
+        "allAirlines": analysis.get("allAirlines", []),
+        "theme": analysis.get("themes", ["General"])[0] if analysis.get("themes") else "General",
+        "sentiment": analysis.get("sentiment", {}).get("overall", "Neutral"),
+        "score": analysis.get("sentiment", {}).get("score", 0.5),
+        "analysis": analysis
     }
 
 
@@ -68,15 +195,33 @@ async def health_check():
 async def transcribe_audio(
     audio: UploadFile = File(...),
     airline_filter: Optional[str] = Form(None),
-    theme_filter: Optional[str] = Form(None)
+    theme_filter: Optional[str] = Form(None),
+    mode: str = Form("full"),
+    two_phase: Optional[bool] = Form(None),
+    deadline_seconds: Optional[float] = Form(None),
+    x_deadline_seconds: Optional[float] = Header(None)
 ):
     """
     Transcribe audio file and return transcription with AI analysis.
     
+    In two-phase mode the response is sent once transcription and local
+    detection finish: "analysis" is the provisional fast result, and the
+    LLM analysis continues in the background under "analysisId" (fetch it
+    from GET /api/analyses/{id} or stream it from its /events endpoint).
+    
     Args:
         audio: Audio file to transcribe
         airline_filter: Optional airline name to filter analysis
         theme_filter: Optional theme to filter analysis
+        mode: Analysis mode: "full" (LLM pipeline), "fast" (in-process only)
+            or "auto" (fast, promoted to full when notable)
+        two_phase: Return a provisional result right after transcription
+            (defaults to TRANSCRIBE_TWO_PHASE; ignored in fast mode)
+        deadline_seconds: Optional time budget for the request, transcription
+            included (without one, REQUEST_DEADLINE_SECONDS covers only the
+            analysis, so long recordings are not cut off)
+        x_deadline_seconds: Time budget from the X-Deadline-Seconds header
+            (used when deadline_seconds is not given)
         
     Returns:
         Transcription and analysis results
@@ -87,14 +232,19 @@ async def transcribe_audio(
             detail="Transcription or analysis service not available. Please check API key configuration."
         )
     
+    _check_analysis_mode(mode)
+    requested_deadline = deadline_seconds if deadline_seconds is not None else x_deadline_seconds
+    client_deadline = requested_deadline is not None and requested_deadline > 0
+    deadline = _start_request_deadline(requested_deadline) if client_deadline else None
+    
     try:
         # Validate file
         if not audio.filename:
             raise HTTPException(status_code=400, detail="No file provided")
         
-        # Check file size
-        audio_bytes = await audio.read()
-        file_size_mb = len(audio_bytes) / (1024 * 1024)
+        # Check file size (the upload is already spooled to disk; the
+        # middleware rejected anything far over the limit while streaming)
+        file_size_mb = (audio.size or 0) / (1024 * 1024)
         
         if file_size_mb > settings.max_audio_size_mb:
             raise HTTPException(
@@ -110,48 +260,81 @@ async def transcribe_audio(
                 detail=f"Unsupported audio format. Supported formats: {', '.join(settings.supported_audio_formats)}"
             )
         
+        # Only WAV recordings can be split locally to fit Whisper's upload limit
+        can_split = file_ext == "wav" and settings.transcription_chunking_enabled
+        if file_size_mb > settings.whisper_max_upload_mb and not can_split:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{file_ext.upper()} files larger than {settings.whisper_max_upload_mb}MB cannot be transcribed. Upload a WAV recording to have it split automatically."
+            )
+        
         logger.info(f"Processing audio file: {audio.filename}, size: {file_size_mb:.2f}MB")
         
-        # Transcribe audio
-        transcription_text = await transcription_service.transcribe_audio(
-            audio_bytes,
+        # Transcribe audio (re-uploads are served from the transcript cache)
+        transcription_result = await transcription_service.transcribe_file(
+            audio.file,
             audio.filename
         )
+        transcription_text = transcription_result["text"]
         
         logger.info(f"Transcription completed: {len(transcription_text)} characters")
+        if transcription_result["preprocessing"]:
+            stats = transcription_result["preprocessing"]
+            logger.info(f"Preprocessing saved {stats['bytesSaved']} bytes and {stats['secondsSaved']}s of audio")
         
-        # Analyze transcription
-        analysis = await analysis_service.analyze_transcription(
-            transcription_text,
-            airline_filter=airline_filter,
-            theme_filter=theme_filter
-        )
+        if not client_deadline:
+            deadline = _start_request_deadline(None)
         
-        # Determine primary airline for response
-        primary_airline = analysis.get("primaryAirline")
-        if not primary_airline and analysis.get("airlineSpecifications"):
-            # Get primary from specifications (marked with isPrimary)
-            primary_spec = next(
-                (spec for spec in analysis.get("airlineSpecifications", []) if spec.get("isPrimary")),
-                analysis.get("airlineSpecifications", [{}])[0]
+        background = {}
+        if mode != "fast" and (two_phase if two_phase is not None else settings.transcribe_two_phase):
+            # Respond with the local result now; the LLM analysis finishes in the background
+            analysis = analysis_service.analyze_fast(
+                transcription_text,
+                airline_filter=airline_filter,
+                theme_filter=theme_filter
             )
-            primary_airline = primary_spec.get("airline", settings.default_unknown_airline)
-        elif not primary_airline:
-            primary_airline = settings.default_unknown_airline
+            async def analyze_and_record(job_id: str) -> Dict[str, Any]:
+                full_analysis = await analysis_service.analyze_transcription(
+                    transcription_text,
+                    airline_filter=airline_filter,
+                    theme_filter=theme_filter,
+                    mode=mode,
+                    analysis_id=job_id
+                )
+                await _record_analysis(transcription_text, full_analysis, job_id)
+                return full_analysis
+            
+            job = get_analysis_job_store().start(transcription_text, analysis, analyze_and_record)
+            background = {"analysisId": job.id, "analysisStatus": job.status}
+        else:
+            # Analyze transcription
+            analysis = await analysis_service.analyze_transcription(
+                transcription_text,
+                airline_filter=airline_filter,
+                theme_filter=theme_filter,
+                mode=mode
+            )
+            await _record_analysis(transcription_text, analysis)
         
         # Return combined result
         return JSONResponse({
-            "transcription": transcription_text,
-            "airline": primary_airline,
-            "allAirlines": analysis.get("allAirlines", []),
-            "theme": analysis.get("themes", ["General"])[0] if analysis.get("themes") else "General",
-            "sentiment": analysis.get("sentiment", {}).get("overall", "Neutral"),
-            "score": analysis.get("sentiment", {}).get("score", 0.5),
-            "analysis": analysis
+            **_build_transcription_response(transcription_text, analysis),
+            **background,
+            "transcriptionCache": {
+                "hit": transcription_result["cacheHit"],
+                "match": transcription_result["cacheMatch"]
+            },
+            "transcriptionSegments": transcription_result["segments"],
+            "audioPreprocessing": transcription_result["preprocessing"],
+            "deadline": deadline.summary() if deadline else None
         })
         
     except HTTPException:
         raise
+    except DeadlineExceeded as e:
+        # Transcription is required, so running out of a client's budget there fails the request
+        logger.warning(f"Request deadline exceeded: {str(e)}")
+        raise HTTPException(status_code=504, detail=f"Request deadline exceeded: {str(e)}")
     except Exception as e:
         logger.error(f"Error processing audio: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -160,11 +343,401 @@ async def transcribe_audio(
         )
 
 
+@app.get("/api/analyses/{analysis_id}")
+async def get_analysis(analysis_id: str):
+    """
+    Get a background analysis started by a two-phase /api/transcribe.
+    
+    Args:
+        analysis_id: The "analysisId" from the transcription response
+        
+    Returns:
+        {"id", "status": "pending|running|complete|failed", "transcription",
+        "provisional", "analysis", "error", "createdAt", "updatedAt"}
+    """
+    job = get_analysis_job_store().get(analysis_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Analysis not found or expired")
+    return JSONResponse(job.to_dict())
+
+
+@app.get("/api/analyses/{analysis_id}/events")
+async def stream_analysis_events(analysis_id: str):
+    """
+    Stream a background analysis as server-sent events.
+    
+    Sends the current state at once, then one event per status change
+    until the analysis is complete or failed. Each event's data is the
+    same JSON as GET /api/analyses/{id}.
+    
+    Args:
+        analysis_id: The "analysisId" from the transcription response
+        
+    Returns:
+        text/event-stream response
+    """
+    store = get_analysis_job_store()
+    job = store.get(analysis_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Analysis not found or expired")
+    
+    async def events():
+        async for state in store.watch(job, settings.analysis_events_timeout_seconds):
+            yield f"event: {state['status']}\ndata: {json.dumps(state)}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/api/analyses/{analysis_id}/correlation")
+async def get_analysis_correlation(analysis_id: str):
+    """
+    Get the news correlation of an analysis run with CORRELATION_BACKGROUND.
+    
+    Args:
+        analysis_id: The "analysisId" from the analysis (or the two-phase
+            transcription response)
+        
+    Returns:
+        {"analysisId", "status": "queued|running|complete|failed",
+        "correlation", "error", "createdAt"}
+    """
+    scheduler = get_correlation_scheduler()
+    run = scheduler.get(analysis_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Correlation not found or expired")
+    return JSONResponse(run.to_dict())
+
+
+@app.get("/api/insights")
+async def list_insights(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    airline: Optional[str] = None,
+    theme: Optional[str] = None,
+    sentiment: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+):
+    """
+    List stored analyses, newest first, one page at a time.
+    
+    Args:
+        limit: Page size (at most 500)
+        cursor: "nextCursor" from the previous page
+        airline: Optional primary airline
+        theme: Optional theme
+        sentiment: Optional overall sentiment ("Positive", "Neutral", "Negative")
+        since: Optional ISO 8601 time, inclusive
+        until: Optional ISO 8601 time, exclusive
+        
+    Returns:
+        {"items": [{"id", "createdAt", "airline", "themes", "sentiment",
+        "score", "summary"}], "nextCursor"}
+    """
+    store = _require_analysis_store()
+    try:
+        return JSONResponse(store.list_analyses(limit, cursor, airline, theme, sentiment, since, until))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/insights/{analysis_id}")
+async def get_insight(analysis_id: str):
+    """
+    Get a stored analysis with its transcription.
+    
+    Args:
+        analysis_id: The "id" from GET /api/insights
+        
+    Returns:
+        {"id", "createdAt", "transcription", "analysis"}
+    """
+    insight = _require_analysis_store().get_analysis(analysis_id)
+    if insight is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return JSONResponse(insight)
+
+
+@app.get("/api/alerts")
+async def list_alerts(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    airline: Optional[str] = None,
+    severity: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+):
+    """
+    List alerts raised by stored analyses, newest first, one page at a time.
+    
+    Args:
+        limit: Page size (at most 500)
+        cursor: "nextCursor" from the previous page
+        airline: Optional airline
+        severity: Optional severity ("Critical", "High", "Medium", "Low")
+        since: Optional ISO 8601 time, inclusive
+        until: Optional ISO 8601 time, exclusive
+        
+    Returns:
+        {"items": [{"id", "analysisId", "title", "message", "severity",
+        "airline", "category", "categories", "timestamp"}], "nextCursor"}
+    """
+    store = _require_analysis_store()
+    try:
+        return JSONResponse(store.list_alerts(limit, cursor, airline, severity, since, until))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/alerts/events")
+async def stream_alerts():
+    """
+    Stream new alerts as server-sent events.
+    
+    Each alert is sent once, as it is stored, with the same JSON as the
+    items of GET /api/alerts. A keep-alive comment is sent while idle.
+    
+    Returns:
+        text/event-stream response
+    """
+    _require_analysis_store()
+    
+    async def events():
+        async for alert in get_alert_rules_engine().watch():
+            if alert is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: alert\ndata: {json.dumps(alert)}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/api/heatmap")
+async def get_heatmap(
+    since: Optional[str] = Query(None, alias="from"),
+    until: Optional[str] = Query(None, alias="to")
+):
+    """
+    Get airline x theme counts and mean sentiment from stored analyses.
+    
+    Args:
+        since: Optional ISO 8601 start ("from" parameter), rounded down to
+            a HEATMAP_BUCKET_SECONDS bucket
+        until: Optional ISO 8601 end ("to" parameter), exclusive
+        
+    Returns:
+        {"from", "to", "bucketSeconds", "airlines", "themes", "cells":
+        [{"airline", "theme", "count", "meanSentiment"}]}
+    """
+    store = _require_analysis_store()
+    try:
+        return JSONResponse(store.heatmap(since, until))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/timeseries")
+async def get_timeseries(airline: Optional[str] = None, metric: Optional[str] = None):
+    """
+    Get 7- and 30-day aggregates of per-airline signal time series.
+    
+    Every window is answered from running totals in constant time, so this
+    is cheap enough to poll.
+    
+    Args:
+        airline: Optional airline
+        metric: Optional metric ("sentiment", "signal:<name>",
+            "prediction:<event>"), or "signal:" / "prediction:" for all of a kind
+        
+    Returns:
+        {"bucketSeconds", "series": [{"airline", "metric", "windows":
+        {"7d": {"count", "mean", "slopePerDay"}, "30d": {...}}}]}
+    """
+    _require_analysis_store()
+    timeseries = get_signal_timeseries()
+    return JSONResponse({
+        "bucketSeconds": timeseries.bucket_seconds,
+        "series": timeseries.query(airline, metric)
+    })
+
+
+@app.get("/api/analytics")
+async def get_analytics(
+    group_by: str = "airline",
+    interval: str = "month",
+    since: Optional[str] = Query(None, alias="from"),
+    until: Optional[str] = Query(None, alias="to"),
+    airline: Optional[str] = None,
+    theme: Optional[str] = None
+):
+    """
+    Group all historical analyses for reviews, from the compacted analytics segments.
+    
+    Analyses stored since the last compaction are not included yet; see
+    compactedThrough, or POST /api/analytics/compact first.
+    
+    Args:
+        group_by: "airline", "theme" or "time"
+        interval: Bucket for group_by=time: "day", "week", "month" or
+            "quarter" (UTC)
+        since: Optional ISO 8601 start ("from" parameter), inclusive
+        until: Optional ISO 8601 end ("to" parameter), exclusive
+        airline: Optional primary airline filter
+        theme: Optional theme filter
+        
+    Returns:
+        {"groupBy", "interval", "rows", "groups": [{"key", "count",
+        "meanSentiment", "negativeShare"}], "compactedThrough"}
+    """
+    _require_analysis_store()
+    segments = get_analytics_segments()
+    try:
+        return JSONResponse(await asyncio.to_thread(segments.query, group_by, since, until, airline, theme, interval))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/api/analytics/compact")
+async def compact_analytics():
+    """
+    Compact analyses stored since the last compaction into analytics segments now.
+    
+    Returns:
+        {"compacted": analyses added, "segments": {...} as in /api/metrics}
+    """
+    _require_analysis_store()
+    segments = get_analytics_segments()
+    compacted = await asyncio.to_thread(segments.compact)
+    return {"compacted": compacted, "segments": segments.stats()}
+
+
+@app.websocket("/ws/transcribe")
+async def live_transcribe(
+    websocket: WebSocket,
+    sample_rate: int = 16000,
+    language: Optional[str] = None,
+    airline_filter: Optional[str] = None,
+    theme_filter: Optional[str] = None,
+    deadline_seconds: Optional[float] = None
+):
+    """
+    Transcribe audio while it is being recorded.
+    
+    The client streams little-endian 16-bit mono PCM at sample_rate as
+    binary messages and sends {"type": "stop"} when recording ends. Each
+    rolling window is transcribed as it fills and answered with a
+    {"type": "partial"} message carrying the new text and the airlines and
+    themes detected so far. After stop, the full analysis is sent as
+    {"type": "final"} with the same body as /api/transcribe.
+    
+    Args:
+        websocket: WebSocket connection
+        sample_rate: Sample rate of the PCM stream
+        language: Optional language code (e.g., 'en', 'hi')
+        airline_filter: Optional airline name to filter analysis
+        theme_filter: Optional theme to filter analysis
+        deadline_seconds: Optional time budget for the final analysis,
+            counted from the stop message
+    """
+    await websocket.accept()
+    if not transcription_service or not analysis_service:
+        await websocket.send_json({
+            "type": "error",
+            "detail": "Transcription or analysis service not available. Please check API key configuration."
+        })
+        await websocket.close(code=1011)
+        return
+    
+    session = LiveTranscriptionSession(transcription_service, sample_rate=sample_rate, language=language)
+    # Bounded, so a client streaming faster than Whisper keeps up is held back instead of buffered
+    windows: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.live_max_pending_windows))
+    
+    async def transcribe_windows():
+        # Windows are transcribed in order so overlap removal sees the previous text
+        while True:
+            window = await windows.get()
+            if window is None:
+                return
+            try:
+                update = await session.transcribe_window(window)
+            except Exception as e:
+                # One failed window loses its text, not the session
+                logger.warning(f"Live transcription window failed: {str(e)}")
+                update = {"type": "error", "detail": f"Failed to transcribe audio window: {str(e)}"}
+            if update:
+                await websocket.send_json(update)
+    
+    worker = asyncio.create_task(transcribe_windows())
+    
+    async def enqueue(window):
+        # Wait for queue space, but stop waiting if the worker has died (e.g. the socket broke)
+        put = asyncio.ensure_future(windows.put(window))
+        await asyncio.wait({put, worker}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            worker.result()
+            raise RuntimeError("Live transcription worker stopped")
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                worker.cancel()
+                return
+            if worker.done():
+                worker.result()
+                raise RuntimeError("Live transcription worker stopped")
+            if message.get("bytes"):
+                for window in session.add_audio(message["bytes"]):
+                    await enqueue(window)
+            elif message.get("text"):
+                try:
+                    command = json.loads(message["text"])
+                except json.JSONDecodeError:
+                    command = {}
+                if command.get("type") == "stop":
+                    break
+        
+        final_window = session.flush()
+        if final_window is not None:
+            await enqueue(final_window)
+        await enqueue(None)
+        await worker
+        
+        logger.info(f"Live transcription completed: {session.windows_transcribed} windows, {len(session.transcript)} characters")
+        
+        _start_request_deadline(deadline_seconds)
+        # Keyword detection already ran incrementally; pass it on instead of rescanning
+        analysis = await analysis_service.analyze_transcription(
+            session.transcript,
+            airline_filter=airline_filter,
+            theme_filter=theme_filter,
+            local_detection=session.detections()
+        )
+        await _record_analysis(session.transcript, analysis)
+        await websocket.send_json({
+            "type": "final",
+            **_build_transcription_response(session.transcript, analysis)
+        })
+        await websocket.close()
+        
+    except WebSocketDisconnect:
+        worker.cancel()
+    except Exception as e:
+        worker.cancel()
+        logger.error(f"Live transcription failed: {str(e)}", exc_info=True)
+        await websocket.send_json({"type": "error", "detail": f"Failed to process audio: {str(e)}"})
+        await websocket.close(code=1011)
+
+
 @app.post("/api/analyze")
 async def analyze_text(
     text: str = Form(...),
     airline_filter: Optional[str] = Form(None),
-    theme_filter: Optional[str] = Form(None)
+    theme_filter: Optional[str] = Form(None),
+    mode: str = Form("full"),
+    deadline_seconds: Optional[float] = Form(None),
+    x_deadline_seconds: Optional[float] = Header(None)
 ):
     """
     Analyze text directly without transcription.
@@ -173,6 +746,11 @@ async def analyze_text(
         text: Text to analyze
         airline_filter: Optional airline name to filter analysis
         theme_filter: Optional theme to filter analysis
+        mode: Analysis mode: "full" (LLM pipeline), "fast" (in-process only)
+            or "auto" (fast, promoted to full when notable)
+        deadline_seconds: Optional time budget for the request
+        x_deadline_seconds: Time budget from the X-Deadline-Seconds header
+            (used when deadline_seconds is not given)
         
     Returns:
         Analysis results
@@ -183,12 +761,17 @@ async def analyze_text(
             detail="Analysis service not available. Please check API key configuration."
         )
     
+    _check_analysis_mode(mode)
+    _start_request_deadline(deadline_seconds if deadline_seconds is not None else x_deadline_seconds)
+    
     try:
         analysis = await analysis_service.analyze_transcription(
             text,
             airline_filter=airline_filter,
-            theme_filter=theme_filter
+            theme_filter=theme_filter,
+            mode=mode
         )
+        await _record_analysis(text, analysis)
         
         return JSONResponse(analysis)
         
@@ -200,6 +783,125 @@ async def analyze_text(
         )
 
 
+def _parse_batch_items(body: bytes, default_mode: str = "full") -> List[Dict[str, Any]]:
+    """
+    Parse a batch body given as a JSON array or as NDJSON (one item per line).
+    
+    Each item is either a transcript string or an object with "text" and
+    optional "id", "airline_filter", "theme_filter" and "mode" (default_mode
+    when not given).
+    
+    Raises:
+        HTTPException: If the body is empty, malformed or too large
+    """
+    try:
+        raw = body.decode("utf-8").strip()
+        if raw.startswith("["):
+            entries = json.loads(raw)
+        else:
+            entries = [json.loads(line) for line in raw.splitlines() if line.strip()]
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {str(e)}")
+    
+    if not entries:
+        raise HTTPException(status_code=400, detail="Batch contains no transcripts")
+    if len(entries) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch contains {len(entries)} transcripts; the maximum is {settings.batch_max_items}"
+        )
+    
+    items = []
+    for index, entry in enumerate(entries):
+        if isinstance(entry, str):
+            entry = {"text": entry}
+        if not isinstance(entry, dict) or not isinstance(entry.get("text"), str) or not entry["text"].strip():
+            raise HTTPException(status_code=400, detail=f"Batch item {index} has no transcript text")
+        items.append({
+            "id": entry.get("id", index),
+            "text": entry["text"],
+            "airline_filter": entry.get("airline_filter"),
+            "theme_filter": entry.get("theme_filter"),
+            "mode": _check_analysis_mode(entry.get("mode", default_mode))
+        })
+    return items
+
+
+@app.post("/api/analyze/batch")
+async def analyze_batch(
+    request: Request,
+    concurrency: Optional[int] = None,
+    deadline_seconds: Optional[float] = None,
+    mode: str = "full"
+):
+    """
+    Analyze many transcripts and stream results as NDJSON in completion order.
+    
+    The body is a JSON array or NDJSON of transcripts (see
+    _parse_batch_items). Items are analyzed concurrently, bounded by
+    concurrency (capped at BATCH_MAX_CONCURRENCY), and share one news
+    service and correlation engine so items mentioning the same airlines
+    reuse the news fetch and article embeddings. Each output line is
+    {"index", "id", "status": "ok", "analysis"} or
+    {"index", "id", "status": "error", "detail"}.
+    
+    Args:
+        request: Request carrying the batch body
+        concurrency: Optional number of transcripts analyzed at once
+        deadline_seconds: Optional time budget per transcript, counted from
+            when its analysis starts
+        mode: Analysis mode for items that do not set their own ("full",
+            "fast" or "auto"); "fast" suits bulk back-fills
+    
+    Returns:
+        Streaming NDJSON response
+    """
+    if not analysis_service:
+        raise HTTPException(
+            status_code=503,
+            detail="Analysis service not available. Please check API key configuration."
+        )
+    
+    items = _parse_batch_items(await request.body(), _check_analysis_mode(mode))
+    limit = max(1, min(concurrency or settings.batch_max_concurrency, settings.batch_max_concurrency))
+    semaphore = asyncio.Semaphore(limit)
+    news_service = NewsCorrelationService()
+    correlation_engine = CorrelationEngine()
+    
+    logger.info(f"Analyzing batch of {len(items)} transcripts with concurrency {limit}")
+    
+    async def analyze_item(index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            _start_request_deadline(deadline_seconds)
+            try:
+                analysis = await analysis_service.analyze_transcription(
+                    item["text"],
+                    airline_filter=item["airline_filter"],
+                    theme_filter=item["theme_filter"],
+                    news_service=news_service,
+                    correlation_engine=correlation_engine,
+                    mode=item["mode"],
+                    correlation_priority=CORRELATION_PRIORITY_BATCH
+                )
+                await _record_analysis(item["text"], analysis)
+                return {"index": index, "id": item["id"], "status": "ok", "analysis": analysis}
+            except Exception as e:
+                logger.error(f"Batch item {index} failed: {str(e)}", exc_info=True)
+                return {"index": index, "id": item["id"], "status": "error", "detail": str(e)}
+    
+    async def stream_results():
+        tasks = [asyncio.create_task(analyze_item(index, item)) for index, item in enumerate(items)]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield json.dumps(await next_result) + "\n"
+        finally:
+            # Stop outstanding work if the client goes away
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
 @app.get("/api/news")
 async def get_aviation_news(
     airline: Optional[str] = None,
@@ -248,7 +950,7 @@ async def get_aviation_news(
         
         # Fetch news
         logger.info(f"Fetching news with query: {query}, airlines: {airlines_list}, days: {days}")
-        articles = await news_service.search_aviation_news(
+        articles, _ = await news_service.search_aviation_news(
             query=query,
             airlines=airlines_list if airlines_list else None,
             date_from=date_from,
@@ -309,7 +1011,7 @@ async def correlate_transcript(
         
         # Search news
         search_query = f"{' '.join(theme_list)} {' '.join(airline_list)}"
-        news_articles = await news_service.search_aviation_news(
+        news_articles, _ = await news_service.search_aviation_news(
             query=search_query,
             airlines=airline_list if airline_list else None,
             max_results=20
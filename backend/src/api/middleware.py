@@ -0,0 +1,75 @@
+"""ASGI middleware for the API application."""
+from typing import Iterable
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+# Allowance for multipart boundaries and the small form fields sent with the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized uploads before and while the request body is read.
+    
+    Requests whose Content-Length already exceeds the limit are answered
+    with 413 without reading the body. Requests without a Content-Length
+    (chunked transfer) are counted as they stream in and aborted with 413
+    as soon as the limit is crossed, so the file never fully arrives.
+    """
+    
+    def __init__(self, app, paths: Iterable[str], max_bytes: int):
+        """
+        Initialize middleware.
+        
+        Args:
+            app: ASGI application to wrap
+            paths: Request paths the limit applies to
+            max_bytes: Maximum allowed file size in bytes
+        """
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+        self.max_body_bytes = max_bytes + MULTIPART_OVERHEAD_BYTES
+    
+    def _too_large_detail(self, size_bytes: int) -> str:
+        max_mb = self.max_bytes / (1024 * 1024)
+        return (
+            f"File size ({size_bytes / (1024 * 1024):.2f}MB) exceeds maximum allowed size "
+            f"({max_mb:g}MB)"
+        )
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None:
+            try:
+                declared_bytes = int(content_length)
+            except ValueError:
+                declared_bytes = 0
+            if declared_bytes > self.max_body_bytes:
+                response = JSONResponse(
+                    {"detail": self._too_large_detail(declared_bytes)},
+                    status_code=413
+                )
+                await response(scope, receive, send)
+                return
+        
+        received_bytes = 0
+        
+        async def limited_receive():
+            nonlocal received_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                received_bytes += len(message.get("body", b""))
+                if received_bytes > self.max_body_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=self._too_large_detail(received_bytes)
+                    )
+            return message
+        
+        await self.app(scope, limited_receive, send)
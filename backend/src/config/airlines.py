@@ -1,6 +1,5 @@
 """Airline configuration and keywords for content extraction."""
-from typing import Dict, List, Optional, Any
-import json
+from typing import Callable, Dict, List, Optional, Any
 import re
 
 
@@ -83,239 +82,86 @@ def get_airline_keywords() -> Dict[str, List[str]]:
     return AIRLINE_KEYWORDS
 
 
-async def detect_airlines_with_ai(
-    text: str,
-    openai_client,
-    model: str = "gpt-4o"
-) -> List[Dict[str, Any]]:
+def airlines_from_ai_items(airlines_data: Any, text: str) -> List[Dict[str, Any]]:
     """
-    Detect airlines mentioned in text using OpenAI AI.
-    This method can identify airlines even if they're not in the keyword list.
+    Convert airlines returned by an AI model to the standard detection format.
     
     Args:
-        text: Input text to analyze
-        openai_client: OpenAI client instance
-        model: OpenAI model to use (default: gpt-4o)
+        airlines_data: The model's "airlines" value (list of dicts, or a single dict)
+        text: Text the airlines were detected in, used for positions and mention counts
         
     Returns:
-        List of detected airlines with relevance scores
+        Detected airlines (unsorted), with detection_method "ai"
     """
-    # Get list of known airlines for context
-    known_airlines = list(AIRLINE_KEYWORDS.keys())
-    airlines_list = ", ".join(known_airlines)
+    if not isinstance(airlines_data, list):
+        # If it's a single object, wrap it in a list
+        if isinstance(airlines_data, dict):
+            airlines_data = [airlines_data]
+        else:
+            airlines_data = []
     
-    # Limit text length to avoid token limits
-    text_snippet = text[:2000] if len(text) > 2000 else text
+    detected_airlines = []
+    text_lower = text.lower()
     
-    prompt = f"""You are an expert aviation intelligence analyst. Analyze this text and identify ALL airlines mentioned.
-
-TEXT:
-"{text_snippet}"
-
-KNOWN AIRLINES (use these EXACT names when detected):
-{airlines_list}
-
-REQUIREMENTS:
-1. Identify EVERY airline mentioned (directly or indirectly)
-2. Include airline codes (e.g., "6E" = Indigo, "SG" = SpiceJet, "M8" = SkyJet)
-3. Include indirect references (e.g., "blue airline" = Indigo, "Tata's airline" = Air India/Vistara)
-4. For each airline, provide:
-   - "airline": Exact airline name (use standard name from known list)
-   - "relevance": "High", "Medium", or "Low"
-   - "confidence": Number between 0.0 and 1.0
-   - "reason": Brief explanation
-
-IMPORTANT: If NO airlines are mentioned, return an empty array. Otherwise, return ALL detected airlines.
-
-Return ONLY a valid JSON object with this exact structure:
-{{
-  "airlines": [
-    {{
-      "airline": "Airline Name",
-      "relevance": "High",
-      "confidence": 0.9,
-      "reason": "Mentioned directly in text"
-    }}
-  ]
-}}"""
-
-    try:
-        response = openai_client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert aviation intelligence analyst. You MUST identify airlines in text. Always return valid JSON with an 'airlines' array. If no airlines are found, return empty array."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.2,  # Lower temperature for more consistent results
-            max_tokens=800,  # Increased for better detection
-            response_format={"type": "json_object"}
-        )
-        
-        # Parse AI response
-        ai_content = response.choices[0].message.content.strip()
-        
-        # Try to parse JSON
-        try:
-            parsed = json.loads(ai_content)
-        except json.JSONDecodeError:
-            # Try to extract JSON from text if wrapped
-            import re
-            json_match = re.search(r'\{[^{}]*"airlines"[^{}]*\[[^\]]*\][^{}]*\}', ai_content, re.DOTALL)
-            if json_match:
-                parsed = json.loads(json_match.group())
-            else:
-                # Last resort: try to find airlines array
-                airlines_match = re.search(r'"airlines"\s*:\s*\[(.*?)\]', ai_content, re.DOTALL)
-                if airlines_match:
-                    # Try to parse just the array
-                    parsed = {"airlines": json.loads("[" + airlines_match.group(1) + "]")}
-                else:
-                    raise ValueError("Could not parse JSON response")
-        
-        # Extract airlines array
-        airlines_data = parsed.get("airlines", [])
-        if not isinstance(airlines_data, list):
-            # If it's a single object, wrap it in a list
-            if isinstance(airlines_data, dict):
-                airlines_data = [airlines_data]
-            else:
-                airlines_data = []
-        
-        # Convert AI response to standard format
-        detected_airlines = []
-        text_lower = text.lower()
-        
-        for item in airlines_data:
-            if isinstance(item, dict):
-                airline_name = item.get("airline", "").strip()
-                if not airline_name:
-                    # Try alternative keys
-                    airline_name = item.get("name", "").strip() or item.get("airlineName", "").strip()
-                
-                if airline_name:
-                    # Normalize airline name (check if it matches known airlines)
-                    normalized_name = _normalize_airline_name(airline_name)
-                    
-                    # Skip if normalization failed (empty name)
-                    if not normalized_name:
-                        continue
-                    
-                    relevance = item.get("relevance", "Medium")
-                    # Handle case variations
-                    if isinstance(relevance, str):
-                        relevance = relevance.capitalize()
-                        if relevance not in ["High", "Medium", "Low"]:
-                            relevance = "Medium"
-                    
-                    try:
-                        confidence = float(item.get("confidence", 0.7))
-                        confidence = max(0.0, min(1.0, confidence))  # Clamp between 0 and 1
-                    except (ValueError, TypeError):
-                        confidence = 0.7
-                    
-                    # Calculate score based on relevance and confidence
-                    relevance_scores = {"High": 0.8, "Medium": 0.5, "Low": 0.3}
-                    base_score = relevance_scores.get(relevance, 0.5)
-                    score = base_score * confidence
-                    
-                    # Find position in text (try both original and normalized name)
-                    first_mention_pos = text_lower.find(airline_name.lower())
-                    if first_mention_pos == -1:
-                        first_mention_pos = text_lower.find(normalized_name.lower())
-                    if first_mention_pos == -1:
-                        first_mention_pos = len(text_lower)
-                    
-                    # Count mentions (try both names)
-                    mention_count = text_lower.count(airline_name.lower())
-                    if mention_count == 0:
-                        mention_count = text_lower.count(normalized_name.lower())
-                    if mention_count == 0:
-                        mention_count = 1  # At least 1 if detected
-                    
-                    detected_airlines.append({
-                        "airline": normalized_name,
-                        "relevance": relevance,
-                        "score": score,
-                        "matches": 1,
-                        "mention_count": mention_count,
-                        "first_mention_position": first_mention_pos,
-                        "detection_method": "ai",
-                        "reason": item.get("reason", "Detected by AI analysis")
-                    })
-        
-        # Sort by score (highest first)
-        detected_airlines.sort(key=lambda x: x["score"], reverse=True)
-        
-        # Log for debugging
-        if detected_airlines:
-            import logging
-            logging.info(f"AI detected {len(detected_airlines)} airlines: {[a['airline'] for a in detected_airlines]}")
-        else:
-            import logging
-            logging.warning(f"AI detection returned no airlines for text: {text[:100]}...")
-        
-        return detected_airlines[:5]  # Return top 5
-        
-    except Exception as e:
-        # If AI detection fails, log the error and return empty list (fallback to keyword-based)
-        import logging
-        logging.error(f"AI airline detection failed: {str(e)}", exc_info=True)
-        # Log the text that failed (first 200 chars for debugging)
-        logging.error(f"Failed text snippet: {text[:200] if text else 'Empty text'}")
-        
-        # Try a simpler fallback: ask AI directly without JSON format
-        try:
-            simple_prompt = f"""List all airline names mentioned in this text. Return only airline names, one per line.
-
-Text: "{text[:1000]}"
-
-Known airlines: {airlines_list[:200]}
-
-Return airline names only:"""
-            
-            fallback_response = openai_client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are an expert at identifying airlines. Return only airline names, one per line."},
-                    {"role": "user", "content": simple_prompt}
-                ],
-                temperature=0.2,
-                max_tokens=200
-            )
-            
-            fallback_text = fallback_response.choices[0].message.content.strip()
-            # Extract airline names from lines
-            airline_names = [line.strip() for line in fallback_text.split('\n') if line.strip()]
+    for item in airlines_data:
+        if isinstance(item, dict):
+            airline_name = item.get("airline", "").strip()
+            if not airline_name:
+                # Try alternative keys
+                airline_name = item.get("name", "").strip() or item.get("airlineName", "").strip()
             
-            # Convert to standard format
-            detected_airlines = []
-            for name in airline_names[:5]:
-                normalized = _normalize_airline_name(name)
-                if normalized:
-                    detected_airlines.append({
-                        "airline": normalized,
-                        "relevance": "Medium",
-                        "score": 0.5,
-                        "matches": 1,
-                        "mention_count": 1,
-                        "first_mention_position": 0,
-                        "detection_method": "ai_fallback",
-                        "reason": "Detected via fallback method"
-                    })
-            
-            if detected_airlines:
-                logging.info(f"Fallback AI detection found {len(detected_airlines)} airlines")
-                return detected_airlines
-        except Exception as fallback_error:
-            logging.error(f"Fallback AI detection also failed: {str(fallback_error)}")
-        
-        return []
+            if airline_name:
+                # Normalize airline name (check if it matches known airlines)
+                normalized_name = _normalize_airline_name(airline_name)
+                
+                # Skip if normalization failed (empty name)
+                if not normalized_name:
+                    continue
+                
+                relevance = item.get("relevance", "Medium")
+                # Handle case variations
+                if isinstance(relevance, str):
+                    relevance = relevance.capitalize()
+                    if relevance not in ["High", "Medium", "Low"]:
+                        relevance = "Medium"
+                
+                try:
+                    confidence = float(item.get("confidence", 0.7))
+                    confidence = max(0.0, min(1.0, confidence))  # Clamp between 0 and 1
+                except (ValueError, TypeError):
+                    confidence = 0.7
+                
+                # Calculate score based on relevance and confidence
+                relevance_scores = {"High": 0.8, "Medium": 0.5, "Low": 0.3}
+                base_score = relevance_scores.get(relevance, 0.5)
+                score = base_score * confidence
+                
+                # Find position in text (try both original and normalized name)
+                first_mention_pos = text_lower.find(airline_name.lower())
+                if first_mention_pos == -1:
+                    first_mention_pos = text_lower.find(normalized_name.lower())
+                if first_mention_pos == -1:
+                    first_mention_pos = len(text_lower)
+                
+                # Count mentions (try both names)
+                mention_count = text_lower.count(airline_name.lower())
+                if mention_count == 0:
+                    mention_count = text_lower.count(normalized_name.lower())
+                if mention_count == 0:
+                    mention_count = 1  # At least 1 if detected
+                
+                detected_airlines.append({
+                    "airline": normalized_name,
+                    "relevance": relevance,
+                    "score": score,
+                    "matches": 1,
+                    "mention_count": mention_count,
+                    "first_mention_position": first_mention_pos,
+                    "detection_method": "ai",
+                    "reason": item.get("reason", "Detected by AI analysis")
+                })
+    
+    return detected_airlines
 
 
 def _normalize_airline_name(airline_name: str) -> str:
@@ -352,41 +198,33 @@ def _normalize_airline_name(airline_name: str) -> str:
     return airline_name.title()
 
 
-def detect_airlines_in_text(text: str) -> List[Dict[str, Any]]:
+def score_airline_mentions(
+    text_length: int,
+    keyword_matched: Callable[[str], bool],
+    mention_count: Callable[[str], int],
+    first_position: Callable[[str], int]
+) -> List[Dict[str, Any]]:
     """
-    Detect airlines mentioned in text based on keywords.
+    Score and rank airlines from keyword match statistics.
+    
+    Shared by detect_airlines_in_text() and the streaming
+    IncrementalKeywordMatcher, which gather the statistics differently.
+    All callbacks take a lower-cased keyword or airline name.
     
     Args:
-        text: Input text to analyze
+        text_length: Length of the scanned text
+        keyword_matched: Whether a keyword matches (short codes only on word boundaries)
+        mention_count: Occurrences of a keyword or airline name
+        first_position: Position of a keyword's first occurrence, or -1
         
     Returns:
-        List of detected airlines with relevance scores
+        Top 5 detected airlines with relevance scores, best first
     """
-    text_lower = text.lower()
     detected_airlines = []
-    import re
     
     for airline, keywords in AIRLINE_KEYWORDS.items():
-        matches = 0
-        matched_keywords = []
-        
-        for keyword in keywords:
-            keyword_lower = keyword.lower()
-            
-            # For short codes (2-3 characters), use word boundary matching
-            # to avoid false positives (e.g., "af" matching in "staff", "craft")
-            if len(keyword_lower) <= 3:
-                # Use word boundary regex for short codes
-                pattern = r'\b' + re.escape(keyword_lower) + r'\b'
-                if re.search(pattern, text_lower):
-                    matches += 1
-                    matched_keywords.append(keyword)
-            else:
-                # For longer keywords, use exact phrase matching
-                # This ensures "air france" only matches when both words appear together
-                if keyword_lower in text_lower:
-                    matches += 1
-                    matched_keywords.append(keyword)
+        keywords_lower = [keyword.lower() for keyword in keywords]
+        matches = sum(1 for keyword in keywords_lower if keyword_matched(keyword))
         
         # Only add airline if we have actual matches (not false positives)
         if matches > 0:
@@ -395,23 +233,18 @@ def detect_airlines_in_text(text: str) -> List[Dict[str, Any]]:
             
             # Boost score if airline name appears directly
             airline_name_lower = airline.lower()
-            if airline_name_lower in text_lower:
+            if mention_count(airline_name_lower) > 0:
                 relevance_score += 0.2
             
             # Count frequency of mentions
-            mention_count = text_lower.count(airline_name_lower)
-            for keyword in keywords:
-                mention_count += text_lower.count(keyword.lower())
+            mentions = mention_count(airline_name_lower) + sum(mention_count(keyword) for keyword in keywords_lower)
             
             # Calculate position-based score (earlier mentions are more important)
-            first_mention_pos = len(text_lower)
-            for keyword in keywords:
-                pos = text_lower.find(keyword.lower())
-                if pos != -1 and pos < first_mention_pos:
-                    first_mention_pos = pos
+            positions = [first_position(keyword) for keyword in keywords_lower]
+            first_mention_pos = min([pos for pos in positions if pos != -1], default=text_length)
             
             # Normalize position score (earlier = higher score)
-            position_score = 1.0 - (first_mention_pos / max(len(text_lower), 1))
+            position_score = 1.0 - (first_mention_pos / max(text_length, 1))
             relevance_score += position_score * 0.1
             
             relevance = (
@@ -424,7 +257,7 @@ def detect_airlines_in_text(text: str) -> List[Dict[str, Any]]:
                 "relevance": relevance,
                 "score": relevance_score,
                 "matches": matches,
-                "mention_count": mention_count,
+                "mention_count": mentions,
                 "first_mention_position": first_mention_pos
             })
     
@@ -436,6 +269,30 @@ def detect_airlines_in_text(text: str) -> List[Dict[str, Any]]:
     return detected_airlines[:5]  # Return top 5
 
 
+def detect_airlines_in_text(text: str) -> List[Dict[str, Any]]:
+    """
+    Detect airlines mentioned in text based on keywords.
+    
+    Args:
+        text: Input text to analyze
+        
+    Returns:
+        List of detected airlines with relevance scores
+    """
+    text_lower = text.lower()
+    
+    def keyword_matched(keyword: str) -> bool:
+        # For short codes (2-3 characters), use word boundary matching
+        # to avoid false positives (e.g., "af" matching in "staff", "craft")
+        if len(keyword) <= 3:
+            return re.search(r'\b' + re.escape(keyword) + r'\b', text_lower) is not None
+        # For longer keywords, use exact phrase matching
+        # This ensures "air france" only matches when both words appear together
+        return keyword in text_lower
+    
+    return score_airline_mentions(len(text_lower), keyword_matched, text_lower.count, text_lower.find)
+
+
 def get_primary_airline(detected_airlines: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     """
     Determine the primary airline from detected airlines.
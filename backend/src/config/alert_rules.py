@@ -0,0 +1,65 @@
+"""Alert rule configuration, evaluated against each stored analysis."""
+from typing import Any, Dict, List
+
+
+# Each rule raises at most one alert per analysis when all of its conditions hold.
+#
+# Scope (indexed, so a rule only runs for analyses it can match):
+#   airline: the analysis names this airline; the alert is raised for it
+#   theme: the analysis has this theme
+# Conditions:
+#   sentiment: overall sentiment ("Positive", "Neutral", "Negative")
+#   sentimentScoreAtMost / sentimentScoreAbove: sentiment score bounds
+#   marketSignal: a market signal's name contains one of these phrases
+#   signalStrength: ...with one of these strengths
+#   minContradictedClaims: at least this many claims contradicted by news
+#   minContradictedShare: at least this share of claims contradicted
+# Output:
+#   severity: "Critical", "High", "Medium" or "Low"
+#   title / message: templates with {airline}, {themes}, {summary},
+#   {signal}, {contradicted} and {claims}
+ALERT_RULES: List[Dict[str, Any]] = [
+    # Negative analyses, the rule the alerts page applied client-side
+    {
+        "id": "negativeSentimentCritical",
+        "sentiment": "Negative",
+        "sentimentScoreAtMost": 0.2,
+        "severity": "Critical",
+        "title": "{airline} - {themes} Alert",
+        "message": "{summary}"
+    },
+    {
+        "id": "negativeSentimentHigh",
+        "sentiment": "Negative",
+        "sentimentScoreAbove": 0.2,
+        "sentimentScoreAtMost": 0.3,
+        "severity": "High",
+        "title": "{airline} - {themes} Alert",
+        "message": "{summary}"
+    },
+    {
+        "id": "negativeSentimentMedium",
+        "sentiment": "Negative",
+        "sentimentScoreAbove": 0.3,
+        "severity": "Medium",
+        "title": "{airline} - {themes} Alert",
+        "message": "{summary}"
+    },
+    {
+        "id": "strongHiringSignal",
+        "theme": "Hiring",
+        "marketSignal": ["hiring", "pilot demand", "recruit"],
+        "signalStrength": ["Strong"],
+        "severity": "High",
+        "title": "{airline} - Strong Hiring Signal",
+        "message": "{signal}: {summary}"
+    },
+    {
+        "id": "contradictedClaims",
+        "minContradictedClaims": 1,
+        "minContradictedShare": 0.5,
+        "severity": "High",
+        "title": "{airline} - Contradicted Claims",
+        "message": "{contradicted} of {claims} claims are contradicted by recent news: {summary}"
+    }
+]
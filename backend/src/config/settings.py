@@ -1,6 +1,6 @@
 """Application settings and configuration."""
 import os
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 
@@ -25,12 +25,136 @@ class Settings(BaseSettings):
         return [origin.strip() for origin in self.cors_origins.split(",")]
     
     # Audio Processing
-    max_audio_size_mb: int = int(os.getenv("MAX_AUDIO_SIZE_MB", "25"))
+    max_audio_size_mb: int = int(os.getenv("MAX_AUDIO_SIZE_MB", "100"))
     supported_audio_formats: List[str] = ["webm", "mp3", "wav", "m4a", "ogg"]
     
+    # Long Recording Transcription (WAV recordings are split and transcribed in parallel)
+    whisper_max_upload_mb: int = int(os.getenv("WHISPER_MAX_UPLOAD_MB", "25"))
+    transcription_chunking_enabled: bool = os.getenv("TRANSCRIPTION_CHUNKING_ENABLED", "true").lower() == "true"
+    transcription_chunk_min_duration_seconds: float = float(os.getenv("TRANSCRIPTION_CHUNK_MIN_DURATION_SECONDS", "300"))
+    transcription_chunk_seconds: float = float(os.getenv("TRANSCRIPTION_CHUNK_SECONDS", "120"))
+    transcription_chunk_overlap_seconds: float = float(os.getenv("TRANSCRIPTION_CHUNK_OVERLAP_SECONDS", "2"))
+    transcription_max_concurrency: int = int(os.getenv("TRANSCRIPTION_MAX_CONCURRENCY", "4"))
+    
+    # Live Capture (WebSocket streaming transcription)
+    live_window_seconds: float = float(os.getenv("LIVE_WINDOW_SECONDS", "8"))
+    live_window_overlap_seconds: float = float(os.getenv("LIVE_WINDOW_OVERLAP_SECONDS", "1"))
+    live_max_pending_windows: int = int(os.getenv("LIVE_MAX_PENDING_WINDOWS", "4"))
+    
+    # Audio Preprocessing (WAV recordings are downmixed, resampled and silence-trimmed)
+    audio_preprocessing_enabled: bool = os.getenv("AUDIO_PREPROCESSING_ENABLED", "true").lower() == "true"
+    preprocessing_sample_rate: int = int(os.getenv("PREPROCESSING_SAMPLE_RATE", "16000"))
+    audio_decode_max_concurrency: int = int(os.getenv("AUDIO_DECODE_MAX_CONCURRENCY", "2"))
+    vad_enabled: bool = os.getenv("VAD_ENABLED", "true").lower() == "true"
+    vad_threshold_db: float = float(os.getenv("VAD_THRESHOLD_DB", "12"))
+    vad_padding_seconds: float = float(os.getenv("VAD_PADDING_SECONDS", "0.2"))
+    vad_min_silence_seconds: float = float(os.getenv("VAD_MIN_SILENCE_SECONDS", "0.6"))
+    vad_keep_silence_seconds: float = float(os.getenv("VAD_KEEP_SILENCE_SECONDS", "0.3"))
+    
+    # Transcript Cache Configuration
+    transcript_cache_enabled: bool = os.getenv("TRANSCRIPT_CACHE_ENABLED", "true").lower() == "true"
+    transcript_cache_dir: str = os.getenv("TRANSCRIPT_CACHE_DIR", ".cache/transcripts")
+    transcript_fingerprint_enabled: bool = os.getenv("TRANSCRIPT_FINGERPRINT_ENABLED", "false").lower() == "true"
+    transcript_fingerprint_threshold: float = float(os.getenv("TRANSCRIPT_FINGERPRINT_THRESHOLD", "0.2"))
+    
     # AI Model Configuration
     transcription_model: str = os.getenv("TRANSCRIPTION_MODEL", "whisper-1")
     analysis_model: str = os.getenv("ANALYSIS_MODEL", "gpt-4o")
+    # stage=model pairs; unlisted stages use ANALYSIS_MODEL
+    model_routes: str = os.getenv(
+        "MODEL_ROUTES",
+        "primaryAirline=gpt-4o-mini,airlineListFallback=gpt-4o-mini,airlineExtraction=gpt-4o-mini,claimExtraction=gpt-4o-mini"
+    )
+    # Retry a routed stage on ANALYSIS_MODEL when its response is invalid or low-confidence
+    model_escalation_enabled: bool = os.getenv("MODEL_ESCALATION_ENABLED", "true").lower() == "true"
+    model_escalation_min_confidence: float = float(os.getenv("MODEL_ESCALATION_MIN_CONFIDENCE", "0.5"))
+    
+    @property
+    def model_routes_map(self) -> Dict[str, str]:
+        """Get MODEL_ROUTES as a stage -> model mapping."""
+        routes = {}
+        for route in self.model_routes.split(","):
+            stage, _, model = route.partition("=")
+            if stage.strip() and model.strip():
+                routes[stage.strip()] = model.strip()
+        return routes
+    
+    # Outbound Rate Limits (requests per minute per provider, 0 disables)
+    openai_requests_per_minute: float = float(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+    newsapi_requests_per_minute: float = float(os.getenv("NEWSAPI_REQUESTS_PER_MINUTE", "60"))
+    
+    # OpenAI Scheduler (shared limits, AIMD concurrency and retries for all OpenAI calls)
+    openai_base_url: str = os.getenv("OPENAI_BASE_URL", "")
+    openai_tokens_per_minute: float = float(os.getenv("OPENAI_TOKENS_PER_MINUTE", "0"))
+    openai_initial_concurrency: int = int(os.getenv("OPENAI_INITIAL_CONCURRENCY", "8"))
+    openai_min_concurrency: int = int(os.getenv("OPENAI_MIN_CONCURRENCY", "1"))
+    openai_max_concurrency: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", "32"))
+    openai_max_retries: int = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+    openai_retry_base_seconds: float = float(os.getenv("OPENAI_RETRY_BASE_SECONDS", "0.5"))
+    openai_retry_max_seconds: float = float(os.getenv("OPENAI_RETRY_MAX_SECONDS", "30"))
+    
+    # Request Hedging (duplicate slow, low-temperature LLM calls; first result wins)
+    hedge_enabled: bool = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+    hedge_percentile: float = float(os.getenv("HEDGE_PERCENTILE", "95"))
+    hedge_min_samples: int = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+    hedge_min_delay_seconds: float = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "0.5"))
+    hedge_max_extra_fraction: float = float(os.getenv("HEDGE_MAX_EXTRA_FRACTION", "0.05"))
+    hedge_max_temperature: float = float(os.getenv("HEDGE_MAX_TEMPERATURE", "0.3"))
+    
+    # Concurrent identical analyses share one run
+    analysis_singleflight_enabled: bool = os.getenv("ANALYSIS_SINGLEFLIGHT_ENABLED", "true").lower() == "true"
+    
+    # Tiered Airline Detection (AI detector only when keyword detection is not decisive)
+    tiered_detection_enabled: bool = os.getenv("TIERED_DETECTION_ENABLED", "true").lower() == "true"
+    tiered_detection_min_score: float = float(os.getenv("TIERED_DETECTION_MIN_SCORE", "0.5"))
+    tiered_detection_min_margin: float = float(os.getenv("TIERED_DETECTION_MIN_MARGIN", "2"))
+    tiered_detection_shadow_rate: float = float(os.getenv("TIERED_DETECTION_SHADOW_RATE", "0.05"))
+    
+    # One structured LLM call for airlines, primary airline, themes, claims and summary
+    analysis_consolidated_enabled: bool = os.getenv("ANALYSIS_CONSOLIDATED_ENABLED", "false").lower() == "true"
+    
+    # Circuit Breakers (NewsAPI and OpenAI fail fast while their circuit is open)
+    circuit_breaker_enabled: bool = os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+    circuit_failure_rate_threshold: float = float(os.getenv("CIRCUIT_FAILURE_RATE_THRESHOLD", "0.5"))
+    circuit_slow_call_rate_threshold: float = float(os.getenv("CIRCUIT_SLOW_CALL_RATE_THRESHOLD", "0.5"))
+    circuit_window_size: int = int(os.getenv("CIRCUIT_WINDOW_SIZE", "20"))
+    circuit_minimum_calls: int = int(os.getenv("CIRCUIT_MINIMUM_CALLS", "5"))
+    circuit_open_seconds: float = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+    circuit_half_open_max_calls: int = int(os.getenv("CIRCUIT_HALF_OPEN_MAX_CALLS", "2"))
+    newsapi_slow_call_seconds: float = float(os.getenv("NEWSAPI_SLOW_CALL_SECONDS", "5"))
+    openai_slow_call_seconds: float = float(os.getenv("OPENAI_SLOW_CALL_SECONDS", "60"))
+    whisper_slow_call_seconds: float = float(os.getenv("WHISPER_SLOW_CALL_SECONDS", "600"))
+    
+    # Request Deadlines (total time budget per request, 0 disables)
+    request_deadline_seconds: float = float(os.getenv("REQUEST_DEADLINE_SECONDS", "120"))
+    request_deadline_max_seconds: float = float(os.getenv("REQUEST_DEADLINE_MAX_SECONDS", "600"))
+    deadline_stage_min_seconds: float = float(os.getenv("DEADLINE_STAGE_MIN_SECONDS", "2"))
+    deadline_correlation_min_seconds: float = float(os.getenv("DEADLINE_CORRELATION_MIN_SECONDS", "10"))
+    
+    # Two-Phase Transcription (return a provisional result, finish the LLM analysis in the background)
+    transcribe_two_phase: bool = os.getenv("TRANSCRIBE_TWO_PHASE", "false").lower() == "true"
+    analysis_job_ttl_seconds: float = float(os.getenv("ANALYSIS_JOB_TTL_SECONDS", "3600"))
+    analysis_job_max_entries: int = int(os.getenv("ANALYSIS_JOB_MAX_ENTRIES", "1000"))
+    analysis_events_timeout_seconds: float = float(os.getenv("ANALYSIS_EVENTS_TIMEOUT_SECONDS", "300"))
+    
+    # Analysis Store (SQLite history behind /api/insights and /api/alerts)
+    analysis_store_enabled: bool = os.getenv("ANALYSIS_STORE_ENABLED", "true").lower() == "true"
+    analysis_store_path: str = os.getenv("ANALYSIS_STORE_PATH", ".cache/analyses.db")
+    heatmap_bucket_seconds: float = float(os.getenv("HEATMAP_BUCKET_SECONDS", "3600"))
+    # Per-airline signal time series (7- and 30-day windows)
+    timeseries_bucket_seconds: float = float(os.getenv("TIMESERIES_BUCKET_SECONDS", "86400"))
+    timeseries_max_series: int = int(os.getenv("TIMESERIES_MAX_SERIES", "10000"))
+    # JSON list of alert rules replacing src/config/alert_rules.py
+    alert_rules_file: str = os.getenv("ALERT_RULES_FILE", "")
+    
+    # Analytics Segments (columnar history compacted from the analysis store, 0 disables periodic compaction)
+    analytics_segments_dir: str = os.getenv("ANALYTICS_SEGMENTS_DIR", ".cache/analytics")
+    analytics_segment_rows: int = int(os.getenv("ANALYTICS_SEGMENT_ROWS", "1000000"))
+    analytics_compaction_seconds: float = float(os.getenv("ANALYTICS_COMPACTION_SECONDS", "3600"))
+    
+    # Batch Analysis Configuration
+    batch_max_items: int = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+    batch_max_concurrency: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
     
     # News Correlation Configuration
     correlation_enabled: bool = os.getenv("CORRELATION_ENABLED", "true").lower() == "true"
@@ -38,6 +162,25 @@ class Settings(BaseSettings):
     correlation_similarity_threshold: float = float(os.getenv("CORRELATION_SIMILARITY_THRESHOLD", "0.4"))
     claim_similarity_threshold: float = float(os.getenv("CLAIM_SIMILARITY_THRESHOLD", "0.5"))
     max_search_terms: int = int(os.getenv("MAX_SEARCH_TERMS", "20"))
+    # Candidate articles embedded per transcript and per claim, picked by BM25 (0 embeds all)
+    correlation_prefilter_top_k: int = int(os.getenv("CORRELATION_PREFILTER_TOP_K", "40"))
+    claim_prefilter_top_k: int = int(os.getenv("CLAIM_PREFILTER_TOP_K", "40"))
+    # Correlations running at once (interactive requests ahead of batch items)
+    correlation_max_concurrency: int = int(os.getenv("CORRELATION_MAX_CONCURRENCY", "4"))
+    # Return analyses without waiting for correlation; fetch it from /api/analyses/{id}/correlation
+    correlation_background: bool = os.getenv("CORRELATION_BACKGROUND", "false").lower() == "true"
+    
+    # Semantic Cache (near-duplicate transcripts reuse a recent analysis's news correlation)
+    semantic_cache_enabled: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+    semantic_cache_threshold: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+    semantic_cache_ttl_seconds: float = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "21600"))
+    semantic_cache_max_entries: int = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "5000"))
+    
+    # Claim Verification Cache (verified claims reused across transcripts until a new relevant article appears)
+    claim_cache_enabled: bool = os.getenv("CLAIM_CACHE_ENABLED", "true").lower() == "true"
+    claim_cache_threshold: float = float(os.getenv("CLAIM_CACHE_THRESHOLD", "0.97"))
+    claim_cache_ttl_seconds: float = float(os.getenv("CLAIM_CACHE_TTL_SECONDS", "86400"))
+    claim_cache_max_entries: int = int(os.getenv("CLAIM_CACHE_MAX_ENTRIES", "10000"))
     
     # Default Values Configuration
     default_unknown_airline: str = os.getenv("DEFAULT_UNKNOWN_AIRLINE", "Unknown Airline")
@@ -0,0 +1,175 @@
+"""LLM airline detection, for transcripts keyword detection cannot settle (see tiered_detection)."""
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional
+from src.config.airlines import AIRLINE_KEYWORDS, _normalize_airline_name, airlines_from_ai_items
+from src.config.settings import settings
+from src.services.model_routing import complete_for_stage, json_response_check
+
+
+async def detect_airlines_with_ai(
+    text: str,
+    openai_client,
+    model: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Detect airlines mentioned in text using OpenAI AI.
+    This method can identify airlines even if they're not in the keyword list.
+    
+    Args:
+        text: Input text to analyze
+        openai_client: OpenAI client instance
+        model: OpenAI model to use (default: the airlineDetection route)
+        
+    Returns:
+        List of detected airlines with relevance scores
+    """
+    # Get list of known airlines for context
+    known_airlines = list(AIRLINE_KEYWORDS.keys())
+    airlines_list = ", ".join(known_airlines)
+    
+    # Limit text length to avoid token limits
+    text_snippet = text[:2000] if len(text) > 2000 else text
+    
+    prompt = f"""You are an expert aviation intelligence analyst. Analyze this text and identify ALL airlines mentioned.
+
+TEXT:
+"{text_snippet}"
+
+KNOWN AIRLINES (use these EXACT names when detected):
+{airlines_list}
+
+REQUIREMENTS:
+1. Identify EVERY airline mentioned (directly or indirectly)
+2. Include airline codes (e.g., "6E" = Indigo, "SG" = SpiceJet, "M8" = SkyJet)
+3. Include indirect references (e.g., "blue airline" = Indigo, "Tata's airline" = Air India/Vistara)
+4. For each airline, provide:
+   - "airline": Exact airline name (use standard name from known list)
+   - "relevance": "High", "Medium", or "Low"
+   - "confidence": Number between 0.0 and 1.0
+   - "reason": Brief explanation
+
+IMPORTANT: If NO airlines are mentioned, return an empty array. Otherwise, return ALL detected airlines.
+
+Return ONLY a valid JSON object with this exact structure:
+{{
+  "airlines": [
+    {{
+      "airline": "Airline Name",
+      "relevance": "High",
+      "confidence": 0.9,
+      "reason": "Mentioned directly in text"
+    }}
+  ]
+}}"""
+
+    try:
+        response = await complete_for_stage(
+            "airlineDetection",
+            openai_client,
+            model=model,
+            check=json_response_check("airlines", settings.model_escalation_min_confidence),
+            hedge=True,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert aviation intelligence analyst. You MUST identify airlines in text. Always return valid JSON with an 'airlines' array. If no airlines are found, return empty array."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=0.2,  # Lower temperature for more consistent results
+            max_tokens=800,  # Increased for better detection
+            response_format={"type": "json_object"}
+        )
+        
+        # Parse AI response
+        ai_content = response.choices[0].message.content.strip()
+        
+        # Try to parse JSON
+        try:
+            parsed = json.loads(ai_content)
+        except json.JSONDecodeError:
+            # Try to extract JSON from text if wrapped
+            json_match = re.search(r'\{[^{}]*"airlines"[^{}]*\[[^\]]*\][^{}]*\}', ai_content, re.DOTALL)
+            if json_match:
+                parsed = json.loads(json_match.group())
+            else:
+                # Last resort: try to find airlines array
+                airlines_match = re.search(r'"airlines"\s*:\s*\[(.*?)\]', ai_content, re.DOTALL)
+                if airlines_match:
+                    # Try to parse just the array
+                    parsed = {"airlines": json.loads("[" + airlines_match.group(1) + "]")}
+                else:
+                    raise ValueError("Could not parse JSON response")
+        
+        detected_airlines = airlines_from_ai_items(parsed.get("airlines", []), text)
+        
+        # Sort by score (highest first)
+        detected_airlines.sort(key=lambda x: x["score"], reverse=True)
+        
+        # Log for debugging
+        if detected_airlines:
+            logging.info(f"AI detected {len(detected_airlines)} airlines: {[a['airline'] for a in detected_airlines]}")
+        else:
+            logging.warning(f"AI detection returned no airlines for text: {text[:100]}...")
+        
+        return detected_airlines[:5]  # Return top 5
+        
+    except Exception as e:
+        # If AI detection fails, log the error and return empty list (fallback to keyword-based)
+        logging.error(f"AI airline detection failed: {str(e)}", exc_info=True)
+        # Log the text that failed (first 200 chars for debugging)
+        logging.error(f"Failed text snippet: {text[:200] if text else 'Empty text'}")
+        
+        # Try a simpler fallback: ask AI directly without JSON format
+        try:
+            simple_prompt = f"""List all airline names mentioned in this text. Return only airline names, one per line.
+
+Text: "{text[:1000]}"
+
+Known airlines: {airlines_list[:200]}
+
+Return airline names only:"""
+            
+            fallback_response = await complete_for_stage(
+                "airlineListFallback",
+                openai_client,
+                messages=[
+                    {"role": "system", "content": "You are an expert at identifying airlines. Return only airline names, one per line."},
+                    {"role": "user", "content": simple_prompt}
+                ],
+                temperature=0.2,
+                max_tokens=200
+            )
+            
+            fallback_text = fallback_response.choices[0].message.content.strip()
+            # Extract airline names from lines
+            airline_names = [line.strip() for line in fallback_text.split('\n') if line.strip()]
+            
+            # Convert to standard format
+            detected_airlines = []
+            for name in airline_names[:5]:
+                normalized = _normalize_airline_name(name)
+                if normalized:
+                    detected_airlines.append({
+                        "airline": normalized,
+                        "relevance": "Medium",
+                        "score": 0.5,
+                        "matches": 1,
+                        "mention_count": 1,
+                        "first_mention_position": 0,
+                        "detection_method": "ai_fallback",
+                        "reason": "Detected via fallback method"
+                    })
+            
+            if detected_airlines:
+                logging.info(f"Fallback AI detection found {len(detected_airlines)} airlines")
+                return detected_airlines
+        except Exception as fallback_error:
+            logging.error(f"Fallback AI detection also failed: {str(fallback_error)}")
+        
+        return []
@@ -0,0 +1,292 @@
+"""Alert rules engine: rules compiled to predicates, indexed by airline and theme."""
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from src.config.alert_rules import ALERT_RULES
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ("Critical", "High", "Medium", "Low")
+
+# Idle subscribers get a keep-alive this often, which also detects closed connections
+ALERT_KEEPALIVE_SECONDS = 15
+SUBSCRIBER_QUEUE_SIZE = 100
+
+_RULE_KEYS = {
+    "id", "airline", "theme", "sentiment", "sentimentScoreAtMost", "sentimentScoreAbove",
+    "marketSignal", "signalStrength", "minContradictedClaims", "minContradictedShare",
+    "severity", "title", "message"
+}
+
+
+class _TemplateValues(dict):
+    def __missing__(self, key: str) -> str:
+        return ""
+
+
+class AnalysisFacts:
+    """The fields of one analysis that rules look at, extracted once per evaluation."""
+    
+    def __init__(self, analysis: Dict[str, Any], airline: str, themes: List[str]):
+        """
+        Extract facts.
+        
+        Args:
+            analysis: Analysis result
+            airline: Primary airline
+            themes: Analysis themes
+        """
+        sentiment = analysis.get("sentiment") or {}
+        correlation = analysis.get("correlation") or {}
+        self.airline = airline
+        self.themes = themes
+        self.sentiment = sentiment.get("overall")
+        self.score = sentiment.get("score")
+        self.summary = analysis.get("summary") or ""
+        self.signals = [
+            (str(signal.get("signal", "")), str(signal.get("strength", "")))
+            for signal in analysis.get("marketSignals") or []
+            if isinstance(signal, dict)
+        ]
+        self.claims = correlation.get("totalClaims") or 0
+        self.contradicted = correlation.get("contradictedCount") or 0
+        
+        # Every airline the analysis names, by lower-case name
+        names = [airline] + list(analysis.get("allAirlines") or []) + list((analysis.get("airlineThemeMap") or {}).keys())
+        self.airlines = {name.lower(): name for name in reversed(names) if name}
+
+
+class AlertRule:
+    """One alert rule compiled to a list of predicates over AnalysisFacts."""
+    
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Compile a rule from its configuration (see config/alert_rules.py).
+        
+        Raises:
+            ValueError: If the rule has unknown keys or invalid values
+        """
+        unknown = set(config) - _RULE_KEYS
+        if unknown:
+            raise ValueError(f"Alert rule {config.get('id')} has unknown keys: {', '.join(sorted(unknown))}")
+        if not config.get("id") or not config.get("title"):
+            raise ValueError(f"Alert rule needs an id and a title: {config}")
+        if config.get("severity", "Medium") not in SEVERITIES:
+            raise ValueError(f"Alert rule {config['id']} has unknown severity {config.get('severity')}")
+        
+        self.id = config["id"]
+        self.airline = config["airline"].lower() if config.get("airline") else None
+        self.theme = config["theme"].lower() if config.get("theme") else None
+        self.severity = config.get("severity", "Medium")
+        self.title = config["title"]
+        self.message = config.get("message", "")
+        
+        predicates: List[Callable[[AnalysisFacts], bool]] = []
+        if "sentiment" in config:
+            sentiment = config["sentiment"]
+            predicates.append(lambda facts: facts.sentiment == sentiment)
+        if "sentimentScoreAtMost" in config:
+            at_most = float(config["sentimentScoreAtMost"])
+            predicates.append(lambda facts: facts.score is not None and facts.score <= at_most)
+        if "sentimentScoreAbove" in config:
+            above = float(config["sentimentScoreAbove"])
+            predicates.append(lambda facts: facts.score is not None and facts.score > above)
+        if "minContradictedClaims" in config:
+            min_claims = int(config["minContradictedClaims"])
+            predicates.append(lambda facts: facts.contradicted >= min_claims)
+        if "minContradictedShare" in config:
+            min_share = float(config["minContradictedShare"])
+            predicates.append(lambda facts: facts.claims > 0 and facts.contradicted / facts.claims >= min_share)
+        self.predicates = predicates
+        
+        # The signal condition also names the signal that matched, for the templates
+        phrases = config.get("marketSignal") or []
+        self.signal_phrases = [phrases.lower()] if isinstance(phrases, str) else [p.lower() for p in phrases]
+        self.signal_strengths = set(config.get("signalStrength") or [])
+    
+    def _matching_signal(self, facts: AnalysisFacts) -> Optional[str]:
+        for signal, strength in facts.signals:
+            if self.signal_strengths and strength not in self.signal_strengths:
+                continue
+            lowered = signal.lower()
+            if any(phrase in lowered for phrase in self.signal_phrases):
+                return signal
+        return None
+    
+    def evaluate(self, facts: AnalysisFacts) -> Optional[Dict[str, str]]:
+        """
+        Evaluate the rule.
+        
+        Args:
+            facts: Facts of the analysis (already known to be in the rule's scope)
+        
+        Returns:
+            Alert ({"ruleId", "airline", "severity", "category", "title",
+            "message"}) or None
+        """
+        if not all(predicate(facts) for predicate in self.predicates):
+            return None
+        signal = ""
+        if self.signal_phrases or self.signal_strengths:
+            signal = self._matching_signal(facts)
+            if signal is None:
+                return None
+        
+        airline = facts.airlines[self.airline] if self.airline else facts.airline
+        category = self._theme_name(facts) or ", ".join(facts.themes or ["General"])
+        values = _TemplateValues(
+            airline=airline,
+            themes=category,
+            summary=facts.summary,
+            signal=signal,
+            contradicted=facts.contradicted,
+            claims=facts.claims
+        )
+        title = self.title.format_map(values)
+        return {
+            "ruleId": self.id,
+            "airline": airline,
+            "severity": self.severity,
+            "category": category,
+            "title": title,
+            "message": self.message.format_map(values).strip(" :") or title
+        }
+    
+    def _theme_name(self, facts: AnalysisFacts) -> Optional[str]:
+        """The analysis's spelling of the rule's theme, if the rule has one."""
+        if not self.theme:
+            return None
+        return next((theme for theme in facts.themes if theme.lower() == self.theme), None)
+
+
+class AlertRulesEngine:
+    """
+    Evaluates alert rules against each new analysis and pushes the alerts to subscribers.
+    
+    Rules are indexed by their (airline, theme) scope, with None for "any".
+    An analysis only looks up the scopes it can match: its airlines and
+    themes, and the wildcards. Rules scoped to other airlines or themes are
+    never evaluated, so adding them does not slow evaluation down.
+    """
+    
+    def __init__(self, rules: List[Dict[str, Any]]):
+        """
+        Compile and index rules.
+        
+        Args:
+            rules: Rule configurations (see config/alert_rules.py)
+        
+        Raises:
+            ValueError: If a rule is invalid or two rules share an id
+        """
+        self.rules = [AlertRule(config) for config in rules]
+        self.positions = {rule.id: position for position, rule in enumerate(self.rules)}
+        ids = [rule.id for rule in self.rules]
+        duplicates = {rule_id for rule_id in ids if ids.count(rule_id) > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate alert rule ids: {', '.join(sorted(duplicates))}")
+        
+        self.index: Dict[Tuple[Optional[str], Optional[str]], List[AlertRule]] = {}
+        for rule in self.rules:
+            self.index.setdefault((rule.airline, rule.theme), []).append(rule)
+        
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.evaluations = 0
+        self.rules_evaluated = 0
+        self.alerts_raised = 0
+        self.dropped = 0
+    
+    def evaluate(self, analysis: Dict[str, Any], airline: str, themes: List[str]) -> List[Dict[str, str]]:
+        """
+        Evaluate the rules in scope for an analysis.
+        
+        Args:
+            analysis: Analysis result
+            airline: Primary airline
+            themes: Analysis themes
+        
+        Returns:
+            Alerts raised, in rule order
+        """
+        facts = AnalysisFacts(analysis, airline, themes)
+        airline_keys = [None] + list(facts.airlines)
+        theme_keys = [None] + list(dict.fromkeys(theme.lower() for theme in themes))
+        
+        candidates = []
+        for airline_key in airline_keys:
+            for theme_key in theme_keys:
+                candidates.extend(self.index.get((airline_key, theme_key), []))
+        
+        candidates.sort(key=lambda rule: self.positions[rule.id])
+        alerts = []
+        for rule in candidates:
+            alert = rule.evaluate(facts)
+            if alert:
+                alerts.append(alert)
+        
+        self.evaluations += 1
+        self.rules_evaluated += len(candidates)
+        self.alerts_raised += len(alerts)
+        return alerts
+    
+    def publish(self, alerts: List[Dict[str, Any]]) -> None:
+        """Push stored alerts to every subscriber (dropped for subscribers that have fallen behind)."""
+        for queue in self.subscribers:
+            for alert in alerts:
+                try:
+                    queue.put_nowait(alert)
+                except asyncio.QueueFull:
+                    self.dropped += 1
+    
+    async def watch(self) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield alerts as they are stored, until the consumer stops.
+        
+        Yields:
+            Alert dicts (as listed by GET /api/alerts), or None after
+            ALERT_KEEPALIVE_SECONDS without one
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), ALERT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self.subscribers.discard(queue)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get rule, evaluation and subscriber counts for /api/metrics."""
+        return {
+            "rules": len(self.rules),
+            "evaluations": self.evaluations,
+            "rulesPerEvaluation": round(self.rules_evaluated / self.evaluations, 2) if self.evaluations else None,
+            "alertsRaised": self.alerts_raised,
+            "subscribers": len(self.subscribers),
+            "dropped": self.dropped
+        }
+
+
+def load_alert_rules() -> List[Dict[str, Any]]:
+    """Get the alert rules: ALERT_RULES_FILE (a JSON list) if set, otherwise config/alert_rules.py."""
+    if not settings.alert_rules_file:
+        return ALERT_RULES
+    with open(settings.alert_rules_file, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    logger.info(f"Loaded {len(rules)} alert rules from {settings.alert_rules_file}")
+    return rules
+
+
+_engine: Optional[AlertRulesEngine] = None
+
+
+def get_alert_rules_engine() -> AlertRulesEngine:
+    """Get the process-wide alert rules engine."""
+    global _engine
+    if _engine is None:
+        _engine = AlertRulesEngine(load_alert_rules())
+    return _engine
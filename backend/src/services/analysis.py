@@ -1,17 +1,83 @@
 """AI analysis service for extracting insights from transcribed text."""
-from typing import Dict, List, Any, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from datetime import datetime
-from openai import OpenAI
+import asyncio
+import uuid
 from src.config.settings import settings
 from src.config.airlines import (
+    AIRLINE_KEYWORDS,
+    airlines_from_ai_items,
     detect_airlines_in_text, 
-    detect_airlines_with_ai,
     get_primary_airline, 
     segment_text_by_airline, 
     map_airlines_to_themes, 
     map_themes_to_airlines
 )
-from src.config.themes import detect_themes_in_text
+from src.config.themes import THEME_KEYWORDS, detect_themes_in_text
+from src.services.airline_detection import detect_airlines_with_ai
+from src.services.correlation_jobs import CORRELATION_PRIORITY_INTERACTIVE, get_correlation_scheduler
+from src.services.local_analysis import extract_market_signals, score_sentiment
+from src.services.model_routing import complete_for_stage, json_response_check
+from src.services.openai_scheduler import create_openai_client
+from src.services.semantic_cache import get_semantic_cache
+from src.services.singleflight import SingleFlight, make_key
+from src.services.tiered_detection import get_tiered_detection_stats, keyword_detection_gap
+from src.services.request_context import (
+    DeadlineExceeded,
+    current_deadline,
+    drop_stage,
+    has_time_for,
+    remaining_seconds,
+    run_stage,
+    stage_scope
+)
+
+# "full": LLM pipeline; "fast": in-process only; "auto": fast, promoted to full when notable
+ANALYSIS_MODES = ("full", "fast", "auto")
+
+# Structured output for the consolidated extraction call (strict mode: every key required)
+CONSOLIDATED_EXTRACTION_SCHEMA: Dict[str, Any] = {
+    "name": "aviation_extraction",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "airlines": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "airline": {"type": "string"},
+                        "relevance": {"type": "string", "enum": ["High", "Medium", "Low"]},
+                        "confidence": {"type": "number"},
+                        "reason": {"type": "string"}
+                    },
+                    "required": ["airline", "relevance", "confidence", "reason"],
+                    "additionalProperties": False
+                }
+            },
+            "primaryAirline": {"type": ["string", "null"]},
+            "themes": {"type": "array", "items": {"type": "string"}},
+            "claims": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "text": {"type": "string"},
+                        "type": {"type": "string"},
+                        "airline": {"type": ["string", "null"]},
+                        "confidence": {"type": "number"}
+                    },
+                    "required": ["text", "type", "airline", "confidence"],
+                    "additionalProperties": False
+                }
+            },
+            "analysis": {"type": "string"}
+        },
+        "required": ["airlines", "primaryAirline", "themes", "claims", "analysis"],
+        "additionalProperties": False
+    }
+}
 
 
 class AnalysisService:
@@ -21,26 +87,257 @@ class AnalysisService:
         """Initialize analysis service."""
         if not settings.openai_api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        self.client = create_openai_client()
         self.model = settings.analysis_model
+        self.in_flight = SingleFlight()
     
     async def analyze_transcription(
         self, 
         transcription: str,
         airline_filter: Optional[str] = None,
-        theme_filter: Optional[str] = None
+        theme_filter: Optional[str] = None,
+        local_detection: Optional[Dict[str, Any]] = None,
+        news_service=None,
+        correlation_engine=None,
+        mode: str = "full",
+        analysis_id: Optional[str] = None,
+        correlation_priority: int = CORRELATION_PRIORITY_INTERACTIVE
     ) -> Dict[str, Any]:
         """
         Analyze transcribed text and extract insights.
         
+        In "fast" mode only in-process detection runs (see analyze_fast). In
+        "auto" mode the fast result is returned unless needs_full_analysis()
+        promotes the transcript to the full LLM pipeline.
+        
+        Concurrent calls for the same transcript and filters share one
+        analysis run (see SingleFlight) unless ANALYSIS_SINGLEFLIGHT_ENABLED
+        is false or an analysis_id is given. A caller joining a run waits
+        at most its own remaining deadline, then falls back to analyze_fast.
+        
+        With SEMANTIC_CACHE_ENABLED, near-duplicates of recent transcripts
+        reuse their news correlation (see _analyze_near_duplicate).
+        
+        Under a request deadline (see request_context), optional stages are
+        skipped or cut short when the budget runs low and the result gets a
+        "deadline" entry listing the dropped stages.
+        
         Args:
             transcription: Transcribed text
             airline_filter: Optional airline name to filter by
             theme_filter: Optional theme to filter by
+            local_detection: Optional precomputed keyword detections
+                ({"airlines": [...], "themes": [...]}), e.g. from a live
+                session's IncrementalKeywordMatcher, to skip rescanning the text
+            news_service: Optional NewsCorrelationService to share news fetches
+                across analyses (a new one is created per call otherwise)
+            correlation_engine: Optional CorrelationEngine to share embeddings
+                across analyses
+            mode: "full" (default), "fast" or "auto"
+            analysis_id: Optional id the background news correlation is
+                stored under (see _schedule_news_correlation); a new one is
+                generated otherwise
+            correlation_priority: News correlation priority, lower first
+                (see correlation_jobs.CORRELATION_PRIORITY_*)
             
         Returns:
             Analysis results with summary, keywords, themes, etc.
         """
+        if mode not in ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis mode: {mode}")
+        if mode != "full":
+            fast_analysis = self.analyze_fast(transcription, airline_filter, theme_filter, local_detection)
+            if mode == "fast" or not self.needs_full_analysis(fast_analysis):
+                return fast_analysis
+        
+        async def run() -> Dict[str, Any]:
+            analyze = lambda: self._analyze_transcription(
+                transcription,
+                airline_filter,
+                theme_filter,
+                local_detection,
+                news_service,
+                correlation_engine,
+                analysis_id,
+                correlation_priority
+            )
+            if settings.semantic_cache_enabled:
+                analysis = await self._analyze_near_duplicate(
+                    transcription,
+                    airline_filter,
+                    theme_filter,
+                    local_detection,
+                    analyze
+                )
+            else:
+                analysis = await analyze()
+            # Stages the run dropped under its (first caller's) deadline
+            deadline = current_deadline()
+            analysis["deadline"] = deadline.summary() if deadline else None
+            return analysis
+        
+        # A caller-chosen analysis_id names the correlation run, so it can't be shared
+        if not settings.analysis_singleflight_enabled or analysis_id is not None:
+            analysis = await run()
+            shared = False
+        else:
+            # local_detection is derived from the transcript itself and the shared
+            # services only affect reuse, so neither changes the result
+            key = make_key(transcription, airline_filter, theme_filter, self.model)
+            try:
+                analysis, shared = await self.in_flight.do(key, run, timeout=remaining_seconds())
+            except asyncio.TimeoutError:
+                drop_stage("aiAnalysis")
+                analysis = self.analyze_fast(transcription, airline_filter, theme_filter, local_detection)
+                shared = False
+        
+        return self._with_caller_deadline(analysis, shared)
+    
+    @staticmethod
+    def _with_caller_deadline(analysis: Dict[str, Any], shared: bool) -> Dict[str, Any]:
+        """
+        Report the calling request's own deadline on an analysis.
+        
+        A shared run was cut short by its first caller's deadline, so the
+        stages it dropped are reported along with the caller's own.
+        """
+        run_deadline = analysis.pop("deadline", None)
+        deadline = current_deadline()
+        if deadline:
+            summary = deadline.summary()
+            if shared and run_deadline:
+                dropped = summary["droppedStages"] + run_deadline["droppedStages"]
+                summary["droppedStages"] = list(dict.fromkeys(dropped))
+            analysis["deadline"] = summary
+        return analysis
+    
+    def analyze_fast(
+        self,
+        transcription: str,
+        airline_filter: Optional[str] = None,
+        theme_filter: Optional[str] = None,
+        local_detection: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze text in process, without LLM or network calls.
+        
+        Runs keyword airline and theme detection, lexicon sentiment and
+        rule-based market signals, for triage and bulk back-fills.
+        
+        Args:
+            transcription: Transcribed text
+            airline_filter: Optional airline name to filter by
+            theme_filter: Optional theme to filter by
+            local_detection: Optional precomputed keyword detections
+            
+        Returns:
+            Analysis in the same format as the full pipeline, with "mode": "fast"
+            and no news correlation
+        """
+        if local_detection is not None:
+            airlines = [dict(a) for a in local_detection.get("airlines", [])]
+            themes = list(local_detection.get("themes", []))
+        else:
+            airlines = detect_airlines_in_text(transcription)
+            themes = detect_themes_in_text(transcription)
+        for airline in airlines:
+            airline["detection_method"] = "keyword"
+        
+        if airline_filter:
+            airlines = [a for a in airlines if a["airline"].lower() == airline_filter.lower()]
+        if theme_filter:
+            themes = [t for t in themes if t.lower() == theme_filter.lower()]
+        
+        primary_airline = get_primary_airline(airlines) if airlines else None
+        analysis = self._fallback_analysis(transcription, airlines, themes, primary_airline)
+        analysis["mode"] = "fast"
+        return analysis
+    
+    async def _analyze_near_duplicate(
+        self,
+        transcription: str,
+        airline_filter: Optional[str],
+        theme_filter: Optional[str],
+        local_detection: Optional[Dict[str, Any]],
+        analyze: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Reuse a near-duplicate transcript's correlation, or run the full analysis.
+        
+        On a semantic cache hit the summary, detections, sentiment and market
+        signals are computed in process (as analyze_fast) and the cached news
+        correlation and claim verification are attached, so neither the
+        LLM analysis nor the correlation runs. Either way the result gets
+        "semanticCache": {"reused", "similarity"}.
+        
+        Args:
+            transcription: Transcribed text
+            airline_filter: Optional airline name to filter by
+            theme_filter: Optional theme to filter by
+            local_detection: Optional precomputed keyword detections
+            analyze: Runs the full pipeline on a miss
+            
+        Returns:
+            Analysis results
+        """
+        cache = get_semantic_cache()
+        embedding = await run_stage(
+            "semanticCache",
+            lambda: cache.embed(self.client, transcription),
+            None,
+            min_seconds=settings.deadline_stage_min_seconds
+        )
+        if embedding is None:
+            return await analyze()
+        
+        correlation, similarity = cache.lookup(embedding, airline_filter, theme_filter)
+        if correlation is None:
+            analysis = await analyze()
+            # A correlation cut short by the deadline is not worth reusing
+            deadline = current_deadline()
+            if not (deadline and deadline.dropped_stages):
+                cache.add(embedding, analysis, airline_filter, theme_filter)
+            analysis["semanticCache"] = {
+                "reused": False,
+                "similarity": round(similarity, 4) if similarity is not None else None
+            }
+            return analysis
+        
+        analysis = self.analyze_fast(transcription, airline_filter, theme_filter, local_detection)
+        analysis.pop("mode", None)
+        analysis["correlation"] = correlation
+        analysis["semanticCache"] = {"reused": True, "similarity": round(similarity, 4)}
+        return analysis
+    
+    def needs_full_analysis(self, fast_analysis: Dict[str, Any]) -> bool:
+        """
+        Decide whether a fast result is notable enough for the full LLM pipeline.
+        
+        Notable means a known airline plus a Strong market signal or
+        non-neutral sentiment.
+        
+        Args:
+            fast_analysis: Result of analyze_fast
+            
+        Returns:
+            True to promote the transcript to the full pipeline
+        """
+        if fast_analysis.get("primaryAirline") == settings.default_unknown_airline:
+            return False
+        strong_signal = any(s.get("strength") == "Strong" for s in fast_analysis.get("marketSignals", []))
+        return strong_signal or fast_analysis.get("sentiment", {}).get("overall") != "Neutral"
+    
+    async def _analyze_transcription(
+        self,
+        transcription: str,
+        airline_filter: Optional[str],
+        theme_filter: Optional[str],
+        local_detection: Optional[Dict[str, Any]],
+        news_service,
+        correlation_engine,
+        analysis_id: Optional[str],
+        correlation_priority: int
+    ) -> Dict[str, Any]:
         # Detect airlines using AI (primary method) with keyword fallback
         import logging
         logger = logging.getLogger(__name__)
@@ -49,27 +346,70 @@ class AnalysisService:
         ai_detected_airlines = []
         keyword_detected_airlines = []
         
+        # Keyword-based detection runs first: it is the backup for, and the
+        # local cross-check on, the AI detection
         try:
-            # Try AI detection first
-            logger.info(f"Attempting AI airline detection for text: {transcription[:100]}...")
-            ai_detected_airlines = await detect_airlines_with_ai(
-                transcription,
-                self.client,
-                self.model
-            )
-            logger.info(f"AI detection returned {len(ai_detected_airlines)} airlines")
-        except Exception as e:
-            logger.error(f"AI airline detection exception: {str(e)}", exc_info=True)
-            ai_detected_airlines = []
-        
-        # Always do keyword-based detection as backup
-        try:
-            keyword_detected_airlines = detect_airlines_in_text(transcription)
+            if local_detection is not None:
+                keyword_detected_airlines = [dict(a) for a in local_detection.get("airlines", [])]
+            else:
+                keyword_detected_airlines = detect_airlines_in_text(transcription)
             logger.info(f"Keyword detection returned {len(keyword_detected_airlines)} airlines")
         except Exception as e:
             logger.error(f"Keyword airline detection exception: {str(e)}", exc_info=True)
             keyword_detected_airlines = []
         
+        # Detect themes
+        if local_detection is not None:
+            detected_themes = list(local_detection.get("themes", []))
+        else:
+            detected_themes = detect_themes_in_text(transcription)
+        
+        # One structured call for airlines, primary airline, themes, claims and
+        # the analysis text; if it fails, the separate calls below run instead
+        consolidated = None
+        if settings.analysis_consolidated_enabled:
+            consolidated = await run_stage(
+                "consolidatedExtraction",
+                lambda: self._consolidated_extraction(
+                    transcription,
+                    keyword_detected_airlines,
+                    detected_themes,
+                    theme_filter=theme_filter
+                ),
+                None,
+                min_seconds=settings.deadline_stage_min_seconds
+            )
+        
+        if consolidated is not None:
+            ai_detected_airlines = consolidated["airlines"]
+            for theme in consolidated["themes"]:
+                if theme not in detected_themes:
+                    detected_themes.append(theme)
+        else:
+            # Tiered: the AI detector only runs when keyword detection is not decisive
+            tiers = get_tiered_detection_stats()
+            detect = lambda: detect_airlines_with_ai(transcription, self.client)
+            gap = keyword_detection_gap(keyword_detected_airlines)
+            if settings.tiered_detection_enabled and gap is None:
+                logger.info("Keyword detection is decisive, skipping AI airline detection")
+                tiers.record_skipped(keyword_detected_airlines, detect)
+            else:
+                if settings.tiered_detection_enabled:
+                    tiers.record_called(gap)
+                try:
+                    # Try AI detection (skipped when the request deadline is close)
+                    logger.info(f"Attempting AI airline detection for text: {transcription[:100]}...")
+                    ai_detected_airlines = await run_stage(
+                        "aiAirlineDetection",
+                        detect,
+                        [],
+                        min_seconds=settings.deadline_stage_min_seconds
+                    )
+                    logger.info(f"AI detection returned {len(ai_detected_airlines)} airlines")
+                except Exception as e:
+                    logger.error(f"AI airline detection exception: {str(e)}", exc_info=True)
+                    ai_detected_airlines = []
+        
         # Merge results: prefer AI results, but include keyword results if not found by AI
         if ai_detected_airlines:
             detected_airlines = ai_detected_airlines.copy()
@@ -94,9 +434,6 @@ class AnalysisService:
         else:
             logger.warning(f"No airlines detected for transcription: {transcription[:200]}...")
         
-        # Detect themes
-        detected_themes = detect_themes_in_text(transcription)
-        
         # Filter if specified
         if airline_filter:
             detected_airlines = [
@@ -114,10 +451,18 @@ class AnalysisService:
         primary_airline = get_primary_airline(detected_airlines) if detected_airlines else None
         
         # If multiple airlines detected, use AI to determine primary focus
-        if len(detected_airlines) > 1:
-            primary_airline = await self._determine_primary_airline(
-                transcription, 
-                detected_airlines
+        consolidated_primary = self._match_airline(
+            consolidated["primaryAirline"] if consolidated else None,
+            detected_airlines
+        )
+        if consolidated_primary:
+            primary_airline = consolidated_primary
+        elif len(detected_airlines) > 1:
+            primary_airline = await run_stage(
+                "primaryAirline",
+                lambda: self._determine_primary_airline(transcription, detected_airlines),
+                primary_airline,
+                min_seconds=settings.deadline_stage_min_seconds
             )
         
         # Generate AI summary with primary airline context
@@ -129,27 +474,39 @@ class AnalysisService:
             theme_filter=theme_filter
         )
         
+        claims = consolidated["claims"] if consolidated else None
+        
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert aviation market intelligence analyst. Analyze aviation market intelligence and extract key insights, market signals, and keywords. Provide structured responses with SUMMARY, MARKET SIGNALS, and KEYWORDS sections as requested."
-                    },
-                    {
-                        "role": "user",
-                        "content": analysis_prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=1000
-            )
-            
-            ai_response = response.choices[0].message.content
+            if consolidated and consolidated["analysis"]:
+                ai_response = consolidated["analysis"]
+            else:
+                if not has_time_for(settings.deadline_stage_min_seconds):
+                    drop_stage("aiAnalysis")
+                    raise DeadlineExceeded("No time left for AI analysis")
+                
+                with stage_scope("aiAnalysis"):
+                    response = await complete_for_stage(
+                        "analysis",
+                        self.client,
+                        hedge=True,
+                        messages=[
+                            {
+                                "role": "system",
+                                "content": "You are an expert aviation market intelligence analyst. Analyze aviation market intelligence and extract key insights, market signals, and keywords. Provide structured responses with SUMMARY, MARKET SIGNALS, and KEYWORDS sections as requested."
+                            },
+                            {
+                                "role": "user",
+                                "content": analysis_prompt
+                            }
+                        ],
+                        temperature=0.3,
+                        max_tokens=1000
+                    )
+                
+                ai_response = response.choices[0].message.content
             
             # Parse AI response and build structured analysis
-            analysis = self._parse_ai_response(
+            analysis = await self._parse_ai_response(
                 ai_response,
                 transcription,
                 detected_airlines,
@@ -159,11 +516,16 @@ class AnalysisService:
             )
             
             # Add news correlation if enabled
-            analysis = await self._add_news_correlation(
+            analysis = await self._schedule_news_correlation(
                 analysis,
                 transcription,
                 detected_airlines,
-                detected_themes
+                detected_themes,
+                news_service=news_service,
+                correlation_engine=correlation_engine,
+                claims=claims,
+                analysis_id=analysis_id,
+                priority=correlation_priority
             )
             
             return analysis
@@ -181,11 +543,16 @@ class AnalysisService:
             )
             
             # Add news correlation even for fallback
-            analysis = await self._add_news_correlation(
+            analysis = await self._schedule_news_correlation(
                 analysis,
                 transcription,
                 detected_airlines,
-                detected_themes
+                detected_themes,
+                news_service=news_service,
+                correlation_engine=correlation_engine,
+                claims=claims,
+                analysis_id=analysis_id,
+                priority=correlation_priority
             )
             
             return analysis
@@ -307,8 +674,10 @@ Detected airlines: {airline_list}
 
 Respond with ONLY the airline name that is the primary subject of this text. If multiple airlines are equally important, respond with the first one mentioned."""
             
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await complete_for_stage(
+                "primaryAirline",
+                self.client,
+                check=lambda content: self._match_airline(content, detected_airlines) is not None,
                 messages=[
                     {
                         "role": "system",
@@ -325,13 +694,8 @@ Respond with ONLY the airline name that is the primary subject of this text. If
             
             ai_response = response.choices[0].message.content.strip()
             
-            # Find matching airline
-            for airline in detected_airlines:
-                if airline['airline'].lower() in ai_response.lower() or ai_response.lower() in airline['airline'].lower():
-                    return airline
-            
-            # Fallback to highest scored airline
-            return detected_airlines[0]
+            # Find matching airline, falling back to the highest scored one
+            return self._match_airline(ai_response, detected_airlines) or detected_airlines[0]
             
         except Exception as e:
             import logging
@@ -339,6 +703,110 @@ Respond with ONLY the airline name that is the primary subject of this text. If
             # Fallback to highest scored airline
             return detected_airlines[0] if detected_airlines else None
     
+    def _match_airline(self, name: Optional[str], airlines: List[Dict]) -> Optional[Dict]:
+        """
+        Find the airline a model answer refers to.
+        
+        Args:
+            name: Airline name from a model response
+            airlines: Detected airlines to match against
+            
+        Returns:
+            First airline whose name contains, or is contained in, name; None if none match
+        """
+        answer = name.strip().lower() if isinstance(name, str) else ""
+        if not answer:
+            return None
+        for airline in airlines:
+            airline_name = airline.get('airline', '').lower()
+            if airline_name and (airline_name in answer or answer in airline_name):
+                return airline
+        return None
+    
+    async def _consolidated_extraction(
+        self,
+        transcription: str,
+        keyword_airlines: List[Dict],
+        keyword_themes: List[str],
+        theme_filter: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Extract airlines, primary airline, themes, claims and the analysis in one call.
+        
+        Replaces the separate airline detection, primary airline, analysis and
+        claim extraction calls, so the transcript is sent once.
+        
+        Args:
+            transcription: Full transcription text
+            keyword_airlines: Airlines found by keyword detection, given as hints
+            keyword_themes: Themes found by keyword detection, given as hints
+            theme_filter: Optional theme to focus the summary on
+            
+        Returns:
+            Dict with "airlines" (standard detection format), "primaryAirline",
+            "themes", "claims" and "analysis" (text in the SUMMARY / MARKET
+            SIGNALS / KEYWORDS format), or None if the call or its JSON failed
+        """
+        import json
+        import logging
+        logger = logging.getLogger(__name__)
+        
+        analysis_prompt = self._build_analysis_prompt(
+            transcription,
+            keyword_airlines,
+            keyword_themes,
+            theme_filter=theme_filter
+        )
+        prompt = f"""{analysis_prompt}
+
+ALSO EXTRACT:
+- "airlines": EVERY airline mentioned, directly, by code (e.g. "6E" = Indigo, "SG" = SpiceJet) or indirectly (e.g. "Tata's airline" = Air India). Use these EXACT names when they apply: {', '.join(AIRLINE_KEYWORDS.keys())}. Give each a "relevance" (High/Medium/Low), a "confidence" (0.0-1.0) and a brief "reason". Empty array if none.
+- "primaryAirline": the airline that is the primary subject of the text (the first one mentioned if several are equally important), or null.
+- "themes": the themes the text covers, from: {', '.join(THEME_KEYWORDS.keys())}.
+- "claims": factual claims (events, announcements, numbers, dates, business decisions, operational changes, safety incidents, technical issues), each with "text", "type" (event|announcement|number|decision|safety|other), "airline" (or null) and "confidence" (0.0-1.0).
+- "analysis": your answer to the analysis above, in the OUTPUT FORMAT shown."""
+        
+        try:
+            response = await complete_for_stage(
+                "consolidatedExtraction",
+                self.client,
+                check=json_response_check("analysis"),
+                hedge=True,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are an expert aviation market intelligence analyst. Identify airlines, themes and factual claims in the text and write the requested analysis. Return only JSON matching the schema."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                temperature=0.3,
+                max_tokens=2000,
+                response_format={"type": "json_schema", "json_schema": CONSOLIDATED_EXTRACTION_SCHEMA}
+            )
+            parsed = json.loads(response.choices[0].message.content)
+        except Exception as e:
+            logger.warning(f"Consolidated extraction failed, using separate calls: {str(e)}")
+            return None
+        
+        if not isinstance(parsed, dict):
+            return None
+        
+        airlines = airlines_from_ai_items(parsed.get("airlines", []), transcription)
+        airlines.sort(key=lambda x: x["score"], reverse=True)
+        themes = parsed.get("themes")
+        claims = parsed.get("claims")
+        analysis = parsed.get("analysis")
+        return {
+            "airlines": airlines[:5],
+            "primaryAirline": parsed.get("primaryAirline"),
+            "themes": [t for t in themes if t in THEME_KEYWORDS] if isinstance(themes, list) else [],
+            "claims": claims if isinstance(claims, list) else [],
+            "analysis": analysis if isinstance(analysis, str) else ""
+        }
+    
     def _is_valid_airline_name(self, name: str) -> bool:
         """
         Validate if an airline name is valid (not an error message or invalid text).
@@ -394,7 +862,7 @@ Respond with ONLY the airline name that is the primary subject of this text. If
         
         return True
     
-    def _parse_ai_response(
+    async def _parse_ai_response(
         self,
         ai_response: str,
         transcription: str,
@@ -446,8 +914,9 @@ Original text: "{transcription[:500]}"
 
 Return airline names only. If no airlines are mentioned, return nothing (empty response)."""
 
-                extraction_response = self.client.chat.completions.create(
-                    model=self.model,
+                extraction_response = await complete_for_stage(
+                    "airlineExtraction",
+                    self.client,
                     messages=[
                         {"role": "system", "content": "Extract airline names from text. Return only airline names, one per line. If no airlines are mentioned, return nothing."},
                         {"role": "user", "content": extraction_prompt}
@@ -1000,7 +1469,7 @@ Return airline names only. If no airlines are mentioned, return nothing (empty r
         themes: List[str],
         primary_airline: Optional[Dict] = None
     ) -> Dict[str, Any]:
-        """Fallback analysis using rule-based extraction."""
+        """Fallback analysis using rule-based extraction (also the fast mode result)."""
         # Generate a better summary from transcription
         summary = self._generate_fallback_summary(transcription)
         
@@ -1049,14 +1518,8 @@ Return airline names only. If no airlines are mentioned, return nothing (empty r
             "summary": summary,
             "keywords": self._extract_keywords("", transcription),
             "themes": themes[:3] if themes else ["General"],
-            "marketSignals": [
-                {"signal": "Content detected", "strength": "Moderate", "trend": "stable"}
-            ],
-            "sentiment": {
-                "overall": "Neutral",
-                "score": 0.5,
-                "breakdown": {"positive": 33, "neutral": 34, "negative": 33}
-            },
+            "marketSignals": extract_market_signals(transcription),
+            "sentiment": score_sentiment(transcription),
             "confidenceScore": 0.6,
             "predictiveProbabilities": [],
             "airlineSpecifications": airline_specs,
@@ -1070,12 +1533,70 @@ Return airline names only. If no airlines are mentioned, return nothing (empty r
             "correlation": None  # Will be populated by _add_news_correlation
         }
     
+    async def _schedule_news_correlation(
+        self,
+        analysis: Dict[str, Any],
+        transcription: str,
+        detected_airlines: List[Dict],
+        detected_themes: List[str],
+        news_service=None,
+        correlation_engine=None,
+        claims: Optional[List[Dict]] = None,
+        analysis_id: Optional[str] = None,
+        priority: int = CORRELATION_PRIORITY_INTERACTIVE
+    ) -> Dict[str, Any]:
+        """
+        Run news correlation under the correlation scheduler's concurrency limit.
+        
+        With CORRELATION_BACKGROUND the analysis is returned without waiting:
+        "correlation" stays None, "analysisId" names the run for
+        GET /api/analyses/{id}/correlation and "correlationStatus" is its
+        status when the analysis was returned.
+        
+        Args:
+            analysis: Analysis to add the correlation to
+            transcription: Transcribed text
+            detected_airlines: Detected airlines
+            detected_themes: Detected themes
+            news_service: Optional shared NewsCorrelationService
+            correlation_engine: Optional shared CorrelationEngine
+            claims: Optional claims already extracted by the consolidated call
+            analysis_id: Optional id for the background run
+            priority: Lower runs first
+        
+        Returns:
+            The analysis
+        """
+        correlate_args = (transcription, detected_airlines, detected_themes)
+        correlate_kwargs = {"news_service": news_service, "correlation_engine": correlation_engine, "claims": claims}
+        if not settings.correlation_enabled or not settings.newsapi_key:
+            # Nothing to schedule; _add_news_correlation logs why
+            return await self._add_news_correlation(analysis, *correlate_args, **correlate_kwargs)
+        
+        scheduler = get_correlation_scheduler()
+        if not settings.correlation_background:
+            async with scheduler.slot(priority):
+                return await self._add_news_correlation(analysis, *correlate_args, **correlate_kwargs)
+        
+        async def correlate() -> Optional[Dict[str, Any]]:
+            correlated = await self._add_news_correlation({"correlation": None}, *correlate_args, **correlate_kwargs)
+            return correlated["correlation"]
+        
+        analysis_id = analysis_id or uuid.uuid4().hex
+        run = scheduler.submit(analysis_id, correlate, priority)
+        analysis["analysisId"] = analysis_id
+        analysis["correlationStatus"] = run.status
+        return analysis
+    
     async def _add_news_correlation(
         self,
         analysis: Dict[str, Any],
         transcription: str,
         detected_airlines: List[Dict],
-        detected_themes: List[str]
+        detected_themes: List[str],
+        news_service=None,
+        correlation_engine=None,
+        claims: Optional[List[Dict]] = None
     ) -> Dict[str, Any]:
         """Add news correlation to analysis if enabled."""
         from src.config.settings import settings
@@ -1094,6 +1615,10 @@ Return airline names only. If no airlines are mentioned, return nothing (empty r
             logger.warning("News correlation skipped - NEWSAPI_KEY not configured in .env")
             return analysis
         
+        if not has_time_for(settings.deadline_correlation_min_seconds):
+            drop_stage("newsCorrelation")
+            return analysis
+        
         logger.info(f"Starting news correlation for {len(detected_airlines)} airlines and {len(detected_themes)} themes...")
         
         try:
@@ -1101,8 +1626,8 @@ Return airline names only. If no airlines are mentioned, return nothing (empty r
             logger.info("Starting news correlation...")
             
             # Initialize services
-            news_service = NewsCorrelationService()
-            correlation_engine = CorrelationEngine()
+            news_service = news_service or NewsCorrelationService()
+            correlation_engine = correlation_engine or CorrelationEngine()
             
             # Extract airline names
             airline_names = [a.get("airline", "") for a in detected_airlines if a.get("airline")]
@@ -1116,16 +1641,21 @@ Return airline names only. If no airlines are mentioned, return nothing (empty r
                 return analysis
             
             # First, try targeted search for relevant news
-            news_articles = await news_service.search_aviation_news(
+            news_articles, news_degraded = await news_service.search_aviation_news(
                 query=search_query,
                 airlines=airline_names if airline_names else None,
                 max_results=20
             )
             
             # If targeted search doesn't return enough results, get all aviation news
-            if len(news_articles) < 10:
+            # (not while the NewsAPI circuit is open; that would only fail again)
+            needs_more_news = len(news_articles) < 10 and not news_degraded
+            if needs_more_news and not has_time_for(settings.deadline_correlation_min_seconds):
+                drop_stage("newsSearchFallback")
+            elif needs_more_news:
                 logger.info("Targeted search returned few results, fetching all aviation news...")
-                all_news = await news_service.get_all_aviation_news(max_results=100)
+                all_news, all_news_degraded = await news_service.get_all_aviation_news(max_results=100)
+                news_degraded = news_degraded or all_news_degraded
                 # Combine and deduplicate by URL
                 existing_urls = {a.get("url", "") for a in news_articles}
                 for article in all_news:
@@ -1141,17 +1671,24 @@ Return airline names only. If no airlines are mentioned, return nothing (empty r
                     "verificationStatus": "unverified",
                     "supportingReferences": []
                 }
+                if news_degraded:
+                    analysis["correlation"]["error"] = "News service unavailable"
                 return analysis
             
             # Use comprehensive verification (extracts claims and verifies them)
-            correlation_data = await correlation_engine.verify_gossip_correctness(
-                transcription,
-                news_articles,
-                airline_names,
-                detected_themes
-            )
+            with stage_scope("claimVerification"):
+                correlation_data = await correlation_engine.verify_gossip_correctness(
+                    transcription,
+                    news_articles,
+                    airline_names,
+                    detected_themes,
+                    claims=claims
+                )
             
             analysis["correlation"] = correlation_data
+            if news_degraded:
+                # Verified against the last good news result while NewsAPI is unavailable
+                analysis["correlation"]["newsFromCache"] = True
             logger.info(f"News correlation completed: {correlation_data.get('verificationStatus')} ({correlation_data.get('correlationScore', 0):.2f})")
             
         except Exception as e:
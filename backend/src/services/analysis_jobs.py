@@ -0,0 +1,190 @@
+"""Background analysis jobs: provisional results now, full LLM analysis later."""
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+from src.config.settings import settings
+from src.services.request_context import start_deadline
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisJob:
+    """One analysis: its provisional result and, once finished, the full result."""
+    
+    def __init__(self, provisional: Dict[str, Any], transcription: str):
+        """
+        Initialize pending job.
+        
+        Args:
+            provisional: Local analysis returned to the client right away
+            transcription: Transcribed text being analyzed
+        """
+        self.id = uuid.uuid4().hex
+        self.status = "pending"
+        self.transcription = transcription
+        self.provisional = provisional
+        self.analysis: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.updated_at = self.created_at
+        self.finished_at: Optional[float] = None
+        self.changed = asyncio.Event()
+    
+    def update(self, status: str) -> None:
+        """Set the status and wake anyone waiting for a change."""
+        self.status = status
+        self.updated_at = datetime.now().isoformat()
+        if status in ("complete", "failed"):
+            self.finished_at = time.monotonic()
+        self.changed.set()
+        self.changed = asyncio.Event()
+    
+    @property
+    def done(self) -> bool:
+        """Whether the full analysis has finished (successfully or not)."""
+        return self.status in ("complete", "failed")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the job for GET /api/analyses/{id}."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "transcription": self.transcription,
+            "provisional": self.provisional,
+            "analysis": self.analysis,
+            "error": self.error,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at
+        }
+
+
+class AnalysisJobStore:
+    """
+    In-process store of background analysis jobs.
+    
+    Finished jobs are kept for ANALYSIS_JOB_TTL_SECONDS, and at most
+    ANALYSIS_JOB_MAX_ENTRIES jobs are held (oldest evicted first), so
+    clients must fetch results within that window.
+    """
+    
+    def __init__(self):
+        """Initialize empty store."""
+        self.jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self.ttl_seconds = settings.analysis_job_ttl_seconds
+        self.max_entries = settings.analysis_job_max_entries
+        self._tasks: Set[asyncio.Task] = set()
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+    
+    def _evict(self) -> None:
+        now = time.monotonic()
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.ttl_seconds
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+        while len(self.jobs) > self.max_entries:
+            self.jobs.popitem(last=False)
+    
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """Get a job by id, or None if unknown or expired."""
+        self._evict()
+        return self.jobs.get(job_id)
+    
+    def start(
+        self,
+        transcription: str,
+        provisional: Dict[str, Any],
+        analyze: Callable[[str], Awaitable[Dict[str, Any]]]
+    ) -> AnalysisJob:
+        """
+        Store a provisional result and run the full analysis in the background.
+        
+        The background run gets its own REQUEST_DEADLINE_SECONDS budget,
+        since the request that started it has already returned.
+        
+        Args:
+            transcription: Transcribed text
+            provisional: Local analysis returned to the client right away
+            analyze: Coroutine function running the full analysis, given the
+                job id (so a background correlation can be stored under it)
+        
+        Returns:
+            The new job
+        """
+        job = AnalysisJob(provisional, transcription)
+        self.jobs[job.id] = job
+        self._evict()
+        self.started += 1
+        
+        task = asyncio.create_task(self._run(job, analyze))
+        # Keep a reference so the task is not garbage collected mid-run
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+    
+    async def _run(self, job: AnalysisJob, analyze: Callable[[str], Awaitable[Dict[str, Any]]]) -> None:
+        start_deadline(settings.request_deadline_seconds)
+        job.update("running")
+        try:
+            job.analysis = await analyze(job.id)
+            self.completed += 1
+            job.update("complete")
+        except Exception as e:
+            logger.error(f"Background analysis {job.id} failed: {str(e)}", exc_info=True)
+            job.error = str(e)
+            self.failed += 1
+            job.update("failed")
+    
+    async def watch(self, job: AnalysisJob, timeout: float) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the job now and after every status change until it finishes.
+        
+        Args:
+            job: Job to watch
+            timeout: Seconds to wait for each change before giving up
+        
+        Yields:
+            Job dicts (see AnalysisJob.to_dict)
+        """
+        last_status = None
+        while True:
+            # The status may have changed while the caller was sending the
+            # last update, so compare rather than rely on the change event
+            if job.status != last_status:
+                last_status = job.status
+                yield job.to_dict()
+                continue
+            if job.done:
+                return
+            try:
+                await asyncio.wait_for(job.changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                return
+    
+    def stats(self) -> Dict[str, int]:
+        """Get job counts for /api/metrics."""
+        return {
+            "stored": len(self.jobs),
+            "running": len(self._tasks),
+            "started": self.started,
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+
+_store: Optional[AnalysisJobStore] = None
+
+
+def get_analysis_job_store() -> AnalysisJobStore:
+    """Get the process-wide analysis job store."""
+    global _store
+    if _store is None:
+        _store = AnalysisJobStore()
+    return _store
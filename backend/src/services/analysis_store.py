@@ -0,0 +1,582 @@
+"""Persistent analysis history in SQLite, with indexed, cursor-paginated queries."""
+import asyncio
+import base64
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from src.config.settings import settings
+from src.services.alert_rules import get_alert_rules_engine
+from src.services.signal_timeseries import get_signal_timeseries
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Every list query walks one of these (column, created_at, seq) indexes newest
+# first, so a page costs the same however many rows are stored
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL,
+    primary_airline TEXT COLLATE NOCASE,
+    sentiment TEXT COLLATE NOCASE,
+    sentiment_score REAL,
+    themes TEXT NOT NULL,
+    summary TEXT,
+    transcription TEXT NOT NULL,
+    analysis TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_created ON analyses (created_at, seq);
+CREATE INDEX IF NOT EXISTS idx_analyses_airline ON analyses (primary_airline, created_at, seq);
+CREATE INDEX IF NOT EXISTS idx_analyses_sentiment ON analyses (sentiment, created_at, seq);
+
+CREATE TABLE IF NOT EXISTS analysis_themes (
+    theme TEXT NOT NULL COLLATE NOCASE,
+    created_at REAL NOT NULL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (theme, created_at, seq)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS alerts (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    analysis_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    airline TEXT COLLATE NOCASE,
+    severity TEXT NOT NULL COLLATE NOCASE,
+    category TEXT,
+    title TEXT NOT NULL,
+    message TEXT NOT NULL,
+    rule_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_created ON alerts (created_at, seq);
+CREATE INDEX IF NOT EXISTS idx_alerts_airline ON alerts (airline, created_at, seq);
+CREATE INDEX IF NOT EXISTS idx_alerts_severity ON alerts (severity, created_at, seq);
+
+CREATE TABLE IF NOT EXISTS heatmap_buckets (
+    bucket_start REAL NOT NULL,
+    airline TEXT NOT NULL,
+    theme TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    sentiment_sum REAL NOT NULL,
+    PRIMARY KEY (bucket_start, airline, theme)
+) WITHOUT ROWID;
+"""
+
+# PRAGMA user_version of a database with every table above filled in
+SCHEMA_VERSION = 3
+
+HEATMAP_UPSERT = (
+    "INSERT INTO heatmap_buckets (bucket_start, airline, theme, count, sentiment_sum) VALUES (?, ?, ?, 1, ?) "
+    "ON CONFLICT (bucket_start, airline, theme) DO UPDATE SET "
+    "count = count + 1, sentiment_sum = sentiment_sum + excluded.sentiment_sum"
+)
+
+
+def encode_cursor(created_at: float, seq: int) -> str:
+    """Encode the position after a row as an opaque page cursor."""
+    return base64.urlsafe_b64encode(f"{created_at!r}:{seq}".encode("ascii")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """
+    Decode a page cursor from encode_cursor.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, seq = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii").split(":")
+        return float(created_at), int(seq)
+    except (UnicodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    """
+    Parse an ISO 8601 time filter to a Unix timestamp.
+    
+    Raises:
+        ValueError: If the value is not ISO 8601
+    """
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError as e:
+        raise ValueError(f"Invalid time '{value}', expected ISO 8601") from e
+
+
+def heatmap_pairs(analysis: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Get the (airline, theme) cells an analysis counts towards.
+    
+    Args:
+        analysis: Analysis result
+    
+    Returns:
+        Distinct pairs from the analysis's airlineThemeMap
+    """
+    pairs = []
+    for airline, themes in (analysis.get("airlineThemeMap") or {}).items():
+        for theme in dict.fromkeys(themes or []):
+            if airline and theme:
+                pairs.append((airline, theme))
+    return pairs
+
+
+def _primary_airline(analysis: Dict[str, Any]) -> str:
+    # Same rule as the API response's "airline" field
+    primary_airline = analysis.get("primaryAirline")
+    if primary_airline:
+        return primary_airline
+    specs = analysis.get("airlineSpecifications") or []
+    primary_spec = next((spec for spec in specs if spec.get("isPrimary")), specs[0] if specs else {})
+    return primary_spec.get("airline") or settings.default_unknown_airline
+
+
+class AnalysisStore:
+    """
+    SQLite store of completed analyses and the alerts they raise.
+    
+    Alert rules (see AlertRulesEngine) are evaluated once per analysis as
+    it is written; the alerts are stored with it and then pushed to
+    subscribers. Written analyses are also added to the in-memory signal
+    time series (see SignalTimeSeries), which is refilled from the stored
+    analyses on startup.
+    
+    The database runs in WAL mode so dashboard reads never wait on writes.
+    Writes run in worker threads on their own connection, one at a time;
+    reads use the main connection on the event loop.
+    Each write also adds the analysis to an airline x theme count and
+    sentiment-sum matrix per HEATMAP_BUCKET_SECONDS bucket, so the heatmap
+    sums a few precomputed buckets instead of scanning analyses.
+    Lists are paginated by keyset: the cursor is the (created_at, seq)
+    position of the last row returned, which the indexes seek to directly
+    instead of skipping over earlier pages.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize store, creating the database if needed.
+        
+        Args:
+            path: Database file (default ANALYSIS_STORE_PATH)
+        """
+        self.path = path or settings.analysis_store_path
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = self._connect()
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.bucket_seconds = settings.heatmap_bucket_seconds
+        self.connection.executescript(SCHEMA)
+        self._migrate()
+        self._writer = self._connect()
+        self._write_lock = threading.Lock()
+        self.rules = get_alert_rules_engine()
+        self.signals = get_signal_timeseries()
+        self._replay_signals()
+        self.saved = 0
+    
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        # WAL keeps the database consistent on a crash; NORMAL only risks the last commits on power loss
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+    
+    def _migrate(self) -> None:
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        if version < 2:
+            self._rebuild_heatmap()
+        alert_columns = {row["name"] for row in self.connection.execute("PRAGMA table_info(alerts)")}
+        if "rule_id" not in alert_columns:
+            self.connection.execute("ALTER TABLE alerts ADD COLUMN rule_id TEXT")
+        self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    async def save(
+        self,
+        transcription: str,
+        analysis: Dict[str, Any],
+        analysis_id: Optional[str] = None
+    ) -> str:
+        """
+        Store an analysis and its alerts without blocking the event loop.
+        
+        The transaction, rule evaluation and heatmap update run in a worker
+        thread (see write()); alerts are then pushed to subscribers and the
+        analysis added to the signal time series on the event loop.
+        
+        Args:
+            transcription: Transcribed text
+            analysis: Analysis result
+            analysis_id: Optional id (analysisId of the analysis, or a new one)
+        
+        Returns:
+            The analysis id
+        """
+        analysis_id, alerts, created_at = await asyncio.to_thread(self.write, transcription, analysis, analysis_id)
+        if alerts is not None:
+            # Only once committed, so subscribers never see an alert that was rolled back
+            self.rules.publish(alerts)
+            self.signals.add(analysis, created_at)
+        return analysis_id
+    
+    def write(
+        self,
+        transcription: str,
+        analysis: Dict[str, Any],
+        analysis_id: Optional[str] = None
+    ) -> Tuple[str, Optional[List[Dict[str, Any]]], float]:
+        """
+        Store an analysis and its alerts (blocking; writes are serialized).
+        
+        An analysis id that is already stored (e.g. a run shared by
+        concurrent requests) is not stored again.
+        
+        Args:
+            transcription: Transcribed text
+            analysis: Analysis result
+            analysis_id: Optional id (analysisId of the analysis, or a new one)
+        
+        Returns:
+            Tuple of (analysis id, alerts raised or None if the analysis was
+            already stored, creation time)
+        """
+        analysis_id = analysis_id or analysis.get("analysisId") or uuid.uuid4().hex
+        created_at = time.time()
+        airline = _primary_airline(analysis)
+        themes = [theme for theme in analysis.get("themes") or [] if theme]
+        sentiment = analysis.get("sentiment") or {}
+        
+        with self._write_lock, self._writer:
+            self._writer.execute("BEGIN")
+            cursor = self._writer.execute(
+                "INSERT OR IGNORE INTO analyses "
+                "(id, created_at, primary_airline, sentiment, sentiment_score, themes, summary, transcription, analysis) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    analysis_id,
+                    created_at,
+                    airline,
+                    sentiment.get("overall"),
+                    sentiment.get("score"),
+                    json.dumps(themes),
+                    analysis.get("summary"),
+                    transcription,
+                    json.dumps(analysis, default=str)
+                )
+            )
+            if not cursor.rowcount:
+                return analysis_id, None, created_at
+            seq = cursor.lastrowid
+            self._writer.executemany(
+                "INSERT OR IGNORE INTO analysis_themes (theme, created_at, seq) VALUES (?, ?, ?)",
+                [(theme, created_at, seq) for theme in themes]
+            )
+            alerts = []
+            for alert in self.rules.evaluate(analysis, airline, themes):
+                alert_cursor = self._writer.execute(
+                    "INSERT INTO alerts (analysis_id, created_at, airline, severity, category, title, message, rule_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (analysis_id, created_at, alert["airline"], alert["severity"], alert["category"], alert["title"], alert["message"], alert["ruleId"])
+                )
+                alerts.append(self._alert_item({**alert, "seq": alert_cursor.lastrowid, "analysis_id": analysis_id, "created_at": created_at, "rule_id": alert["ruleId"]}))
+            self._add_to_heatmap(self._writer, analysis, created_at)
+            self.saved += 1
+        return analysis_id, alerts, created_at
+    
+    def _replay_signals(self) -> None:
+        horizon = time.time() - self.signals.capacity * self.signals.bucket_seconds
+        rows = self.connection.execute(
+            "SELECT created_at, analysis FROM analyses WHERE created_at >= ? ORDER BY created_at, seq",
+            (horizon,)
+        )
+        for row in rows:
+            self.signals.add(json.loads(row["analysis"]), row["created_at"])
+    
+    def _bucket_start(self, timestamp: float) -> float:
+        return timestamp - timestamp % self.bucket_seconds
+    
+    def _add_to_heatmap(self, connection: sqlite3.Connection, analysis: Dict[str, Any], created_at: float) -> None:
+        score = (analysis.get("sentiment") or {}).get("score")
+        score = 0.5 if score is None else score
+        bucket_start = self._bucket_start(created_at)
+        connection.executemany(
+            HEATMAP_UPSERT,
+            [(bucket_start, airline, theme, score) for airline, theme in heatmap_pairs(analysis)]
+        )
+    
+    def _rebuild_heatmap(self) -> None:
+        # Analyses stored before the heatmap existed
+        with self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.execute("DELETE FROM heatmap_buckets")
+            for row in self.connection.execute("SELECT created_at, analysis FROM analyses"):
+                self._add_to_heatmap(self.connection, json.loads(row["analysis"]), row["created_at"])
+    
+    def _page(
+        self,
+        table: str,
+        columns: str,
+        filters: List[Tuple[str, Any]],
+        limit: int,
+        cursor: Optional[str],
+        since: Optional[str],
+        until: Optional[str],
+        join: str = ""
+    ) -> Tuple[List[sqlite3.Row], Optional[str]]:
+        # The ordering columns come from the joined table when there is one,
+        # so the query walks that table's index
+        order_table = "t" if join else "r"
+        conditions = [f"{column} = ?" for column, _ in filters]
+        params = [value for _, value in filters]
+        since_ts = parse_time(since)
+        until_ts = parse_time(until)
+        if since_ts is not None:
+            conditions.append(f"{order_table}.created_at >= ?")
+            params.append(since_ts)
+        if until_ts is not None:
+            conditions.append(f"{order_table}.created_at < ?")
+            params.append(until_ts)
+        if cursor:
+            conditions.append(f"({order_table}.created_at, {order_table}.seq) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        
+        query = f"SELECT {columns} FROM {table} r {join}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {order_table}.created_at DESC, {order_table}.seq DESC LIMIT ?"
+        # One extra row tells whether there is a next page
+        rows = self.connection.execute(query, params + [limit + 1]).fetchall()
+        next_cursor = encode_cursor(rows[limit - 1]["created_at"], rows[limit - 1]["seq"]) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+    
+    def list_analyses(
+        self,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        airline: Optional[str] = None,
+        theme: Optional[str] = None,
+        sentiment: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        List stored analyses, newest first.
+        
+        Args:
+            limit: Page size (capped at MAX_PAGE_SIZE)
+            cursor: "nextCursor" of the previous page
+            airline: Optional primary airline (case-insensitive)
+            theme: Optional theme (case-insensitive)
+            sentiment: Optional overall sentiment ("Positive", "Neutral", "Negative")
+            since: Optional ISO 8601 time, inclusive
+            until: Optional ISO 8601 time, exclusive
+        
+        Returns:
+            {"items": [...], "nextCursor": str or None}
+        
+        Raises:
+            ValueError: If the cursor or a time is malformed
+        """
+        filters = []
+        if airline:
+            filters.append(("r.primary_airline", airline))
+        if sentiment:
+            filters.append(("r.sentiment", sentiment))
+        join = ""
+        if theme:
+            join = "JOIN analysis_themes t ON t.seq = r.seq"
+            filters.append(("t.theme", theme))
+        
+        rows, next_cursor = self._page(
+            "analyses",
+            "r.seq, r.id, r.created_at, r.primary_airline, r.sentiment, r.sentiment_score, r.themes, r.summary",
+            filters,
+            limit,
+            cursor,
+            since,
+            until,
+            join
+        )
+        return {
+            "items": [
+                {
+                    "id": row["id"],
+                    "createdAt": datetime.fromtimestamp(row["created_at"]).isoformat(),
+                    "airline": row["primary_airline"],
+                    "themes": json.loads(row["themes"]),
+                    "sentiment": row["sentiment"],
+                    "score": row["sentiment_score"],
+                    "summary": row["summary"]
+                }
+                for row in rows
+            ],
+            "nextCursor": next_cursor
+        }
+    
+    def get_analysis(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a stored analysis with its transcription.
+        
+        Returns:
+            {"id", "createdAt", "transcription", "analysis"} or None
+        """
+        row = self.connection.execute(
+            "SELECT id, created_at, transcription, analysis FROM analyses WHERE id = ?",
+            (analysis_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "createdAt": datetime.fromtimestamp(row["created_at"]).isoformat(),
+            "transcription": row["transcription"],
+            "analysis": json.loads(row["analysis"])
+        }
+    
+    def list_alerts(
+        self,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        airline: Optional[str] = None,
+        severity: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        List stored alerts, newest first.
+        
+        Args:
+            limit: Page size (capped at MAX_PAGE_SIZE)
+            cursor: "nextCursor" of the previous page
+            airline: Optional airline (case-insensitive)
+            severity: Optional severity ("Critical", "High", "Medium", "Low")
+            since: Optional ISO 8601 time, inclusive
+            until: Optional ISO 8601 time, exclusive
+        
+        Returns:
+            {"items": [...], "nextCursor": str or None}
+        
+        Raises:
+            ValueError: If the cursor or a time is malformed
+        """
+        filters = []
+        if airline:
+            filters.append(("r.airline", airline))
+        if severity:
+            filters.append(("r.severity", severity))
+        
+        rows, next_cursor = self._page(
+            "alerts",
+            "r.seq, r.analysis_id, r.created_at, r.airline, r.severity, r.category, r.title, r.message, r.rule_id",
+            filters,
+            limit,
+            cursor,
+            since,
+            until
+        )
+        return {"items": [self._alert_item(row) for row in rows], "nextCursor": next_cursor}
+    
+    @staticmethod
+    def _alert_item(row: Any) -> Dict[str, Any]:
+        return {
+            "id": row["seq"],
+            "analysisId": row["analysis_id"],
+            "ruleId": row["rule_id"],
+            "title": row["title"],
+            "message": row["message"],
+            "severity": row["severity"],
+            "airline": row["airline"],
+            "category": row["category"],
+            "categories": row["category"].split(", ") if row["category"] else [],
+            "timestamp": datetime.fromtimestamp(row["created_at"]).isoformat()
+        }
+    
+    def heatmap(self, since: Optional[str] = None, until: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the airline x theme matrix over a time range.
+        
+        The range is widened to whole buckets: since is rounded down to the
+        start of its bucket, and the bucket containing until is included
+        unless until falls on its start.
+        
+        Args:
+            since: Optional ISO 8601 time, inclusive
+            until: Optional ISO 8601 time, exclusive
+        
+        Returns:
+            {"from", "to", "bucketSeconds", "airlines", "themes", "cells":
+            [{"airline", "theme", "count", "meanSentiment"}]}, airlines and
+            themes ordered by total count
+        
+        Raises:
+            ValueError: If a time is malformed
+        """
+        since_ts = parse_time(since)
+        until_ts = parse_time(until)
+        conditions = []
+        params = []
+        if since_ts is not None:
+            conditions.append("bucket_start >= ?")
+            params.append(self._bucket_start(since_ts))
+        if until_ts is not None:
+            conditions.append("bucket_start < ?")
+            params.append(until_ts)
+        query = "SELECT airline, theme, SUM(count) AS count, SUM(sentiment_sum) AS sentiment_sum FROM heatmap_buckets"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " GROUP BY airline, theme"
+        
+        cells = []
+        airline_totals: Dict[str, int] = {}
+        theme_totals: Dict[str, int] = {}
+        for row in self.connection.execute(query, params):
+            cells.append({
+                "airline": row["airline"],
+                "theme": row["theme"],
+                "count": row["count"],
+                "meanSentiment": round(row["sentiment_sum"] / row["count"], 3)
+            })
+            airline_totals[row["airline"]] = airline_totals.get(row["airline"], 0) + row["count"]
+            theme_totals[row["theme"]] = theme_totals.get(row["theme"], 0) + row["count"]
+        return {
+            "from": since,
+            "to": until,
+            "bucketSeconds": self.bucket_seconds,
+            "airlines": sorted(airline_totals, key=airline_totals.get, reverse=True),
+            "themes": sorted(theme_totals, key=theme_totals.get, reverse=True),
+            "cells": cells
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get row counts for /api/metrics."""
+        return {
+            "path": self.path,
+            "savedSinceStart": self.saved,
+            "analyses": self.connection.execute("SELECT MAX(seq) FROM analyses").fetchone()[0] or 0,
+            "alerts": self.connection.execute("SELECT MAX(seq) FROM alerts").fetchone()[0] or 0
+        }
+
+
+_store: Optional[AnalysisStore] = None
+
+
+def get_analysis_store() -> Optional[AnalysisStore]:
+    """Get the process-wide analysis store, or None if ANALYSIS_STORE_ENABLED is false."""
+    global _store
+    if _store is None and settings.analysis_store_enabled:
+        _store = AnalysisStore()
+    return _store
@@ -0,0 +1,409 @@
+"""Columnar analytics segments compacted from the analysis store, for group-by queries."""
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from src.config.settings import settings
+from src.services.analysis_store import parse_time
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_GROUPS = ("airline", "theme", "time")
+ANALYTICS_INTERVALS = ("day", "week", "month", "quarter")
+
+# Dictionary-encoded sentiment; -1 for anything else
+SENTIMENTS = ("Positive", "Neutral", "Negative")
+_SENTIMENT_IDS = {name.lower(): index for index, name in enumerate(SENTIMENTS)}
+_NEGATIVE = _SENTIMENT_IDS["negative"]
+
+# One .npy file per column; theme_rows/theme_ids pair each row with its themes
+COLUMNS = {
+    "created_at": np.float64,
+    "airline": np.int32,
+    "sentiment": np.int8,
+    "score": np.float32,
+    "theme_rows": np.int32,
+    "theme_ids": np.int32
+}
+
+COMPACTION_BATCH_ROWS = 50000
+
+
+def _write_json(path: str, data: Any) -> None:
+    # Written aside and renamed, so readers never see a partial file
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temporary, path)
+
+
+def _concatenate(parts: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Concatenate column sets, renumbering theme_rows."""
+    offsets = np.cumsum([0] + [len(part["created_at"]) for part in parts[:-1]])
+    columns = {
+        column: np.concatenate([part[column] for part in parts])
+        for column in COLUMNS if column != "theme_rows"
+    }
+    columns["theme_rows"] = np.concatenate([part["theme_rows"] + offset for part, offset in zip(parts, offsets)]).astype(np.int32)
+    return columns
+
+
+def _bucket_starts(created_at: np.ndarray, interval: str) -> np.ndarray:
+    """Start of each timestamp's UTC day, week (Monday), month or quarter, as datetime64[D]."""
+    days = created_at.astype("datetime64[s]").astype("datetime64[D]")
+    if interval == "day":
+        return days
+    if interval == "week":
+        # Day 0 (1970-01-01) was a Thursday
+        return days - ((days.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+    months = days.astype("datetime64[M]")
+    if interval == "quarter":
+        months = months - (months.astype(np.int64) % 3).astype("timedelta64[M]")
+    return months.astype("datetime64[D]")
+
+
+class AnalyticsSegments:
+    """
+    Historical analyses as memory-mapped columnar segments.
+    
+    Compaction copies analyses stored since the last run from the SQLite
+    analysis store into segments of up to ANALYTICS_SEGMENT_ROWS rows: one
+    .npy file per column, with airlines and themes encoded as ids into
+    shared dictionaries. A partly filled last segment is rewritten with the
+    new rows rather than followed by a small one. Queries filter and
+    aggregate each segment with vectorized NumPy operations and never touch
+    SQLite, so they only see analyses up to the last compaction.
+    """
+    
+    def __init__(self, directory: Optional[str] = None, store_path: Optional[str] = None):
+        """
+        Initialize segments, loading the manifest if one exists.
+        
+        Args:
+            directory: Segment directory (default ANALYTICS_SEGMENTS_DIR)
+            store_path: Analysis store database (default ANALYSIS_STORE_PATH)
+        """
+        self.directory = directory or settings.analytics_segments_dir
+        self.store_path = store_path or settings.analysis_store_path
+        self.segment_rows = settings.analytics_segment_rows
+        os.makedirs(self.directory, exist_ok=True)
+        self.manifest_path = os.path.join(self.directory, "manifest.json")
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"segments": [], "lastSeq": 0, "lastCreatedAt": None, "airlines": [], "themes": []}
+        self._segment_cache: Dict[str, Dict[str, np.ndarray]] = {}
+        self._compaction_lock = threading.Lock()
+        self._retired = set()
+        self.compactions = 0
+    
+    def _segment_path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+    
+    def _load_segment(self, name: str) -> Dict[str, np.ndarray]:
+        segment = self._segment_cache.get(name)
+        if segment is None:
+            path = self._segment_path(name)
+            segment = {
+                column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode="r")
+                for column in COLUMNS
+            }
+            self._segment_cache[name] = segment
+        return segment
+    
+    def _write_segment(self, name: str, columns: Dict[str, np.ndarray]) -> None:
+        path = self._segment_path(name)
+        temporary = path + ".tmp"
+        shutil.rmtree(temporary, ignore_errors=True)
+        os.makedirs(temporary)
+        for column, dtype in COLUMNS.items():
+            np.save(os.path.join(temporary, f"{column}.npy"), np.ascontiguousarray(columns[column], dtype=dtype))
+        # Names come from the manifest's segment counter, so a run that died
+        # before saving its manifest left an unreferenced segment under this name
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(temporary, path)
+    
+    def compact(self) -> int:
+        """
+        Copy analyses stored since the last compaction into segments.
+        
+        Safe to run in a worker thread; queries keep using the previous
+        manifest until the new one is in place.
+        
+        Returns:
+            Number of analyses compacted
+        """
+        with self._compaction_lock:
+            if not os.path.exists(self.store_path):
+                return 0
+            manifest = json.loads(json.dumps(self.manifest))
+            airline_ids = {name: index for index, name in enumerate(manifest["airlines"])}
+            theme_ids = {name: index for index, name in enumerate(manifest["themes"])}
+            
+            # A separate connection: the store's own belongs to the event loop thread
+            connection = sqlite3.connect(self.store_path)
+            try:
+                rows = connection.execute(
+                    "SELECT seq, created_at, primary_airline, sentiment, sentiment_score, themes "
+                    "FROM analyses WHERE seq > ? ORDER BY seq",
+                    (manifest["lastSeq"],)
+                )
+                compacted = 0
+                pending: List[Dict[str, np.ndarray]] = []
+                while True:
+                    batch = rows.fetchmany(COMPACTION_BATCH_ROWS)
+                    if batch:
+                        pending.append(self._encode(batch, airline_ids, theme_ids))
+                        compacted += len(batch)
+                        manifest["lastSeq"] = batch[-1][0]
+                        manifest["lastCreatedAt"] = batch[-1][1]
+                    # Segments are written a whole segment's rows at a time
+                    if pending and (not batch or sum(len(part["created_at"]) for part in pending) >= self.segment_rows):
+                        self._append(manifest, _concatenate(pending))
+                        pending = []
+                    if not batch:
+                        break
+            finally:
+                connection.close()
+            
+            if not compacted:
+                return 0
+            manifest["airlines"] = list(airline_ids)
+            manifest["themes"] = list(theme_ids)
+            _write_json(self.manifest_path, manifest)
+            replaced = {segment["name"] for segment in self.manifest["segments"]} - {segment["name"] for segment in manifest["segments"]}
+            self.manifest = manifest
+            # Segments replaced last time are deleted now, so a query still
+            # using the manifest from before then never finds them missing
+            for name in self._retired:
+                self._segment_cache.pop(name, None)
+                shutil.rmtree(self._segment_path(name), ignore_errors=True)
+            self._retired = replaced
+            self.compactions += 1
+            logger.info(f"Compacted {compacted} analyses into {len(manifest['segments'])} analytics segments")
+            return compacted
+    
+    @staticmethod
+    def _encode(batch: List[Tuple], airline_ids: Dict[str, int], theme_ids: Dict[str, int]) -> Dict[str, np.ndarray]:
+        """Encode analyses rows as columns, adding new airlines and themes to the dictionaries."""
+        created_at = np.array([row[1] for row in batch], dtype=np.float64)
+        airline = np.array([airline_ids.setdefault(row[2] or "", len(airline_ids)) for row in batch], dtype=np.int32)
+        sentiment = np.array([_SENTIMENT_IDS.get((row[3] or "").lower(), -1) for row in batch], dtype=np.int8)
+        score = np.array([np.nan if row[4] is None else row[4] for row in batch], dtype=np.float32)
+        theme_rows = []
+        theme_values = []
+        for index, row in enumerate(batch):
+            for theme in json.loads(row[5] or "[]"):
+                theme_rows.append(index)
+                theme_values.append(theme_ids.setdefault(theme, len(theme_ids)))
+        return {
+            "created_at": created_at,
+            "airline": airline,
+            "sentiment": sentiment,
+            "score": score,
+            "theme_rows": np.array(theme_rows, dtype=np.int32),
+            "theme_ids": np.array(theme_values, dtype=np.int32)
+        }
+    
+    def _append(self, manifest: Dict[str, Any], new: Dict[str, np.ndarray]) -> None:
+        """Write new rows into the manifest's segments, filling up the last one first."""
+        while len(new["created_at"]):
+            segments = manifest["segments"]
+            last = segments[-1] if segments else None
+            if last and last["rows"] < self.segment_rows:
+                # Rewrite the partly filled last segment with the new rows appended
+                base = {column: np.asarray(values) for column, values in self._load_segment(last["name"]).items()}
+                segments.pop()
+            else:
+                base = {column: np.empty(0, dtype=dtype) for column, dtype in COLUMNS.items()}
+            
+            take = min(len(new["created_at"]), self.segment_rows - len(base["created_at"]))
+            head, new = self._split(new, take)
+            merged = _concatenate([base, head])
+            
+            manifest["segmentCounter"] = manifest.get("segmentCounter", 0) + 1
+            name = f"segment-{manifest['segmentCounter']:06d}"
+            self._write_segment(name, merged)
+            segments.append({
+                "name": name,
+                "rows": int(len(merged["created_at"])),
+                "minCreatedAt": float(merged["created_at"].min()),
+                "maxCreatedAt": float(merged["created_at"].max())
+            })
+    
+    @staticmethod
+    def _split(columns: Dict[str, np.ndarray], rows: int) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        in_head = columns["theme_rows"] < rows
+        head = {column: values[:rows] for column, values in columns.items() if not column.startswith("theme_")}
+        rest = {column: values[rows:] for column, values in columns.items() if not column.startswith("theme_")}
+        head["theme_rows"] = columns["theme_rows"][in_head]
+        head["theme_ids"] = columns["theme_ids"][in_head]
+        rest["theme_rows"] = columns["theme_rows"][~in_head] - rows
+        rest["theme_ids"] = columns["theme_ids"][~in_head]
+        return head, rest
+    
+    def query(
+        self,
+        group_by: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        airline: Optional[str] = None,
+        theme: Optional[str] = None,
+        interval: str = "month"
+    ) -> Dict[str, Any]:
+        """
+        Group compacted analyses and aggregate their sentiment.
+        
+        Args:
+            group_by: "airline", "theme" or "time"
+            since: Optional ISO 8601 time, inclusive
+            until: Optional ISO 8601 time, exclusive
+            airline: Optional primary airline filter (case-insensitive)
+            theme: Optional theme filter (case-insensitive)
+            interval: Bucket for group_by "time": "day", "week", "month"
+                or "quarter" (UTC)
+        
+        Returns:
+            {"groupBy", "interval", "rows", "groups": [{"key", "count",
+            "meanSentiment", "negativeShare"}], "compactedThrough"};
+            time groups are in time order, others by count
+        
+        Raises:
+            ValueError: If a parameter is invalid
+        """
+        if group_by not in ANALYTICS_GROUPS:
+            raise ValueError(f"Unknown group_by '{group_by}'. Supported: {', '.join(ANALYTICS_GROUPS)}")
+        if interval not in ANALYTICS_INTERVALS:
+            raise ValueError(f"Unknown interval '{interval}'. Supported: {', '.join(ANALYTICS_INTERVALS)}")
+        since_ts = parse_time(since)
+        until_ts = parse_time(until)
+        
+        manifest = self.manifest
+        airline_filter = None
+        if airline:
+            airline_filter = np.array([i for i, name in enumerate(manifest["airlines"]) if name.lower() == airline.lower()], dtype=np.int32)
+        theme_filter = None
+        if theme:
+            theme_filter = np.array([i for i, name in enumerate(manifest["themes"]) if name.lower() == theme.lower()], dtype=np.int32)
+        
+        # Per group: row count, rows with a score, score sum, negative rows
+        totals: Dict[Any, np.ndarray] = {}
+        group_count = len(manifest["airlines"]) if group_by == "airline" else len(manifest["themes"])
+        dense = np.zeros((4, group_count))
+        matched = 0
+        
+        for segment_info in manifest["segments"]:
+            if since_ts is not None and segment_info["maxCreatedAt"] < since_ts:
+                continue
+            if until_ts is not None and segment_info["minCreatedAt"] >= until_ts:
+                continue
+            segment = self._load_segment(segment_info["name"])
+            created_at = segment["created_at"]
+            mask = np.ones(len(created_at), dtype=bool)
+            if since_ts is not None:
+                mask &= created_at >= since_ts
+            if until_ts is not None:
+                mask &= created_at < until_ts
+            if airline_filter is not None:
+                mask &= np.isin(segment["airline"], airline_filter)
+            if theme_filter is not None:
+                with_theme = np.zeros(len(created_at), dtype=bool)
+                with_theme[segment["theme_rows"][np.isin(segment["theme_ids"], theme_filter)]] = True
+                mask &= with_theme
+            
+            rows = np.flatnonzero(mask)
+            matched += len(rows)
+            if not len(rows):
+                continue
+            score = np.asarray(segment["score"][rows], dtype=np.float64)
+            scored = ~np.isnan(score)
+            values = np.stack([
+                np.ones(len(rows)),
+                scored.astype(np.float64),
+                np.where(scored, score, 0.0),
+                (np.asarray(segment["sentiment"][rows]) == _NEGATIVE).astype(np.float64)
+            ])
+            
+            if group_by == "airline":
+                keys = np.asarray(segment["airline"][rows])
+                for measure in range(4):
+                    dense[measure] += np.bincount(keys, weights=values[measure], minlength=group_count)
+            elif group_by == "theme":
+                # Expand rows to (row, theme) pairs, keeping only matched rows
+                position = np.full(len(created_at), -1, dtype=np.int64)
+                position[rows] = np.arange(len(rows))
+                pair_positions = position[segment["theme_rows"]]
+                in_rows = pair_positions >= 0
+                keys = np.asarray(segment["theme_ids"][in_rows])
+                for measure in range(4):
+                    dense[measure] += np.bincount(keys, weights=values[measure][pair_positions[in_rows]], minlength=group_count)
+            else:
+                starts, keys = np.unique(_bucket_starts(np.asarray(created_at[rows]), interval), return_inverse=True)
+                sums = np.stack([np.bincount(keys, weights=values[measure], minlength=len(starts)) for measure in range(4)])
+                for index, start in enumerate(starts):
+                    totals[str(start)] = totals.get(str(start), np.zeros(4)) + sums[:, index]
+        
+        if group_by != "time":
+            names = manifest["airlines"] if group_by == "airline" else manifest["themes"]
+            totals = {names[index]: dense[:, index] for index in np.flatnonzero(dense[0])}
+        groups = [
+            {
+                "key": key,
+                "count": int(sums[0]),
+                "meanSentiment": round(float(sums[2] / sums[1]), 4) if sums[1] else None,
+                "negativeShare": round(float(sums[3] / sums[0]), 4)
+            }
+            for key, sums in totals.items()
+        ]
+        if group_by == "time":
+            groups.sort(key=lambda group: group["key"])
+        else:
+            groups.sort(key=lambda group: group["count"], reverse=True)
+        
+        last_created_at = manifest.get("lastCreatedAt")
+        return {
+            "groupBy": group_by,
+            "interval": interval if group_by == "time" else None,
+            "rows": matched,
+            "groups": groups,
+            "compactedThrough": datetime.fromtimestamp(last_created_at).isoformat() if last_created_at else None
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get segment and row counts for /api/metrics."""
+        manifest = self.manifest
+        return {
+            "segments": len(manifest["segments"]),
+            "rows": sum(segment["rows"] for segment in manifest["segments"]),
+            "airlines": len(manifest["airlines"]),
+            "themes": len(manifest["themes"]),
+            "compactions": self.compactions
+        }
+
+
+async def run_compaction_loop(segments: AnalyticsSegments, interval_seconds: float) -> None:
+    """Compact every interval_seconds in a worker thread, until cancelled."""
+    while True:
+        try:
+            await asyncio.to_thread(segments.compact)
+        except Exception as e:
+            logger.error(f"Analytics compaction failed: {str(e)}", exc_info=True)
+        await asyncio.sleep(interval_seconds)
+
+
+_segments: Optional[AnalyticsSegments] = None
+
+
+def get_analytics_segments() -> AnalyticsSegments:
+    """Get the process-wide analytics segments."""
+    global _segments
+    if _segments is None:
+        _segments = AnalyticsSegments()
+    return _segments
@@ -0,0 +1,108 @@
+"""Audio decoding helpers for locally processing uploaded recordings."""
+import io
+import os
+import wave
+from typing import BinaryIO, Tuple, Union
+import numpy as np
+
+
+def is_wav_file(filename: str) -> bool:
+    """Check whether a filename points to a WAV recording."""
+    return os.path.splitext(filename or "")[1].lower() == ".wav"
+
+
+def read_wav(source: Union[bytes, str, BinaryIO]) -> Tuple[np.ndarray, int]:
+    """
+    Decode a PCM WAV recording into float samples.
+    
+    Args:
+        source: WAV file bytes, a path to a WAV file, or a binary file object
+    
+    Returns:
+        Tuple of (samples shaped (frames, channels) in [-1.0, 1.0], sample rate)
+    
+    Raises:
+        ValueError: If the data is not a PCM WAV file this module can decode
+    """
+    stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    try:
+        with wave.open(stream, "rb") as wav:
+            channels = wav.getnchannels()
+            sample_width = wav.getsampwidth()
+            sample_rate = wav.getframerate()
+            raw = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise ValueError(f"Unsupported WAV data: {str(e)}")
+    
+    if sample_width == 1:
+        # 8-bit WAV is unsigned
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        # Sign-extend packed 24-bit little-endian samples into int32
+        packed = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = packed[:, 0] | (packed[:, 1] << 8) | (packed[:, 2] << 16)
+        values = np.where(values & 0x800000, values - 0x1000000, values)
+        samples = values.astype(np.float32) / 8388608.0
+    elif sample_width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {sample_width} bytes")
+    
+    return samples.reshape(-1, channels), sample_rate
+
+
+def to_mono(samples: np.ndarray) -> np.ndarray:
+    """Downmix (frames, channels) samples to a 1-D mono signal."""
+    if samples.ndim == 1:
+        return samples
+    return samples.mean(axis=1)
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Resample a mono signal using linear interpolation.
+    
+    When downsampling, the signal is first box-filtered over the decimation
+    factor to limit aliasing.
+    """
+    if source_rate == target_rate or len(samples) == 0:
+        return samples.astype(np.float32)
+    
+    if target_rate < source_rate:
+        width = int(round(source_rate / target_rate))
+        if width > 1:
+            kernel = np.ones(width, dtype=np.float32) / width
+            samples = np.convolve(samples, kernel, mode="same")
+    
+    duration = len(samples) / source_rate
+    target_length = max(1, int(round(duration * target_rate)))
+    source_times = np.arange(len(samples)) / source_rate
+    target_times = np.arange(target_length) / target_rate
+    return np.interp(target_times, source_times, samples).astype(np.float32)
+
+
+
+def write_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    """
+    Encode float samples as a 16-bit PCM WAV file.
+    
+    Args:
+        samples: Mono 1-D or (frames, channels) samples in [-1.0, 1.0]
+        sample_rate: Sample rate in Hz
+        
+    Returns:
+        WAV file bytes
+    """
+    if samples.ndim == 1:
+        samples = samples.reshape(-1, 1)
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(samples.shape[1])
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
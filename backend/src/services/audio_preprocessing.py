@@ -0,0 +1,139 @@
+"""Local audio preprocessing to shrink recordings before transcription."""
+import logging
+from typing import Any, Dict, Tuple
+import numpy as np
+from src.config.settings import settings
+from src.services.audio import resample, to_mono
+
+logger = logging.getLogger(__name__)
+
+# Voice activity detection parameters
+VAD_FRAME_SECONDS = 0.03
+VAD_NOISE_PERCENTILE = 10
+VAD_MIN_THRESHOLD_DB = -50.0
+
+
+def detect_speech_frames(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """
+    Energy-based voice activity detection.
+    
+    A frame counts as speech when its energy is a margin above the noise
+    floor (estimated as a low percentile of frame energies) and above an
+    absolute minimum. Speech regions are then padded so word onsets and
+    trailing consonants are kept.
+    
+    Args:
+        samples: Mono samples
+        sample_rate: Sample rate in Hz
+    
+    Returns:
+        Boolean speech mask with one entry per VAD frame
+    """
+    frame = max(1, int(VAD_FRAME_SECONDS * sample_rate))
+    frame_count = len(samples) // frame
+    if frame_count == 0:
+        return np.ones(1, dtype=bool)
+    
+    frames = samples[:frame_count * frame].reshape(frame_count, frame)
+    energy_db = 10 * np.log10(np.square(frames).mean(axis=1) + 1e-12)
+    noise_floor = np.percentile(energy_db, VAD_NOISE_PERCENTILE)
+    threshold = max(noise_floor + settings.vad_threshold_db, VAD_MIN_THRESHOLD_DB)
+    speech = energy_db > threshold
+    
+    # Dilate speech regions by the padding on both sides
+    padding = int(settings.vad_padding_seconds / VAD_FRAME_SECONDS)
+    if padding > 0 and speech.any():
+        kernel = np.ones(2 * padding + 1)
+        speech = np.convolve(speech.astype(float), kernel, mode="same") > 0
+    return speech
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """
+    Shorten silent stretches longer than the configured minimum.
+    
+    Long silences are cut down to a short gap rather than removed outright,
+    so Whisper still hears a pause between phrases.
+    
+    Args:
+        samples: Mono samples
+        sample_rate: Sample rate in Hz
+    
+    Returns:
+        Samples with long silences shortened
+    """
+    speech = detect_speech_frames(samples, sample_rate)
+    if not speech.any():
+        # Nothing above the noise floor; trimming would discard the recording
+        return samples
+    
+    frame = max(1, int(VAD_FRAME_SECONDS * sample_rate))
+    min_silence_frames = int(settings.vad_min_silence_seconds / VAD_FRAME_SECONDS)
+    gap_frames = int(settings.vad_keep_silence_seconds / VAD_FRAME_SECONDS)
+    
+    keep = speech.copy()
+    # Find runs of silent frames and keep only a short gap from the long ones
+    edges = np.flatnonzero(np.diff(np.concatenate([[1], speech.astype(int), [1]])))
+    for start, end in zip(edges[::2], edges[1::2]):
+        if end - start < min_silence_frames:
+            keep[start:end] = True
+        else:
+            keep[start:start + gap_frames // 2] = True
+            keep[end - gap_frames // 2:end] = True
+    
+    sample_mask = np.repeat(keep, frame)
+    # Samples after the last whole frame follow the last frame's decision
+    tail = np.full(len(samples) - len(sample_mask), keep[-1], dtype=bool)
+    return samples[np.concatenate([sample_mask, tail])]
+
+
+def preprocess_audio(
+    samples: np.ndarray,
+    sample_rate: int,
+    original_bytes: int
+) -> Tuple[np.ndarray, int, Dict[str, Any]]:
+    """
+    Downmix to mono, resample and trim silence ahead of transcription.
+    
+    The caller should keep the original upload when "processedBytes" is
+    not smaller than "originalBytes" (e.g. an 8-bit or 8 kHz WAV, which
+    16-bit PCM can only grow). Blocking; call it from a worker thread.
+    
+    Args:
+        samples: Decoded (frames, channels) samples
+        sample_rate: Sample rate in Hz
+        original_bytes: Size of the uploaded file
+    
+    Returns:
+        Tuple of (processed mono samples, new sample rate, stats dict with
+        bytes and seconds before and after preprocessing, and "applied":
+        whether the processed audio is smaller than the upload)
+    """
+    original_seconds = len(samples) / sample_rate
+    # Never upsample; that would only make the upload bigger
+    target_rate = min(settings.preprocessing_sample_rate, sample_rate)
+    
+    processed = resample(to_mono(samples), sample_rate, target_rate)
+    if settings.vad_enabled:
+        processed = trim_silence(processed, target_rate)
+    
+    processed_seconds = len(processed) / target_rate
+    # 16-bit mono PCM plus the 44-byte WAV header
+    processed_bytes = len(processed) * 2 + 44
+    stats = {
+        "originalBytes": original_bytes,
+        "processedBytes": processed_bytes,
+        "bytesSaved": max(0, original_bytes - processed_bytes),
+        "applied": processed_bytes < original_bytes,
+        "originalSeconds": round(original_seconds, 2),
+        "processedSeconds": round(processed_seconds, 2),
+        "secondsSaved": round(max(0.0, original_seconds - processed_seconds), 2),
+        "channels": samples.shape[1],
+        "originalSampleRate": sample_rate,
+        "sampleRate": target_rate
+    }
+    logger.info(
+        f"Preprocessed audio: {original_seconds:.1f}s -> {processed_seconds:.1f}s, "
+        f"{original_bytes} -> {processed_bytes} bytes"
+    )
+    return processed, target_rate, stats
@@ -0,0 +1,125 @@
+"""Split long recordings into overlapping segments and stitch their transcripts."""
+import re
+from typing import List, Tuple
+import numpy as np
+
+# Frame length used to find quiet split points
+SILENCE_FRAME_SECONDS = 0.02
+
+
+def plan_segments(
+    samples: np.ndarray,
+    sample_rate: int,
+    max_segment_seconds: float,
+    overlap_seconds: float,
+    search_seconds: float = 10.0
+) -> List[Tuple[int, int]]:
+    """
+    Plan segment boundaries at silence so words are rarely cut in half.
+    
+    Each segment ends at the quietest frame in the last search_seconds of
+    its allowed length, and the next segment starts overlap_seconds before
+    that cut so a word straddling the boundary is heard in both segments.
+    
+    Args:
+        samples: Mono samples
+        sample_rate: Sample rate in Hz
+        max_segment_seconds: Maximum segment length
+        overlap_seconds: Audio shared between consecutive segments
+        search_seconds: How far back from the maximum length to look for silence
+    
+    Returns:
+        List of (start, end) sample indices
+    """
+    total = len(samples)
+    max_length = int(max_segment_seconds * sample_rate)
+    if total <= max_length:
+        return [(0, total)]
+    
+    overlap = int(overlap_seconds * sample_rate)
+    search = min(int(search_seconds * sample_rate), max_length // 2)
+    frame = max(1, int(SILENCE_FRAME_SECONDS * sample_rate))
+    
+    segments = []
+    start = 0
+    while start < total:
+        limit = start + max_length
+        if limit >= total:
+            segments.append((start, total))
+            break
+        
+        # Cut at the latest of the quietest frames in the search window
+        window = samples[limit - search:limit]
+        frame_count = len(window) // frame
+        energy = np.square(window[:frame_count * frame].reshape(frame_count, frame)).mean(axis=1)
+        quiet_frames = np.flatnonzero(energy <= energy.min() * 1.5 + 1e-10)
+        cut = limit - search + int(quiet_frames[-1]) * frame + frame // 2
+        
+        segments.append((start, cut))
+        start = max(cut - overlap, start + 1)
+    
+    return segments
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def new_words_after_overlap(
+    previous_words: List[str],
+    words: List[str],
+    max_overlap_words: int = 30
+) -> List[str]:
+    """
+    Drop the words of a segment that repeat the end of the previous text.
+    
+    The longest run of words (ignoring case and punctuation) that ends
+    previous_words and starts words is removed. The segment may begin with
+    up to two partial words from the cut, which are skipped as well.
+    
+    Args:
+        previous_words: Words transcribed so far
+        words: Words of the next segment
+        max_overlap_words: Longest overlap considered, in words
+        
+    Returns:
+        Words of the next segment to append
+    """
+    if not previous_words:
+        return words
+    
+    tail = [_normalize_word(w) for w in previous_words[-max_overlap_words:]]
+    head = [_normalize_word(w) for w in words[:max_overlap_words + 2]]
+    
+    best_skip = 0
+    best_length = 0
+    for skip in range(0, 3):
+        for length in range(min(len(tail), len(head) - skip), best_length, -1):
+            if length < 2:
+                break
+            if tail[-length:] == head[skip:skip + length]:
+                best_skip, best_length = skip, length
+                break
+    
+    return words[best_skip + best_length:] if best_length else words
+
+
+def stitch_transcripts(texts: List[str], max_overlap_words: int = 30) -> str:
+    """
+    Join segment transcripts, dropping words repeated across the overlap.
+    
+    Segments are joined in order using new_words_after_overlap(), so the
+    result depends only on the inputs and stitching is deterministic.
+    
+    Args:
+        texts: Segment transcripts in recording order
+        max_overlap_words: Longest overlap considered, in words
+        
+    Returns:
+        Combined transcript
+    """
+    stitched: List[str] = []
+    for text in texts:
+        stitched.extend(new_words_after_overlap(stitched, text.split(), max_overlap_words))
+    
+    return " ".join(stitched)
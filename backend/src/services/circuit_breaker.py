@@ -0,0 +1,212 @@
+"""Circuit breakers for external dependencies (NewsAPI, OpenAI, Whisper)."""
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+    
+    def __init__(self, name: str):
+        super().__init__(f"{name} circuit is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    """
+    Error-rate and latency circuit breaker.
+    
+    The outcomes of the last window_size calls are kept. Once at least
+    minimum_calls are recorded, the circuit opens when the share of
+    failed calls or of slow calls reaches its threshold. While open, calls
+    fail fast with CircuitOpenError. After open_seconds the circuit goes
+    half-open and lets half_open_max_calls trial calls through: if they all
+    succeed quickly it closes, and any failure or slow trial opens it again.
+    
+    Callers check allow_request() before a call and report the outcome with
+    record_success() or record_failure().
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        slow_call_seconds: float,
+        failure_rate_threshold: float = 0.5,
+        slow_call_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        minimum_calls: int = 5,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 2,
+        enabled: bool = True
+    ):
+        """
+        Initialize circuit breaker.
+        
+        Args:
+            name: Dependency name, used in logs and /health
+            slow_call_seconds: Calls taking longer than this count as slow
+            failure_rate_threshold: Failed share of the window that opens the circuit
+            slow_call_rate_threshold: Slow share of the window that opens the circuit
+            window_size: Number of recent calls considered
+            minimum_calls: Calls needed in the window before it can open
+            open_seconds: Time to fail fast before trying again
+            half_open_max_calls: Trial calls allowed while half-open
+            enabled: If False, every call is allowed (outcomes are still recorded)
+        """
+        self.name = name
+        self.slow_call_seconds = slow_call_seconds
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.enabled = enabled
+        
+        self.state = CLOSED
+        # (failed, slow) per recent call
+        self._window: deque = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._trials_started = 0
+        self._trials_succeeded = 0
+        self.rejected = 0
+    
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may go through, moving open -> half-open when due.
+        
+        Returns:
+            True if the caller should make the call
+        """
+        if not self.enabled:
+            return True
+        
+        # Also restart trials that never reported back (e.g. cancelled requests)
+        if self.state != CLOSED and time.monotonic() - self._opened_at >= self.open_seconds:
+            if self.state == OPEN:
+                logger.info(f"{self.name} circuit half-open, sending trial requests")
+            self.state = HALF_OPEN
+            self._opened_at = time.monotonic()
+            self._trials_started = 0
+            self._trials_succeeded = 0
+        
+        if self.state == HALF_OPEN and self._trials_started < self.half_open_max_calls:
+            self._trials_started += 1
+            return True
+        if self.state == CLOSED:
+            return True
+        
+        self.rejected += 1
+        return False
+    
+    def record_success(self, duration: float) -> None:
+        """
+        Record a completed call.
+        
+        Args:
+            duration: Call latency in seconds
+        """
+        slow = duration > self.slow_call_seconds
+        if self.state == HALF_OPEN:
+            if slow:
+                self._open(f"slow trial call ({duration:.1f}s)")
+                return
+            self._trials_succeeded += 1
+            if self._trials_succeeded >= self.half_open_max_calls:
+                self.state = CLOSED
+                self._window.clear()
+                logger.info(f"{self.name} circuit closed")
+            return
+        
+        self._window.append((False, slow))
+        self._evaluate()
+    
+    def record_failure(self, duration: float) -> None:
+        """
+        Record a failed call.
+        
+        Args:
+            duration: Time until the call failed, in seconds
+        """
+        if self.state == HALF_OPEN:
+            self._open("trial call failed")
+            return
+        
+        self._window.append((True, duration > self.slow_call_seconds))
+        self._evaluate()
+    
+    def _evaluate(self) -> None:
+        if self.state != CLOSED or len(self._window) < self.minimum_calls:
+            return
+        calls = len(self._window)
+        failure_rate = sum(1 for failed, _ in self._window if failed) / calls
+        slow_rate = sum(1 for _, slow in self._window if slow) / calls
+        if failure_rate >= self.failure_rate_threshold:
+            self._open(f"failure rate {failure_rate:.0%}")
+        elif slow_rate >= self.slow_call_rate_threshold:
+            self._open(f"slow call rate {slow_rate:.0%}")
+    
+    def _open(self, reason: str) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._window.clear()
+        logger.warning(f"{self.name} circuit opened: {reason}")
+    
+    def status(self) -> Dict[str, Any]:
+        """Get state and recent outcome counts for /health."""
+        retry_in: Optional[float] = None
+        if self.state == OPEN:
+            retry_in = round(max(0.0, self.open_seconds - (time.monotonic() - self._opened_at)), 1)
+        return {
+            "state": self.state,
+            "recentCalls": len(self._window),
+            "recentFailures": sum(1 for failed, _ in self._window if failed),
+            "recentSlowCalls": sum(1 for _, slow in self._window if slow),
+            "rejected": self.rejected,
+            "retryInSeconds": retry_in
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    Get the process-wide circuit breaker for a dependency ("newsapi", "openai" or "whisper").
+    
+    Args:
+        name: Dependency name
+    
+    Returns:
+        Shared CircuitBreaker
+    """
+    if name not in _breakers:
+        slow_call_seconds = {
+            "newsapi": settings.newsapi_slow_call_seconds,
+            "openai": settings.openai_slow_call_seconds,
+            "whisper": settings.whisper_slow_call_seconds
+        }
+        _breakers[name] = CircuitBreaker(
+            name,
+            slow_call_seconds=slow_call_seconds.get(name, 30.0),
+            failure_rate_threshold=settings.circuit_failure_rate_threshold,
+            slow_call_rate_threshold=settings.circuit_slow_call_rate_threshold,
+            window_size=settings.circuit_window_size,
+            minimum_calls=settings.circuit_minimum_calls,
+            open_seconds=settings.circuit_open_seconds,
+            half_open_max_calls=settings.circuit_half_open_max_calls,
+            enabled=settings.circuit_breaker_enabled
+        )
+    return _breakers[name]
+
+
+def circuit_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Get the status of every dependency's circuit breaker."""
+    return {name: get_circuit_breaker(name).status() for name in ("newsapi", "openai", "whisper")}
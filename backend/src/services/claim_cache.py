@@ -0,0 +1,200 @@
+"""Claim verification cache shared across transcripts."""
+import copy
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set
+import numpy as np
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_claim(text: str) -> str:
+    """Lower-case a claim and drop punctuation and extra whitespace."""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text.lower())).strip()
+
+
+def article_key(article: Dict[str, Any]) -> str:
+    """Identify an article by URL, or by title when it has none."""
+    return article.get("url") or article.get("title") or ""
+
+
+def _unit(embedding: Iterable[float]) -> Optional[np.ndarray]:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else None
+
+
+class ClaimCacheEntry:
+    """A verified claim, and the articles it was checked against."""
+    
+    def __init__(self, text: str, slot: int, result: Dict[str, Any], articles: List[Dict[str, Any]]):
+        self.text = text
+        self.slot = slot
+        self.result = copy.deepcopy(result)
+        self.checked_articles: Set[str] = {article_key(article) for article in articles}
+        self.created_at = time.monotonic()
+    
+    def unchecked(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Articles this verification has not seen (the article set has moved on since)."""
+        return [article for article in articles if article_key(article) not in self.checked_articles]
+
+
+class ClaimVerificationCache:
+    """
+    Claim verifications, reused across transcripts.
+    
+    The same claims come up in many transcripts, and each verification
+    costs embeddings plus an LLM call. Entries are found by normalized claim
+    text, or failing that by a claim embedding within
+    CLAIM_CACHE_THRESHOLD cosine similarity of a cached claim's.
+    
+    An entry records the articles it was verified against. When the
+    candidate articles include ones it has not seen, the caller checks them
+    for relevance to the claim: a new relevant article invalidates the
+    entry, otherwise the new articles are marked as seen and the entry is
+    reused. Entries expire after CLAIM_CACHE_TTL_SECONDS; at most
+    CLAIM_CACHE_MAX_ENTRIES are kept, least recently used evicted first.
+    
+    Claim embeddings are unit rows of a preallocated matrix, one slot per
+    entry, so the neighbour lookup is one matrix-vector product.
+    """
+    
+    def __init__(self):
+        """Initialize empty cache from settings."""
+        self.threshold = settings.claim_cache_threshold
+        self.ttl_seconds = settings.claim_cache_ttl_seconds
+        self.max_entries = max(1, settings.claim_cache_max_entries)
+        self.entries: "OrderedDict[str, ClaimCacheEntry]" = OrderedDict()
+        self.vectors: Optional[np.ndarray] = None
+        self.slot_entries: List[Optional[ClaimCacheEntry]] = [None] * self.max_entries
+        self.free_slots = list(range(self.max_entries - 1, -1, -1))
+        self.hits = 0
+        self.neighbour_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def _remove(self, entry: ClaimCacheEntry) -> bool:
+        if self.entries.get(entry.text) is not entry:
+            return False
+        del self.entries[entry.text]
+        self.vectors[entry.slot] = 0
+        self.slot_entries[entry.slot] = None
+        self.free_slots.append(entry.slot)
+        return True
+    
+    def _live(self, entry: Optional[ClaimCacheEntry]) -> Optional[ClaimCacheEntry]:
+        if entry is not None and time.monotonic() - entry.created_at > self.ttl_seconds:
+            self._remove(entry)
+            return None
+        return entry
+    
+    def get(self, claim_text: str) -> Optional[ClaimCacheEntry]:
+        """Get the entry for a claim by its normalized text."""
+        key = normalize_claim(claim_text)
+        entry = self._live(self.entries.get(key))
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+    
+    def nearest(self, claim_embedding: List[float]) -> Optional[ClaimCacheEntry]:
+        """Get the entry whose claim embedding is most similar, if within the threshold."""
+        vector = _unit(claim_embedding)
+        if vector is None or not self.entries or vector.shape[0] != self.vectors.shape[1]:
+            return None
+        similarities = self.vectors @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        entry = self._live(self.slot_entries[best])
+        if entry is not None:
+            self.entries.move_to_end(entry.text)
+        return entry
+    
+    def embedding(self, entry: ClaimCacheEntry) -> np.ndarray:
+        """Get an entry's unit claim embedding."""
+        return self.vectors[entry.slot]
+    
+    def record_hit(self, entry: ClaimCacheEntry, claim_text: str, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Reuse an entry whose unchecked articles turned out irrelevant.
+        
+        Args:
+            entry: Entry from get() or nearest()
+            claim_text: The claim being verified
+            articles: Current candidate articles
+        
+        Returns:
+            Copy of the cached verification result
+        """
+        entry.checked_articles.update(article_key(article) for article in articles)
+        if normalize_claim(claim_text) == entry.text:
+            self.hits += 1
+        else:
+            self.neighbour_hits += 1
+        return copy.deepcopy(entry.result)
+    
+    def invalidate(self, entry: ClaimCacheEntry) -> None:
+        """Drop an entry after a new relevant article appeared."""
+        if self._remove(entry):
+            self.invalidations += 1
+    
+    def record_miss(self) -> None:
+        """Count a claim that had to be verified."""
+        self.misses += 1
+    
+    def put(self, claim_text: str, claim_embedding: List[float], result: Dict[str, Any], articles: List[Dict[str, Any]]) -> None:
+        """
+        Cache a verification.
+        
+        Args:
+            claim_text: Verified claim
+            claim_embedding: Its embedding
+            result: Verification result
+            articles: Candidate articles it was verified against
+        """
+        vector = _unit(claim_embedding)
+        if vector is None:
+            return
+        if self.vectors is None:
+            self.vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+        elif vector.shape[0] != self.vectors.shape[1]:
+            return
+        key = normalize_claim(claim_text)
+        if key in self.entries:
+            self._remove(self.entries[key])
+        if not self.free_slots:
+            self._remove(next(iter(self.entries.values())))
+        slot = self.free_slots.pop()
+        entry = ClaimCacheEntry(key, slot, result, articles)
+        self.vectors[slot] = vector
+        self.slot_entries[slot] = entry
+        self.entries[key] = entry
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit, miss and invalidation counts for /api/metrics."""
+        lookups = self.hits + self.neighbour_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "neighbourHits": self.neighbour_hits,
+            "misses": self.misses,
+            "hitRate": round((self.hits + self.neighbour_hits) / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations
+        }
+
+
+_cache: Optional[ClaimVerificationCache] = None
+
+
+def get_claim_verification_cache() -> ClaimVerificationCache:
+    """Get the process-wide claim verification cache."""
+    global _cache
+    if _cache is None:
+        _cache = ClaimVerificationCache()
+    return _cache
@@ -1,22 +1,50 @@
 """Correlation engine for matching transcripts with news."""
 from typing import Dict, List, Tuple, Optional
-from openai import OpenAI
+import asyncio
 import logging
 import numpy as np
 import json
 from src.config.settings import settings
+from src.services.claim_cache import get_claim_verification_cache
+from src.services.lexical_prefilter import BM25Index, prefilter_articles
+from src.services.model_routing import complete_for_stage, json_response_check
+from src.services.openai_scheduler import call_openai, create_openai_client
+from src.services.request_context import drop_stage, has_time_for
 
 logger = logging.getLogger(__name__)
 
+# Articles at least this similar to a claim are sent to the LLM to verify it
+CLAIM_ARTICLE_SIMILARITY = 0.6
+
+
+def _claim_article_text(article: Dict) -> str:
+    """Article text embedded for claim verification."""
+    return f"{article.get('title', '')} {article.get('fullText', '')[:2000]}"
+
+
+def _article_summary_text(article: Dict) -> str:
+    """Article text embedded for transcript correlation."""
+    return f"{article.get('title', '')} {article.get('description', '')}"
+
 
 class CorrelationEngine:
-    """Engine for correlating voice transcripts with news articles."""
+    """
+    Engine for correlating voice transcripts with news articles.
+    
+    Embeddings are memoized per instance by text, so transcripts
+    correlated through the same engine share article embeddings.
+    
+    Only the CORRELATION_PREFILTER_TOP_K candidate articles that best match
+    the transcript by BM25, and the CLAIM_PREFILTER_TOP_K that best match
+    each claim, are embedded (see lexical_prefilter).
+    """
     
     def __init__(self):
         if not settings.openai_api_key:
             raise ValueError("OpenAI API key required for correlation")
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        self.client = create_openai_client()
         self.model = settings.analysis_model
+        self._embeddings: Dict[str, asyncio.Task] = {}
     
     async def correlate_transcript_with_news(
         self,
@@ -44,6 +72,11 @@ class CorrelationEngine:
                 "supportingReferences": []
             }
         
+        # Embed only the articles that share the most terms with the transcript
+        if 0 < settings.correlation_prefilter_top_k < len(news_articles):
+            index = BM25Index([_article_summary_text(article) for article in news_articles])
+            news_articles = prefilter_articles(index, news_articles, transcript, settings.correlation_prefilter_top_k)
+        
         # Use AI to calculate semantic similarity
         correlations = await self._calculate_semantic_similarity(
             transcript, news_articles, detected_airlines, detected_themes
@@ -96,8 +129,7 @@ class CorrelationEngine:
             correlations = []
             for article in articles:
                 # Combine article title and description
-                article_text = f"{article.get('title', '')} {article.get('description', '')}"
-                article_embedding = await self._get_embedding(article_text[:8000])
+                article_embedding = await self._get_embedding(_article_summary_text(article)[:8000])
                 
                 # Calculate cosine similarity
                 similarity = self._cosine_similarity(
@@ -117,13 +149,25 @@ class CorrelationEngine:
             return [(article, 0.0) for article in articles]
     
     async def _get_embedding(self, text: str) -> List[float]:
-        """Get OpenAI embedding for text."""
+        """Get OpenAI embedding for text, reusing earlier or in-flight requests for the same text."""
         if not text or not text.strip():
             # Return zero vector if empty
             return [0.0] * 1536  # text-embedding-3-small dimension
         
+        task = self._embeddings.get(text)
+        if task is None:
+            task = asyncio.create_task(self._request_embedding(text))
+            self._embeddings[text] = task
+        embedding = await asyncio.shield(task)
+        if not any(embedding):
+            # Don't keep failures; a later call can retry
+            self._embeddings.pop(text, None)
+        return embedding
+    
+    async def _request_embedding(self, text: str) -> List[float]:
         try:
-            response = self.client.embeddings.create(
+            response = await call_openai(
+                self.client.embeddings.create,
                 model="text-embedding-3-small",
                 input=text
             )
@@ -177,11 +221,16 @@ class CorrelationEngine:
         transcript: str,
         news_articles: List[Dict],
         detected_airlines: List[str],
-        detected_themes: List[str]
+        detected_themes: List[str],
+        claims: Optional[List[Dict]] = None
     ) -> Dict:
         """
         Verify if gossip/transcript claims are correct based on news articles.
         
+        Args:
+            claims: Claims already extracted from the transcript (e.g. by a
+                consolidated analysis call); extracted with AI when None
+        
         Returns:
             {
                 "accuracyScore": 0.85,
@@ -206,7 +255,10 @@ class CorrelationEngine:
             }
         
         # Extract key claims from transcript using AI
-        claims = await self._extract_claims(transcript, detected_airlines, detected_themes)
+        if claims is None:
+            claims = await self._extract_claims(transcript, detected_airlines, detected_themes)
+        else:
+            claims = self._filter_claims(claims)
         
         if not claims:
             # Fallback to semantic similarity if no claims extracted
@@ -223,6 +275,11 @@ class CorrelationEngine:
                 "contradictingClaims": []
             }
         
+        # Each claim is only checked against the articles sharing the most terms with it
+        claim_index = None
+        if 0 < settings.claim_prefilter_top_k < len(news_articles):
+            claim_index = BM25Index([_claim_article_text(article) for article in news_articles])
+        
         # Verify each claim against news articles
         verified_claims = []
         unverified_claims = []
@@ -230,8 +287,20 @@ class CorrelationEngine:
         supporting_articles = []
         
         for claim in claims:
+            # Out of time: report the remaining claims as unverified rather than time out
+            if not has_time_for(settings.deadline_stage_min_seconds):
+                drop_stage("claimVerification")
+                unverified_claims.append({
+                    "claim": claim.get("text", ""),
+                    "reason": "Not verified: request deadline reached"
+                })
+                continue
+            
+            candidates = news_articles
+            if claim_index is not None:
+                candidates = prefilter_articles(claim_index, news_articles, claim.get("text", ""), settings.claim_prefilter_top_k)
             verification_result = await self._verify_claim_against_news(
-                claim, news_articles, detected_airlines
+                claim, candidates, detected_airlines
             )
             
             if verification_result["status"] == "verified":
@@ -338,8 +407,10 @@ Return a JSON object with a "claims" array, each claim with:
 Format: {{"claims": [{{"text": "...", "type": "...", "airline": "...", "confidence": 0.8}}]}}
 """
 
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await complete_for_stage(
+                "claimExtraction",
+                self.client,
+                check=json_response_check("claims"),
                 messages=[
                     {"role": "system", "content": "You are a fact-checking assistant. Extract factual claims from text. Return only valid JSON."},
                     {"role": "user", "content": prompt}
@@ -349,10 +420,7 @@ Format: {{"claims": [{{"text": "...", "type": "...", "airline": "...", "confiden
             )
             
             result = json.loads(response.choices[0].message.content)
-            claims = result.get("claims", [])
-            
-            # Filter high-confidence claims
-            filtered_claims = [c for c in claims if c.get("confidence", 0) >= 0.5]
+            filtered_claims = self._filter_claims(result.get("claims", []))
             logger.info(f"Extracted {len(filtered_claims)} claims from transcript")
             return filtered_claims
             
@@ -360,32 +428,108 @@ Format: {{"claims": [{{"text": "...", "type": "...", "airline": "...", "confiden
             logger.error(f"Claim extraction failed: {str(e)}", exc_info=True)
             return []
     
+    def _filter_claims(self, claims: List[Dict]) -> List[Dict]:
+        """Keep claims with a confidence of at least 0.5."""
+        filtered_claims = []
+        for claim in claims if isinstance(claims, list) else []:
+            if not isinstance(claim, dict):
+                continue
+            try:
+                confidence = float(claim.get("confidence", 0))
+            except (TypeError, ValueError):
+                continue
+            if confidence >= 0.5:
+                filtered_claims.append(claim)
+        return filtered_claims
+    
     async def _verify_claim_against_news(
         self,
         claim: Dict,
         news_articles: List[Dict],
         airlines: List[str]
     ) -> Dict:
-        """Verify a single claim against news articles."""
+        """
+        Verify a single claim against news articles.
+        
+        With CLAIM_CACHE_ENABLED, a claim verified before (same normalized
+        text, or a near-identical embedding) is answered from the claim
+        verification cache without an LLM call, unless a candidate article
+        the cached verification has not seen is relevant to the claim.
+        """
         claim_text = claim.get("text", "")
         if not claim_text:
             return {"status": "unverified", "confidence": 0.0, "articles": []}
         
-        # Find relevant articles using semantic similarity
-        claim_embedding = await self._get_embedding(claim_text[:2000])
+        if not settings.claim_cache_enabled:
+            claim_embedding = await self._get_embedding(claim_text[:2000])
+            result, _ = await self._verify_claim_with_llm(claim_text, claim_embedding, news_articles)
+            return result
+        
+        cache = get_claim_verification_cache()
+        claim_embedding = None
+        entry = cache.get(claim_text)
+        if entry is None:
+            claim_embedding = await self._get_embedding(claim_text[:2000])
+            entry = cache.nearest(claim_embedding)
+        if entry is not None:
+            # Only articles that appeared since the cached verification need a look
+            reference = claim_embedding if claim_embedding is not None else cache.embedding(entry)
+            new_relevant = False
+            unembedded = set()
+            for article in entry.unchecked(news_articles):
+                article_embedding = await self._get_embedding(_claim_article_text(article))
+                if not any(article_embedding):
+                    unembedded.add(id(article))
+                    continue
+                if self._cosine_similarity(reference, article_embedding) >= CLAIM_ARTICLE_SIMILARITY:
+                    new_relevant = True
+                    break
+            if not new_relevant:
+                # Articles whose embedding failed stay unchecked for the next lookup
+                checked = [article for article in news_articles if id(article) not in unembedded]
+                return cache.record_hit(entry, claim_text, checked)
+            cache.invalidate(entry)
+        
+        cache.record_miss()
+        if claim_embedding is None:
+            claim_embedding = await self._get_embedding(claim_text[:2000])
+        result, cacheable = await self._verify_claim_with_llm(claim_text, claim_embedding, news_articles)
+        if cacheable:
+            cache.put(claim_text, claim_embedding, result, news_articles)
+        return result
+    
+    async def _verify_claim_with_llm(
+        self,
+        claim_text: str,
+        claim_embedding: List[float],
+        news_articles: List[Dict]
+    ) -> Tuple[Dict, bool]:
+        """
+        Verify a claim against its most similar articles with an LLM call.
         
+        Returns:
+            (result, whether it may be cached: False for the fallback used
+            when the LLM call fails, and when an embedding request failed,
+            since a relevant article may then have been missed)
+        """
+        # Failed embedding requests come back as zero vectors
+        embeddings_complete = any(claim_embedding)
+        
+        # Find relevant articles using semantic similarity
         relevant_articles = []
         for article in news_articles:
-            article_text = f"{article.get('title', '')} {article.get('fullText', '')[:2000]}"
-            article_embedding = await self._get_embedding(article_text)
+            article_embedding = await self._get_embedding(_claim_article_text(article))
+            if not any(article_embedding):
+                embeddings_complete = False
+                continue
             
             similarity = self._cosine_similarity(claim_embedding, article_embedding)
-            if similarity >= 0.6:  # Threshold for relevance
+            if similarity >= CLAIM_ARTICLE_SIMILARITY:
                 article["similarity"] = similarity
                 relevant_articles.append(article)
         
         if not relevant_articles:
-            return {"status": "unverified", "confidence": 0.0, "articles": []}
+            return {"status": "unverified", "confidence": 0.0, "articles": []}, embeddings_complete
         
         # Use AI to verify if claim matches news
         articles_text = "\n\n".join([
@@ -410,8 +554,10 @@ Respond with JSON:
 }}
 """
 
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await complete_for_stage(
+                "claimVerification",
+                self.client,
+                check=json_response_check("status"),
                 messages=[
                     {"role": "system", "content": "You are a fact-checker. Verify claims against news sources. Return only valid JSON."},
                     {"role": "user", "content": verification_prompt}
@@ -438,7 +584,7 @@ Respond with JSON:
                 "confidence": result.get("confidence", 0.0),
                 "reason": result.get("reason", ""),
                 "articles": verified_articles[:3]  # Top 3 supporting articles
-            }
+            }, embeddings_complete
             
         except Exception as e:
             logger.error(f"Claim verification failed: {str(e)}", exc_info=True)
@@ -449,6 +595,6 @@ Respond with JSON:
                     "confidence": 0.7,
                     "reason": "High semantic similarity found",
                     "articles": relevant_articles[:3]
-                }
-            return {"status": "unverified", "confidence": 0.0, "articles": []}
+                }, False
+            return {"status": "unverified", "confidence": 0.0, "articles": []}, False
 
@@ -0,0 +1,205 @@
+"""News correlation scheduling: a priority-ordered concurrency limit and background runs keyed by analysis id."""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from src.config.settings import settings
+from src.services.request_context import start_deadline
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first: interactive requests ahead of batch back-fills
+CORRELATION_PRIORITY_INTERACTIVE = 0
+CORRELATION_PRIORITY_BATCH = 1
+
+
+class PrioritySemaphore:
+    """Semaphore that hands freed slots to the waiter with the lowest priority value (FIFO within a priority)."""
+    
+    def __init__(self, limit: int):
+        """
+        Initialize semaphore.
+        
+        Args:
+            limit: Slots available at once
+        """
+        self.limit = max(1, limit)
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+    
+    @property
+    def waiting(self) -> int:
+        """Number of callers waiting for a slot."""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+    
+    async def acquire(self, priority: int) -> None:
+        """Wait for a slot."""
+        if self.active < self.limit and not self.waiting:
+            self.active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # A slot handed over just before the cancellation must be passed on
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+    
+    def release(self) -> None:
+        """Free a slot, handing it to the next waiter if there is one."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+
+class CorrelationRun:
+    """One background correlation for an analysis."""
+    
+    def __init__(self, analysis_id: str, priority: int):
+        """Initialize queued run."""
+        self.analysis_id = analysis_id
+        self.priority = priority
+        self.status = "queued"
+        self.correlation: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.finished_at: Optional[float] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the run for GET /api/analyses/{id}/correlation."""
+        return {
+            "analysisId": self.analysis_id,
+            "status": self.status,
+            "correlation": self.correlation,
+            "error": self.error,
+            "createdAt": self.created_at
+        }
+
+
+class CorrelationScheduler:
+    """
+    Runs news correlations under CORRELATION_MAX_CONCURRENCY, by priority.
+    
+    Correlation (news search, claim extraction, embeddings, per-claim
+    verification) often takes longer than the analysis itself. Inline
+    correlations wait for a slot here; background ones are stored by
+    analysis id for ANALYSIS_JOB_TTL_SECONDS so the response need not wait.
+    Beyond ANALYSIS_JOB_MAX_ENTRIES runs the oldest finished ones are
+    evicted; queued and running runs are kept until they finish.
+    """
+    
+    def __init__(self):
+        """Initialize scheduler from settings."""
+        self.slots = PrioritySemaphore(settings.correlation_max_concurrency)
+        self.runs: "OrderedDict[str, CorrelationRun]" = OrderedDict()
+        self.ttl_seconds = settings.analysis_job_ttl_seconds
+        self.max_entries = settings.analysis_job_max_entries
+        self._tasks: Set[asyncio.Task] = set()
+        self.completed = 0
+        self.failed = 0
+    
+    @asynccontextmanager
+    async def slot(self, priority: int = CORRELATION_PRIORITY_INTERACTIVE) -> AsyncIterator[None]:
+        """Hold one correlation slot, waiting behind higher-priority work."""
+        await self.slots.acquire(priority)
+        try:
+            yield
+        finally:
+            self.slots.release()
+    
+    def _evict(self) -> None:
+        now = time.monotonic()
+        expired = [
+            analysis_id for analysis_id, run in self.runs.items()
+            if run.finished_at is not None and now - run.finished_at > self.ttl_seconds
+        ]
+        for analysis_id in expired:
+            del self.runs[analysis_id]
+        excess = len(self.runs) - self.max_entries
+        if excess > 0:
+            finished = [analysis_id for analysis_id, run in self.runs.items() if run.finished_at is not None]
+            for analysis_id in finished[:excess]:
+                del self.runs[analysis_id]
+    
+    def get(self, analysis_id: str) -> Optional[CorrelationRun]:
+        """Get the correlation run for an analysis, or None if unknown or expired."""
+        self._evict()
+        return self.runs.get(analysis_id)
+    
+    def submit(
+        self,
+        analysis_id: str,
+        correlate: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+        priority: int = CORRELATION_PRIORITY_INTERACTIVE
+    ) -> CorrelationRun:
+        """
+        Run a correlation in the background.
+        
+        The run gets its own REQUEST_DEADLINE_SECONDS budget, counted from
+        when it gets a slot, since the request that submitted it returns first.
+        
+        Args:
+            analysis_id: Id the result is stored under
+            correlate: Zero-argument coroutine function returning the correlation
+            priority: Lower runs first (see CORRELATION_PRIORITY_*)
+        
+        Returns:
+            The queued run
+        """
+        run = CorrelationRun(analysis_id, priority)
+        self.runs[analysis_id] = run
+        self._evict()
+        task = asyncio.create_task(self._run(run, correlate))
+        # Keep a reference so the task is not garbage collected mid-run
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return run
+    
+    async def _run(self, run: CorrelationRun, correlate: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> None:
+        async with self.slot(run.priority):
+            start_deadline(settings.request_deadline_seconds)
+            run.status = "running"
+            try:
+                run.correlation = await correlate()
+                run.status = "complete"
+                self.completed += 1
+            except Exception as e:
+                logger.error(f"Background correlation {run.analysis_id} failed: {str(e)}", exc_info=True)
+                run.error = str(e)
+                run.status = "failed"
+                self.failed += 1
+            run.finished_at = time.monotonic()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get slot usage and run counts for /api/metrics."""
+        return {
+            "background": settings.correlation_background,
+            "maxConcurrency": self.slots.limit,
+            "active": self.slots.active,
+            "waiting": self.slots.waiting,
+            "stored": len(self.runs),
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+
+_scheduler: Optional[CorrelationScheduler] = None
+
+
+def get_correlation_scheduler() -> CorrelationScheduler:
+    """Get the process-wide correlation scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = CorrelationScheduler()
+    return _scheduler
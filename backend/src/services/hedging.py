@@ -0,0 +1,268 @@
+"""Hedged OpenAI requests: send a backup copy of a slow call and keep the first result."""
+import asyncio
+import bisect
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+from src.config.settings import settings
+from src.services.openai_scheduler import call_openai
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Histogram bucket upper bounds in seconds: 50ms growing by ~25% up to about 10 minutes
+BUCKET_BOUNDS: List[float] = [round(0.05 * 1.25 ** i, 3) for i in range(43)]
+# Counts are halved once a histogram holds this many samples, so it tracks recent latency
+HISTOGRAM_DECAY_SAMPLES = 1000
+
+
+class LatencyHistogram:
+    """Bucketed latency histogram for one call site, weighted towards recent calls."""
+    
+    def __init__(self):
+        """Initialize empty histogram."""
+        self.counts = [0.0] * (len(BUCKET_BOUNDS) + 1)
+        self.total = 0.0
+        self.samples = 0
+    
+    def record(self, seconds: float) -> None:
+        """
+        Record one call's latency.
+        
+        Args:
+            seconds: Call latency
+        """
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.total += 1
+        self.samples += 1
+        if self.total >= HISTOGRAM_DECAY_SAMPLES:
+            self.counts = [count / 2 for count in self.counts]
+            self.total /= 2
+    
+    def percentile(self, percentile: float) -> Optional[float]:
+        """
+        Estimate a latency percentile.
+        
+        Args:
+            percentile: Percentile between 0 and 100
+        
+        Returns:
+            Upper bound of the bucket holding the percentile, or None if empty
+        """
+        if not self.total:
+            return None
+        target = self.total * percentile / 100
+        cumulative = 0.0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target and count:
+                return BUCKET_BOUNDS[min(index, len(BUCKET_BOUNDS) - 1)]
+        return BUCKET_BOUNDS[-1]
+    
+    def summary(self) -> Dict[str, Any]:
+        """Get sample count and p50/p90/p99 for /api/metrics."""
+        return {
+            "samples": self.samples,
+            "p50Seconds": self.percentile(50),
+            "p90Seconds": self.percentile(90),
+            "p99Seconds": self.percentile(99)
+        }
+
+
+class HedgeBudget:
+    """
+    Caps hedges to a fraction of calls.
+    
+    Every call earns max_extra_fraction of a hedge credit and every hedge
+    spends one. A hedged call always costs two billed requests (the losing
+    request runs to completion, see RequestHedger), so this keeps billed
+    extra requests within that share of traffic. Credits are capped so a
+    quiet period cannot bank a burst of hedges.
+    """
+    
+    def __init__(self, max_extra_fraction: float, max_credits: float = 10.0):
+        """
+        Initialize budget.
+        
+        Args:
+            max_extra_fraction: Hedges allowed per call (e.g. 0.05 = 5% extra requests)
+            max_credits: Most hedge credits held at once
+        """
+        self.max_extra_fraction = max_extra_fraction
+        self.max_credits = max_credits
+        self.credits = 0.0
+    
+    def earn(self) -> None:
+        """Add credit for one call."""
+        self.credits = min(self.max_credits, self.credits + self.max_extra_fraction)
+    
+    def try_spend(self) -> bool:
+        """Take one hedge credit if available."""
+        if self.credits < 1:
+            return False
+        self.credits -= 1
+        return True
+
+
+class RequestHedger:
+    """
+    Sends a duplicate of a slow OpenAI call once it passes a latency percentile.
+    
+    Each call site keeps its own latency histogram. Once a site has
+    HEDGE_MIN_SAMPLES calls, a call still running after the site's
+    HEDGE_PERCENTILE latency gets a second, identical request (if the
+    budget allows); whichever finishes first wins and the other is
+    abandoned. An abandoned request cannot be cancelled: the blocking
+    client call keeps running in its worker thread (holding its scheduler
+    slot) and is billed, only its result is discarded. Hedging trades that
+    extra cost, capped by HedgeBudget, for tail latency. Only use for
+    idempotent calls. Calls above HEDGE_MAX_TEMPERATURE are never hedged,
+    since a duplicate could return a different answer.
+    """
+    
+    def __init__(self):
+        """Initialize hedger from settings."""
+        self.enabled = settings.hedge_enabled
+        self.percentile = settings.hedge_percentile
+        self.min_samples = settings.hedge_min_samples
+        self.min_delay_seconds = settings.hedge_min_delay_seconds
+        self.max_temperature = settings.hedge_max_temperature
+        self.budget = HedgeBudget(settings.hedge_max_extra_fraction)
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.calls: Dict[str, int] = {}
+        self.hedges: Dict[str, int] = {}
+        self.hedge_wins: Dict[str, int] = {}
+        self.abandoned: Dict[str, int] = {}
+        self.budget_denied = 0
+    
+    def hedge_delay(self, site: str) -> Optional[float]:
+        """
+        Get how long to wait before hedging a call at site.
+        
+        Args:
+            site: Call site name
+        
+        Returns:
+            Seconds, or None if the site has too few samples to hedge
+        """
+        histogram = self.histograms.get(site)
+        if histogram is None or histogram.samples < self.min_samples:
+            return None
+        delay = histogram.percentile(self.percentile)
+        return max(delay, self.min_delay_seconds) if delay is not None else None
+    
+    async def _timed(self, site: str, fn: Callable[..., T], args: tuple, kwargs: Dict[str, Any]) -> T:
+        started = time.monotonic()
+        try:
+            result = await call_openai(fn, *args, **kwargs)
+        except asyncio.CancelledError:
+            # An abandoned loser took at least this long; recording it keeps slow calls visible
+            self.histograms[site].record(time.monotonic() - started)
+            raise
+        self.histograms[site].record(time.monotonic() - started)
+        return result
+    
+    async def call(self, site: str, fn: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Run an OpenAI call through the scheduler, hedging it if it is slow.
+        
+        Args:
+            site: Call site name, e.g. "analysis" or "airlineDetection"
+            fn: Client method, e.g. client.chat.completions.create
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+        
+        Returns:
+            The first successful result (the other request, if any, still
+            completes in the background and is billed)
+        """
+        self.histograms.setdefault(site, LatencyHistogram())
+        self.calls[site] = self.calls.get(site, 0) + 1
+        self.budget.earn()
+        
+        delay = self.hedge_delay(site)
+        temperature = kwargs.get("temperature", 1.0)
+        if not self.enabled or delay is None or temperature > self.max_temperature:
+            return await self._timed(site, fn, args, kwargs)
+        
+        primary = asyncio.create_task(self._timed(site, fn, args, kwargs))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            if not self.budget.try_spend():
+                self.budget_denied += 1
+                return await primary
+            
+            self.hedges[site] = self.hedges.get(site, 0) + 1
+            logger.info(f"Hedging {site} call after {delay:.2f}s")
+            hedge = asyncio.create_task(self._timed(site, fn, args, kwargs))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    if hedge in succeeded and primary not in succeeded:
+                        self.hedge_wins[site] = self.hedge_wins.get(site, 0) + 1
+                    return succeeded[0].result()
+                # A failed request loses to one still running; if none are left, raise its error
+                if not pending:
+                    return done.pop().result()
+            raise RuntimeError("Hedged call finished without a result")
+        finally:
+            # Stop waiting on the loser; its request still runs to completion in the scheduler
+            for task in pending:
+                self.abandoned[site] = self.abandoned.get(site, 0) + 1
+                task.cancel()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get per-site latency, hedge counts and budget for /api/metrics."""
+        return {
+            "enabled": self.enabled,
+            "percentile": self.percentile,
+            "budgetCredits": round(self.budget.credits, 2),
+            "budgetDenied": self.budget_denied,
+            "sites": {
+                site: {
+                    **histogram.summary(),
+                    "calls": self.calls.get(site, 0),
+                    "hedges": self.hedges.get(site, 0),
+                    "hedgeWins": self.hedge_wins.get(site, 0),
+                    "abandonedRequests": self.abandoned.get(site, 0),
+                    "hedgeDelaySeconds": self.hedge_delay(site)
+                }
+                for site, histogram in self.histograms.items()
+            }
+        }
+
+
+_hedger: Optional[RequestHedger] = None
+
+
+def get_request_hedger() -> RequestHedger:
+    """Get the process-wide request hedger."""
+    global _hedger
+    if _hedger is None:
+        _hedger = RequestHedger()
+    return _hedger
+
+
+async def call_openai_hedged(site: str, fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run an idempotent, low-temperature OpenAI call, hedging it when slow.
+    
+    Latency is recorded per site even when hedging is disabled, so
+    /api/metrics shows the distribution the hedge delay would use.
+    
+    Args:
+        site: Call site name used for its latency histogram
+        fn: Client method, e.g. client.chat.completions.create
+        *args: Positional arguments for fn
+        **kwargs: Keyword arguments for fn
+    
+    Returns:
+        Whatever fn returns
+    """
+    return await get_request_hedger().call(site, fn, *args, **kwargs)
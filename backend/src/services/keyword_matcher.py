@@ -0,0 +1,145 @@
+"""Incremental airline and theme keyword matching for streaming text."""
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+from src.config.airlines import AIRLINE_KEYWORDS, score_airline_mentions
+from src.config.themes import THEME_KEYWORDS
+
+# Keywords this short only count as matches on word boundaries (see detect_airlines_in_text)
+SHORT_KEYWORD_LENGTH = 3
+
+
+def _is_word_char(char: Optional[str]) -> bool:
+    return char is not None and (char.isalnum() or char == "_")
+
+
+class IncrementalKeywordMatcher:
+    """
+    Aho-Corasick matcher over all airline and theme keywords.
+    
+    Text is fed in pieces as it arrives and the automaton state carries
+    across calls, so each character is scanned exactly once no matter how
+    many pieces the transcript arrives in. snapshot() produces the same
+    airline and theme detections as detect_airlines_in_text() and
+    detect_themes_in_text() would for the whole text fed so far.
+    """
+    
+    def __init__(self):
+        """Build the automaton from the configured keywords."""
+        patterns = set()
+        for airline, keywords in AIRLINE_KEYWORDS.items():
+            patterns.add(airline.lower())
+            patterns.update(k.lower() for k in keywords)
+        for keywords in THEME_KEYWORDS.values():
+            patterns.update(k.lower() for k in keywords)
+        
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for pattern in sorted(patterns):
+            self._add_pattern(pattern)
+        self._build_failure_links()
+        
+        self._state = 0
+        self._length = 0
+        self._recent = deque(maxlen=SHORT_KEYWORD_LENGTH + 1)
+        # Short keyword hits waiting for the next character to check the boundary
+        self._pending: List[Tuple[str, int]] = []
+        self._counts: Dict[str, int] = {}
+        self._first_position: Dict[str, int] = {}
+        self._bounded: set = set()
+    
+    def _add_pattern(self, pattern: str) -> None:
+        node = 0
+        for char in pattern:
+            if char not in self._goto[node]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[node][char] = len(self._goto) - 1
+            node = self._goto[node][char]
+        self._output[node].append(pattern)
+    
+    def _build_failure_links(self) -> None:
+        # Children of the root fail back to the root; deeper nodes are linked breadth-first
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+    
+    def feed(self, text: str) -> None:
+        """
+        Scan the next piece of text.
+        
+        Args:
+            text: Text appended to the transcript since the last call
+        """
+        for char in text.lower():
+            self._resolve_pending(char)
+            
+            while self._state and char not in self._goto[self._state]:
+                self._state = self._fail[self._state]
+            self._state = self._goto[self._state].get(char, 0)
+            
+            position = self._length
+            self._recent.append(char)
+            self._length += 1
+            
+            for pattern in self._output[self._state]:
+                start = position - len(pattern) + 1
+                self._counts[pattern] = self._counts.get(pattern, 0) + 1
+                if pattern not in self._first_position:
+                    self._first_position[pattern] = start
+                if len(pattern) <= SHORT_KEYWORD_LENGTH and pattern not in self._bounded:
+                    # Character before the match is still in the recent window
+                    before = self._recent[-len(pattern) - 1] if len(self._recent) > len(pattern) else None
+                    if not _is_word_char(before):
+                        self._pending.append((pattern, start))
+    
+    def _resolve_pending(self, next_char: Optional[str]) -> None:
+        if not self._pending:
+            return
+        if not _is_word_char(next_char):
+            for pattern, _ in self._pending:
+                self._bounded.add(pattern)
+        self._pending = []
+    
+    def _matched(self, pattern: str) -> bool:
+        if len(pattern) <= SHORT_KEYWORD_LENGTH:
+            return pattern in self._bounded or any(p == pattern for p, _ in self._pending)
+        return pattern in self._counts
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get detections for all text fed so far.
+        
+        Pending short-keyword hits at the very end of the text count as
+        bounded, as they would be at the end of a complete transcript.
+        
+        Returns:
+            Dict with "airlines" (detect_airlines_in_text format) and
+            "themes" (top 3 theme names)
+        """
+        detected_airlines = score_airline_mentions(
+            self._length,
+            self._matched,
+            lambda pattern: self._counts.get(pattern, 0),
+            lambda pattern: self._first_position.get(pattern, -1)
+        )
+        
+        theme_scores = {}
+        for theme, keywords in THEME_KEYWORDS.items():
+            matches = sum(1 for keyword in keywords if keyword.lower() in self._counts)
+            if matches > 0:
+                theme_scores[theme] = matches
+        sorted_themes = sorted(theme_scores.items(), key=lambda x: x[1], reverse=True)
+        
+        return {
+            "airlines": detected_airlines,
+            "themes": [theme for theme, _ in sorted_themes[:3]]
+        }
@@ -0,0 +1,165 @@
+"""Lexical BM25 prefilter: narrow candidate articles before embedding-based correlation."""
+import logging
+import re
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be been by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lower-case alphanumeric terms, without stopwords."""
+    return [term for term in _TOKEN.findall(text.lower()) if term not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    BM25 index over a small document set, in sparse arrays.
+    
+    Postings are stored by term (CSR style): the documents containing term
+    t and their term frequencies are doc_ids[term_starts[t]:term_starts[t + 1]]
+    and frequencies[...]. Scoring a query touches only its terms' postings.
+    """
+    
+    def __init__(self, documents: Sequence[str]):
+        """
+        Build the index.
+        
+        Args:
+            documents: Document texts
+        """
+        self.size = len(documents)
+        self.vocabulary: Dict[str, int] = {}
+        term_ids: List[int] = []
+        doc_ids: List[int] = []
+        lengths = np.zeros(self.size, dtype=np.float64)
+        for doc_id, text in enumerate(documents):
+            terms = tokenize(text)
+            lengths[doc_id] = len(terms)
+            for term in terms:
+                term_ids.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                doc_ids.append(doc_id)
+        
+        # One (term, document) pair per distinct term in a document, sorted by term
+        pairs, frequencies = np.unique(
+            np.asarray(term_ids, dtype=np.int64) * max(1, self.size) + np.asarray(doc_ids, dtype=np.int64),
+            return_counts=True
+        )
+        pair_terms = pairs // max(1, self.size)
+        self.doc_ids = (pairs % max(1, self.size)).astype(np.int32)
+        self.frequencies = frequencies.astype(np.float64)
+        self.term_starts = np.searchsorted(pair_terms, np.arange(len(self.vocabulary) + 1))
+        
+        document_frequency = np.diff(self.term_starts).astype(np.float64)
+        self.idf = np.log(1 + (self.size - document_frequency + 0.5) / (document_frequency + 0.5))
+        average_length = lengths.mean() if self.size else 0.0
+        self.length_norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / average_length) if average_length else np.full(self.size, BM25_K1)
+    
+    def scores(self, query: str) -> np.ndarray:
+        """Get every document's BM25 score for a query."""
+        scores = np.zeros(self.size)
+        for term in set(tokenize(query)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.term_starts[term_id], self.term_starts[term_id + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.frequencies[start:end]
+            scores[docs] += self.idf[term_id] * tf * (BM25_K1 + 1) / (tf + self.length_norm[docs])
+        return scores
+    
+    def top_k(self, query: str, k: int) -> List[int]:
+        """
+        Get the indices of the k best-scoring documents, best first.
+        
+        Ties (including documents sharing no term with the query) keep
+        document order.
+        """
+        if k >= self.size:
+            return list(range(self.size))
+        return np.argsort(-self.scores(query), kind="stable")[:k].tolist()
+
+
+class LexicalPrefilterStats:
+    """Counts candidate articles in and kept by the prefilter, for /api/metrics."""
+    
+    def __init__(self):
+        """Initialize counters."""
+        self.queries = 0
+        self.articles_in = 0
+        self.articles_kept = 0
+    
+    def record(self, candidates: int, kept: int) -> None:
+        """Count one prefiltered query."""
+        self.queries += 1
+        self.articles_in += candidates
+        self.articles_kept += kept
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get query and article counts."""
+        return {
+            "queries": self.queries,
+            "articlesIn": self.articles_in,
+            "articlesKept": self.articles_kept,
+            "keptShare": round(self.articles_kept / self.articles_in, 4) if self.articles_in else None
+        }
+
+
+_stats: Optional[LexicalPrefilterStats] = None
+
+
+def get_lexical_prefilter_stats() -> LexicalPrefilterStats:
+    """Get the process-wide prefilter counters."""
+    global _stats
+    if _stats is None:
+        _stats = LexicalPrefilterStats()
+    return _stats
+
+
+def prefilter_articles(index: BM25Index, articles: List[Dict], query: str, k: int) -> List[Dict]:
+    """
+    Keep the k articles most lexically similar to a query.
+    
+    Args:
+        index: Index over the articles' texts, in article order
+        articles: Candidate articles
+        query: Transcript or claim text
+        k: Articles to keep; 0 keeps all
+    
+    Returns:
+        Kept articles, in their original order
+    """
+    if k <= 0 or k >= len(articles):
+        return articles
+    kept = sorted(index.top_k(query, k))
+    get_lexical_prefilter_stats().record(len(articles), len(kept))
+    return [articles[i] for i in kept]
+
+
+def prefilter_recall(cases: List[Dict[str, Any]], k: int) -> float:
+    """
+    Measure the prefilter's recall on a labelled benchmark set.
+    
+    Args:
+        cases: [{"query": transcript or claim, "documents": [article text],
+            "relevant": [indices of the relevant documents]}]
+        k: Documents kept per query
+    
+    Returns:
+        Share of relevant documents kept in the top k
+    """
+    relevant = kept = 0
+    for case in cases:
+        top = set(BM25Index(case["documents"]).top_k(case["query"], k))
+        relevant += len(case["relevant"])
+        kept += sum(1 for i in case["relevant"] if i in top)
+    return kept / relevant if relevant else 1.0
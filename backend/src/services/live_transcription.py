@@ -0,0 +1,136 @@
+"""Rolling-window transcription of live audio streams."""
+from typing import Any, Dict, List, Optional
+import numpy as np
+from src.config.settings import settings
+from src.services.audio import write_wav
+from src.services.audio_preprocessing import detect_speech_frames
+from src.services.audio_segmentation import new_words_after_overlap
+from src.services.keyword_matcher import IncrementalKeywordMatcher
+
+
+class LiveTranscriptionSession:
+    """
+    Transcribe a live 16-bit PCM stream in overlapping windows.
+    
+    Audio is buffered until a full window is available, each window is
+    transcribed on its own, and words repeated across the window overlap are
+    dropped. New text is fed to an IncrementalKeywordMatcher, so airline and
+    theme detections are updated without rescanning the transcript.
+    """
+    
+    def __init__(
+        self,
+        transcription_service,
+        sample_rate: int = 16000,
+        language: Optional[str] = None
+    ):
+        """
+        Initialize live session.
+        
+        Args:
+            transcription_service: TranscriptionService used for each window
+            sample_rate: Sample rate of the incoming mono PCM stream
+            language: Optional language code (e.g., 'en', 'hi')
+        """
+        self.transcription_service = transcription_service
+        self.sample_rate = sample_rate
+        self.language = language
+        self.window_samples = int(settings.live_window_seconds * sample_rate)
+        self.overlap_samples = int(settings.live_window_overlap_seconds * sample_rate)
+        self.max_bytes = settings.max_audio_size_mb * 1024 * 1024
+        
+        self.transcript = ""
+        self.words: List[str] = []
+        self.matcher = IncrementalKeywordMatcher()
+        self.received_bytes = 0
+        self.windows_transcribed = 0
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._odd_byte = b""
+        # Whether _pending holds audio not yet covered by a queued window
+        self._has_new_audio = False
+    
+    def add_audio(self, chunk: bytes) -> List[np.ndarray]:
+        """
+        Buffer a chunk of little-endian 16-bit mono PCM.
+        
+        Args:
+            chunk: Raw PCM bytes as received from the client
+        
+        Returns:
+            Windows that are now complete and ready to transcribe
+        
+        Raises:
+            ValueError: If the stream exceeds the maximum audio size
+        """
+        self.received_bytes += len(chunk)
+        if self.received_bytes > self.max_bytes:
+            raise ValueError(f"Live stream exceeds maximum allowed size ({settings.max_audio_size_mb}MB)")
+        
+        data = self._odd_byte + chunk
+        usable = len(data) - len(data) % 2
+        self._odd_byte = data[usable:]
+        if usable:
+            self._pending = np.concatenate([self._pending, np.frombuffer(data[:usable], dtype="<i2")])
+            self._has_new_audio = True
+        
+        windows = []
+        while len(self._pending) >= self.window_samples:
+            windows.append(self._pending[:self.window_samples])
+            # The next window starts with the tail of this one
+            self._pending = self._pending[self.window_samples - self.overlap_samples:]
+            self._has_new_audio = len(self._pending) > self.overlap_samples
+        return windows
+    
+    def flush(self) -> Optional[np.ndarray]:
+        """Get the final partial window once the client stops sending audio."""
+        if not self._has_new_audio or len(self._pending) == 0:
+            return None
+        window = self._pending
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._has_new_audio = False
+        return window
+    
+    async def transcribe_window(self, window: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        Transcribe one window and update detections with the new text.
+        
+        Args:
+            window: 16-bit PCM samples
+        
+        Returns:
+            Partial update message, or None if the window added no text
+        """
+        samples = window.astype(np.float32) / 32768.0
+        if not detect_speech_frames(samples, self.sample_rate).any():
+            return None
+        
+        text = await self.transcription_service.transcribe_wav_segment(
+            write_wav(samples, self.sample_rate),
+            self.language,
+            f"live_{self.windows_transcribed:04d}.wav"
+        )
+        self.windows_transcribed += 1
+        
+        new_words = new_words_after_overlap(self.words, text.split())
+        if not new_words:
+            return None
+        
+        piece = " ".join(new_words)
+        # The matcher sees exactly the characters appended to the transcript
+        appended = f" {piece}" if self.transcript else piece
+        self.matcher.feed(appended)
+        self.transcript += appended
+        self.words.extend(new_words)
+        
+        detections = self.matcher.snapshot()
+        return {
+            "type": "partial",
+            "text": piece,
+            "transcription": self.transcript,
+            "airlines": [a["airline"] for a in detections["airlines"]],
+            "themes": detections["themes"]
+        }
+    
+    def detections(self) -> Dict[str, Any]:
+        """Get keyword detections for the transcript so far."""
+        return self.matcher.snapshot()
@@ -0,0 +1,222 @@
+"""In-process sentiment and market-signal extraction (no network calls)."""
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Aviation-domain sentiment lexicon: word -> weight (positive or negative).
+# "fine" is left out: it is far more often "everything is fine" than a penalty.
+SENTIMENT_LEXICON: Dict[str, float] = {
+    # Positive
+    "growth": 1.0, "grow": 1.0, "growing": 1.0, "expand": 1.0, "expanding": 1.0, "expansion": 1.0,
+    "profit": 1.5, "profitable": 1.5, "profits": 1.5, "record": 1.0, "strong": 1.0, "gain": 1.0,
+    "gains": 1.0, "increase": 0.5, "improve": 1.0, "improved": 1.0, "improvement": 1.0,
+    "hiring": 0.5, "hire": 0.5, "recruit": 0.5, "recruitment": 0.5, "raise": 0.5, "bonus": 1.0,
+    "launch": 1.0, "launches": 1.0, "new": 0.3, "order": 0.5, "orders": 0.5, "delivery": 0.5,
+    "deliveries": 0.5, "approval": 1.0, "approved": 1.0, "success": 1.5, "successful": 1.5,
+    "opportunity": 1.0, "opportunities": 1.0, "better": 1.0, "best": 1.0, "good": 1.0,
+    "positive": 1.0, "optimistic": 1.5, "recovery": 1.0, "recovering": 1.0, "stable": 0.5,
+    "boost": 1.0, "upgrade": 1.0, "partnership": 0.5, "award": 1.0, "punctual": 1.0,
+    # Negative
+    "loss": -1.5, "losses": -1.5, "decline": -1.0, "declining": -1.0, "drop": -1.0, "fall": -1.0,
+    "layoff": -2.0, "layoffs": -2.0, "firing": -2.0, "fired": -2.0, "furlough": -2.0, "cuts": -1.0,
+    "cut": -1.0, "grounded": -2.0, "grounding": -2.0, "delay": -1.0, "delays": -1.0,
+    "cancel": -1.0, "cancelled": -1.0, "cancellation": -1.0, "cancellations": -1.0,
+    "shortage": -1.5, "shortages": -1.5, "crisis": -2.0, "debt": -1.0, "bankruptcy": -2.5,
+    "insolvency": -2.5, "strike": -1.5, "protest": -1.5, "protests": -1.5, "union": -0.3,
+    "resign": -1.0, "resignation": -1.0, "resignations": -1.0, "attrition": -1.0, "quit": -1.0,
+    "fatigue": -1.5, "unsafe": -2.0, "incident": -1.5, "accident": -2.5, "crash": -2.5,
+    "emergency": -1.5, "penalty": -1.5, "penalties": -1.5, "fines": -1.0, "fined": -1.5, "probe": -1.0,
+    "investigation": -1.0, "complaint": -1.0, "complaints": -1.0, "concern": -1.0,
+    "concerns": -1.0, "risk": -1.0, "risks": -1.0, "problem": -1.0, "problems": -1.0,
+    "issue": -0.5, "issues": -0.5, "bad": -1.0, "worse": -1.5, "worst": -2.0, "poor": -1.0,
+    "negative": -1.0, "pressure": -0.5, "drain": -1.0, "unhappy": -1.5, "frustrated": -1.5,
+    "constraint": -0.5, "constraints": -0.5, "poaching": -1.0, "disruption": -1.5
+}
+
+NEGATIONS = {"not", "no", "never", "without", "hardly", "isn't", "aren't", "wasn't", "weren't", "don't", "doesn't", "didn't", "won't"}
+INTENSIFIERS = {"very", "major", "massive", "significant", "significantly", "huge", "severe", "sharp", "sharply", "surge", "record", "aggressive", "aggressively"}
+HEDGES = {"rumor", "rumour", "rumored", "rumoured", "might", "may", "possibly", "reportedly", "unconfirmed", "speculation", "maybe"}
+
+_WORD_PATTERN = re.compile(r"[a-z][a-z'\-]*")
+_SENTENCE_PATTERN = re.compile(r"[^.!?\n]+")
+
+
+def _phrase_pattern(phrases: List[str]) -> "re.Pattern[str]":
+    return re.compile(r"\b(?:" + "|".join(re.escape(p) for p in phrases) + r")\b")
+
+
+# (signal, trend, trigger phrases); checked against each sentence of the text
+MARKET_SIGNAL_RULES: List[Tuple[str, str, "re.Pattern[str]"]] = [
+    ("Increased pilot demand indicators", "up", _phrase_pattern([
+        "hiring", "hire", "hires", "recruiting", "recruitment", "pilot demand", "crew demand", "job openings", "vacancies"
+    ])),
+    ("Workforce reductions", "down", _phrase_pattern([
+        "layoff", "layoffs", "laid off", "firing", "fired", "job cuts", "furlough", "furloughs", "termination", "terminations"
+    ])),
+    ("Fleet expansion announcements expected", "up", _phrase_pattern([
+        "fleet expansion", "aircraft order", "orders", "ordered", "deliveries", "delivery", "new aircraft", "induct", "inducting", "leased"
+    ])),
+    ("Fleet groundings and capacity loss", "down", _phrase_pattern([
+        "grounded", "grounding", "groundings", "engine issue", "engine issues", "aog", "parked aircraft"
+    ])),
+    ("Training capacity constraints", "stable", _phrase_pattern([
+        "training", "simulator", "simulators", "type rating", "training backlog"
+    ])),
+    ("Route network expansion", "up", _phrase_pattern([
+        "new route", "new routes", "route expansion", "new destination", "new destinations", "launch flights", "new flights"
+    ])),
+    ("Route or capacity cuts", "down", _phrase_pattern([
+        "suspend", "suspended", "suspends", "route cuts", "cut routes", "capacity cut", "capacity cuts", "cancelled flights"
+    ])),
+    ("Pilot attrition and pay pressure", "up", _phrase_pattern([
+        "salary", "salaries", "pay", "resign", "resigned", "resignation", "resignations", "attrition", "quit", "quitting", "poaching", "talent drain"
+    ])),
+    ("Financial performance indicators", "up", _phrase_pattern([
+        "profit", "profits", "revenue growth", "earnings", "record revenue"
+    ])),
+    ("Financial stress indicators", "down", _phrase_pattern([
+        "loss", "losses", "debt", "insolvency", "bankruptcy", "unpaid", "dues"
+    ])),
+    ("Regulatory scrutiny", "up", _phrase_pattern([
+        "dgca", "regulator", "regulatory", "compliance", "penalty", "fined", "show cause", "audit"
+    ])),
+    ("Safety and crew fatigue concerns", "up", _phrase_pattern([
+        "safety", "incident", "fatigue", "rest period", "emergency", "near miss"
+    ]))
+]
+
+_STRENGTH_ORDER = {"Strong": 0, "Moderate": 1, "Weak": 2}
+_SIGNAL_NAMES = {signal.lower(): signal for signal, _, _ in MARKET_SIGNAL_RULES}
+
+
+def classify_market_signal(text: str) -> Optional[str]:
+    """
+    Map free text (an LLM signal name or prediction) onto a MARKET_SIGNAL_RULES signal.
+    
+    Args:
+        text: Signal or event description
+    
+    Returns:
+        The rule's signal name (an exact name match first, otherwise the
+        first rule whose phrases occur in the text), or None
+    """
+    lowered = text.lower().strip()
+    if lowered in _SIGNAL_NAMES:
+        return _SIGNAL_NAMES[lowered]
+    for signal, _, pattern in MARKET_SIGNAL_RULES:
+        if pattern.search(lowered):
+            return signal
+    return None
+
+
+def score_sentiment(text: str) -> Dict[str, Any]:
+    """
+    Score sentiment with the aviation lexicon.
+    
+    A word directly after a negation ("not", "no", ...) counts with the
+    opposite sign. The breakdown is the share of positive, neutral and
+    negative sentences.
+    
+    Args:
+        text: Text to score
+    
+    Returns:
+        Sentiment dict in the analysis response format
+        ({"overall", "score", "breakdown"})
+    """
+    positive = 0.0
+    negative = 0.0
+    sentence_counts = {"positive": 0, "neutral": 0, "negative": 0}
+    
+    for sentence in _SENTENCE_PATTERN.findall(text.lower()):
+        sentence_score = 0.0
+        negated = False
+        for word in _WORD_PATTERN.findall(sentence):
+            weight = SENTIMENT_LEXICON.get(word)
+            if weight is not None:
+                if negated:
+                    weight = -weight
+                sentence_score += weight
+                if weight > 0:
+                    positive += weight
+                else:
+                    negative -= weight
+            negated = word in NEGATIONS
+        if sentence_score > 0:
+            sentence_counts["positive"] += 1
+        elif sentence_score < 0:
+            sentence_counts["negative"] += 1
+        elif sentence.strip():
+            sentence_counts["neutral"] += 1
+    
+    total = positive + negative
+    if not total:
+        return {
+            "overall": "Neutral",
+            "score": 0.5,
+            "breakdown": {"positive": 33, "neutral": 34, "negative": 33}
+        }
+    
+    # Polarity in [-1, 1], damped for texts with little sentiment-bearing language
+    polarity = (positive - negative) / total * (1 - math.exp(-total / 2))
+    overall = "Positive" if polarity > 0.2 else "Negative" if polarity < -0.2 else "Neutral"
+    sentences = sum(sentence_counts.values()) or 1
+    positive_share = round(100 * sentence_counts["positive"] / sentences)
+    negative_share = round(100 * sentence_counts["negative"] / sentences)
+    return {
+        "overall": overall,
+        "score": round((polarity + 1) / 2, 3),
+        "breakdown": {
+            "positive": positive_share,
+            "neutral": 100 - positive_share - negative_share,
+            "negative": negative_share
+        }
+    }
+
+
+def extract_market_signals(text: str, limit: int = 5) -> List[Dict[str, str]]:
+    """
+    Extract market signals with rule-based phrase matching.
+    
+    A signal is Strong when it is mentioned in three or more sentences or
+    next to an intensifier ("major", "surge", ...), Weak when its only
+    mention is hedged ("rumor", "might", ...), and Moderate otherwise.
+    
+    Args:
+        text: Text to scan
+        limit: Most signals to return
+    
+    Returns:
+        Signals in the analysis response format ({"signal", "strength", "trend"}),
+        strongest first; a single Moderate placeholder if nothing matched
+    """
+    sentences = [
+        (sentence, set(_WORD_PATTERN.findall(sentence)))
+        for sentence in _SENTENCE_PATTERN.findall(text.lower())
+    ]
+    
+    signals = []
+    for signal, trend, pattern in MARKET_SIGNAL_RULES:
+        mentions = 0
+        intensified = False
+        hedged = False
+        for sentence, words in sentences:
+            if pattern.search(sentence):
+                mentions += 1
+                intensified = intensified or bool(words & INTENSIFIERS)
+                hedged = hedged or bool(words & HEDGES)
+        if not mentions:
+            continue
+        if mentions >= 3 or intensified:
+            strength = "Strong"
+        elif mentions == 1 and hedged:
+            strength = "Weak"
+        else:
+            strength = "Moderate"
+        signals.append(({"signal": signal, "strength": strength, "trend": trend}, mentions))
+    
+    if not signals:
+        return [{"signal": "Market activity detected", "strength": "Moderate", "trend": "stable"}]
+    
+    signals.sort(key=lambda item: (_STRENGTH_ORDER[item[0]["strength"]], -item[1]))
+    return [signal for signal, _ in signals[:limit]]
@@ -0,0 +1,192 @@
+"""Per-stage model routing with escalation, latency and cost tracking."""
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+from src.config.settings import settings
+from src.services.hedging import LatencyHistogram, call_openai_hedged
+from src.services.openai_scheduler import call_openai
+from src.services.request_context import has_time_for
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M tokens (input, output), from PLATFORM_COSTING.md; longest matching prefix wins
+MODEL_PRICES: Dict[str, tuple] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00)
+}
+
+
+def model_for_stage(stage: str) -> str:
+    """
+    Get the model routed to a pipeline stage.
+    
+    Args:
+        stage: Stage name, e.g. "primaryAirline" or "claimExtraction"
+    
+    Returns:
+        Model from MODEL_ROUTES, or ANALYSIS_MODEL if the stage is not routed
+    """
+    return settings.model_routes_map.get(stage, settings.analysis_model)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """
+    Estimate the USD cost of a completion.
+    
+    Args:
+        model: Model name (dated variants such as gpt-4o-2024-08-06 match their base model)
+        prompt_tokens: Input tokens
+        completion_tokens: Output tokens
+    
+    Returns:
+        Cost in USD, or None for models without a known price
+    """
+    matches = [name for name in MODEL_PRICES if model.startswith(name)]
+    if not matches:
+        return None
+    input_price, output_price = MODEL_PRICES[max(matches, key=len)]
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def json_response_check(key: str, min_confidence: Optional[float] = None) -> Callable[[str], bool]:
+    """
+    Build an escalation check for JSON responses.
+    
+    Args:
+        key: Top-level key the response must contain
+        min_confidence: If set, the items under key (when it is a non-empty list)
+            must have a mean "confidence" of at least this value
+    
+    Returns:
+        Function taking the response text and returning True if it is acceptable
+    """
+    def check(content: str) -> bool:
+        try:
+            parsed = json.loads(content)
+        except (TypeError, ValueError):
+            return False
+        if not isinstance(parsed, dict) or key not in parsed:
+            return False
+        items = parsed[key]
+        if min_confidence is None or not isinstance(items, list) or not items:
+            return True
+        confidences = []
+        for item in items:
+            try:
+                confidences.append(float(item.get("confidence", 0)))
+            except (AttributeError, TypeError, ValueError):
+                confidences.append(0.0)
+        return sum(confidences) / len(confidences) >= min_confidence
+    return check
+
+
+class StageStats:
+    """Latency, token and cost totals for one pipeline stage."""
+    
+    def __init__(self):
+        """Initialize empty totals."""
+        self.latency = LatencyHistogram()
+        self.calls = 0
+        self.escalations = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.models: Dict[str, int] = {}
+    
+    def record(self, model: str, seconds: float, response: Any) -> None:
+        """Record one completion."""
+        self.calls += 1
+        self.models[model] = self.models.get(model, 0) + 1
+        self.latency.record(seconds)
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        if cost is not None:
+            self.cost_usd += cost
+    
+    def summary(self) -> Dict[str, Any]:
+        """Get totals for /api/metrics."""
+        return {
+            **self.latency.summary(),
+            "calls": self.calls,
+            "escalations": self.escalations,
+            "models": dict(self.models),
+            "promptTokens": self.prompt_tokens,
+            "completionTokens": self.completion_tokens,
+            "costUsd": round(self.cost_usd, 6),
+            "avgCostUsd": round(self.cost_usd / self.calls, 6) if self.calls else None
+        }
+
+
+_stage_stats: Dict[str, StageStats] = {}
+
+
+def stage_stats() -> Dict[str, Dict[str, Any]]:
+    """Get per-stage latency and cost totals."""
+    return {stage: stats.summary() for stage, stats in _stage_stats.items()}
+
+
+async def _complete(stage: str, model: str, fn: Callable, hedge: bool, kwargs: Dict[str, Any]) -> Any:
+    stats = _stage_stats.setdefault(stage, StageStats())
+    started = time.monotonic()
+    if hedge:
+        response = await call_openai_hedged(stage, fn, model=model, **kwargs)
+    else:
+        response = await call_openai(fn, model=model, **kwargs)
+    stats.record(model, time.monotonic() - started, response)
+    return response
+
+
+async def complete_for_stage(
+    stage: str,
+    client,
+    model: Optional[str] = None,
+    check: Optional[Callable[[str], bool]] = None,
+    hedge: bool = False,
+    **kwargs
+) -> Any:
+    """
+    Run a chat completion on the model routed to a stage.
+    
+    If check rejects the response (invalid JSON, low confidence, ...) and
+    the stage ran on a model other than ANALYSIS_MODEL, the call is
+    retried once on ANALYSIS_MODEL, provided MODEL_ESCALATION_ENABLED is
+    set and the request deadline leaves time for it.
+    
+    Args:
+        stage: Stage name used for routing and /api/metrics
+        client: OpenAI client
+        model: Model to use instead of the stage's route
+        check: Function taking the response text, returning False to escalate
+        hedge: Whether to hedge the call (see hedging.call_openai_hedged)
+        **kwargs: Arguments for chat.completions.create other than model
+    
+    Returns:
+        The chat completion response
+    """
+    model = model or model_for_stage(stage)
+    fn = client.chat.completions.create
+    response = await _complete(stage, model, fn, hedge, kwargs)
+    
+    escalation_model = settings.analysis_model
+    if (
+        check is None
+        or model == escalation_model
+        or not settings.model_escalation_enabled
+        or check(response.choices[0].message.content or "")
+    ):
+        return response
+    if not has_time_for(settings.deadline_stage_min_seconds):
+        return response
+    
+    _stage_stats[stage].escalations += 1
+    logger.info(f"Escalating {stage} from {model} to {escalation_model}")
+    try:
+        return await _complete(stage, escalation_model, fn, hedge, kwargs)
+    except Exception as e:
+        logger.warning(f"Escalated {stage} call failed, keeping {model} response: {str(e)}")
+        return response
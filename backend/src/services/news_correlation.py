@@ -1,21 +1,110 @@
 """News correlation service for validating voice transcripts against real news."""
+import asyncio
 import httpx
 import json
-from typing import Dict, List, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 from src.config.settings import settings
+from src.services.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from src.services.rate_limit import get_rate_limiter
+from src.services.request_context import DeadlineExceeded, remaining_seconds
 
 logger = logging.getLogger(__name__)
 
+# Last successful result per query, served while the NewsAPI circuit is open
+LAST_GOOD_RESULTS_MAX = 64
+_last_good_results: "OrderedDict[str, List[Dict]]" = OrderedDict()
+
 
 class NewsCorrelationService:
-    """Service for correlating voice transcripts with aviation news."""
+    """
+    Service for correlating voice transcripts with aviation news.
+    
+    Identical requests made through the same instance are sent once and
+    their results shared, so a batch of transcripts that mention the same
+    airlines reuses one news fetch.
+    
+    Requests go through the "newsapi" circuit breaker. While it is open,
+    the last good result for the same query is returned if there is one;
+    otherwise the fetch fails fast and the search returns no articles.
+    Searches report whether their own result came from that fallback, so
+    one caller's outage does not mark the results of others sharing the
+    instance.
+    """
     
     def __init__(self):
         self.api_key = settings.newsapi_key
         self.base_url = "https://newsapi.ai/api/v1/article/getArticles"
         self.timeout = 30
+        # In-flight and completed fetches keyed by request parameters
+        self._requests: Dict[str, asyncio.Task] = {}
+    
+    async def _fetch_articles(self, params: Dict[str, Any]) -> Tuple[List[Dict], bool]:
+        """
+        Fetch raw articles, sharing the request with identical concurrent or earlier calls.
+        
+        Args:
+            params: NewsAPI.ai query parameters
+        
+        Returns:
+            (raw article results from NewsAPI.ai, whether they are the last
+            good result served while the circuit is open)
+        """
+        key = json.dumps(params, sort_keys=True)
+        task = self._requests.get(key)
+        if task is None:
+            task = asyncio.create_task(self._request_articles(key, params))
+            self._requests[key] = task
+        try:
+            # shield() keeps one caller's cancellation from failing the others
+            return await asyncio.shield(task)
+        except Exception:
+            # Failed fetches are not kept, so a later call can retry
+            if task.done() and self._requests.get(key) is task:
+                del self._requests[key]
+            raise
+    
+    async def _request_articles(self, key: str, params: Dict[str, Any]) -> Tuple[List[Dict], bool]:
+        breaker = get_circuit_breaker("newsapi")
+        if not breaker.allow_request():
+            if key in _last_good_results:
+                logger.warning("NewsAPI circuit open, using last good result for this query")
+                return _last_good_results[key], True
+            raise CircuitOpenError(breaker.name)
+        
+        # Never wait past the request deadline
+        timeout = self.timeout
+        remaining = remaining_seconds()
+        if remaining is not None:
+            if remaining <= 0:
+                raise DeadlineExceeded("Request deadline reached before the news fetch")
+            timeout = min(timeout, remaining)
+        
+        await get_rate_limiter("newsapi").acquire()
+        started = time.monotonic()
+        try:
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                response = await client.get(self.base_url, params=params)
+                response.raise_for_status()
+                data = response.json()
+                articles = data.get("articles", {}).get("results", [])
+        except Exception as e:
+            # 4xx means NewsAPI answered; only outages and timeouts count against it
+            if isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500:
+                breaker.record_success(time.monotonic() - started)
+            else:
+                breaker.record_failure(time.monotonic() - started)
+            raise
+        
+        breaker.record_success(time.monotonic() - started)
+        _last_good_results[key] = articles
+        _last_good_results.move_to_end(key)
+        while len(_last_good_results) > LAST_GOOD_RESULTS_MAX:
+            _last_good_results.popitem(last=False)
+        return articles, False
     
     def _build_query_json(self, keywords: List[str], operator: str = "$or") -> str:
         """
@@ -60,7 +149,7 @@ class NewsCorrelationService:
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
         max_results: int = 10
-    ) -> List[Dict]:
+    ) -> Tuple[List[Dict], bool]:
         """
         Search aviation news from NewsAPI.ai
         
@@ -72,12 +161,13 @@ class NewsCorrelationService:
             max_results: Maximum number of articles to return
             
         Returns:
-            List of news articles with metadata
+            (news articles with metadata, whether NewsAPI was unavailable:
+            the articles are then the last good result, or none)
         """
         if not self.api_key:
             logger.warning("NewsAPI key not configured, skipping news search")
             logger.warning("Please set NEWSAPI_KEY in your .env file to enable news fetching")
-            return []
+            return [], False
         
         # Parse query string into keywords
         # Split by spaces and common separators
@@ -112,26 +202,27 @@ class NewsCorrelationService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.base_url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                articles = data.get("articles", {}).get("results", [])
-                return self._format_articles(articles)
+            articles, from_fallback = await self._fetch_articles(params)
+            return self._format_articles(articles), from_fallback
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping news search: {str(e)}")
+            return [], True
+        except DeadlineExceeded as e:
+            logger.warning(f"Skipping news search: {str(e)}")
+            return [], False
         except httpx.HTTPStatusError as e:
             logger.error(f"NewsAPI HTTP error: {e.response.status_code} - {e.response.text}")
-            return []
+            return [], False
         except Exception as e:
             logger.error(f"NewsAPI search failed: {str(e)}", exc_info=True)
-            return []
+            return [], False
     
     async def get_all_aviation_news(
         self,
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
         max_results: int = 100
-    ) -> List[Dict]:
+    ) -> Tuple[List[Dict], bool]:
         """
         Fetch all recent aviation news from NewsAPI.ai (not search-based).
         
@@ -141,11 +232,12 @@ class NewsCorrelationService:
             max_results: Maximum number of articles to return
             
         Returns:
-            List of all aviation news articles
+            (all aviation news articles, whether NewsAPI was unavailable, as
+            for search_aviation_news)
         """
         if not self.api_key:
             logger.warning("NewsAPI key not configured, skipping news fetch")
-            return []
+            return [], False
         
         # Default to last 7 days if no date range
         if not date_from:
@@ -175,20 +267,21 @@ class NewsCorrelationService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.base_url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                articles = data.get("articles", {}).get("results", [])
-                logger.info(f"Fetched {len(articles)} aviation news articles")
-                return self._format_articles(articles)
+            articles, from_fallback = await self._fetch_articles(params)
+            logger.info(f"Fetched {len(articles)} aviation news articles")
+            return self._format_articles(articles), from_fallback
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping news fetch: {str(e)}")
+            return [], True
+        except DeadlineExceeded as e:
+            logger.warning(f"Skipping news fetch: {str(e)}")
+            return [], False
         except httpx.HTTPStatusError as e:
             logger.error(f"NewsAPI HTTP error: {e.response.status_code} - {e.response.text}")
-            return []
+            return [], False
         except Exception as e:
             logger.error(f"NewsAPI fetch failed: {str(e)}", exc_info=True)
-            return []
+            return [], False
     
     def _format_articles(self, articles: List[Dict]) -> List[Dict]:
         """Format articles into standard structure."""
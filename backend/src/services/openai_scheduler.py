@@ -0,0 +1,425 @@
+"""Client-side scheduling of OpenAI calls: rate limits, adaptive concurrency and retries."""
+import asyncio
+import logging
+import random
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    InternalServerError,
+    OpenAI,
+    RateLimitError
+)
+from src.config.settings import settings
+from src.services.circuit_breaker import CircuitBreaker, CircuitOpenError, get_circuit_breaker
+from src.services.rate_limit import TokenBucket, get_rate_limiter
+from src.services.request_context import DeadlineExceeded, drop_stage, remaining_seconds
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Remaining quota (fraction of the limit) below which concurrency is reduced
+LOW_QUOTA_FRACTION = 0.1
+# Minimum time between multiplicative decreases, so one burst of 429s halves once
+DECREASE_COOLDOWN_SECONDS = 1.0
+
+
+def create_openai_client() -> OpenAI:
+    """
+    Create an OpenAI client for use with the scheduler.
+    
+    The SDK's own retries are disabled; OpenAIScheduler retries instead so
+    backoff is shared across all call sites. OPENAI_BASE_URL points the
+    client at another endpoint (e.g. a local fake server).
+    
+    Returns:
+        OpenAI client
+    """
+    return OpenAI(
+        api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url or None,
+        max_retries=0
+    )
+
+
+def _parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parse OpenAI reset durations such as "1s", "6m0s" or "20ms" into seconds.
+    
+    Args:
+        value: Header value
+    
+    Returns:
+        Seconds, or None if the value is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def _retry_after(headers: Any) -> Optional[float]:
+    """Get the server-requested delay in seconds from retry-after headers."""
+    if not headers:
+        return None
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return float(milliseconds) / 1000
+        except ValueError:
+            pass
+    return _parse_duration(headers.get("retry-after"))
+
+
+def _estimate_tokens(kwargs: Dict[str, Any]) -> int:
+    """
+    Estimate the tokens a request will use, for the tokens-per-minute bucket.
+    
+    Uses roughly 4 characters per token for the input plus max_tokens
+    for the completion.
+    
+    Args:
+        kwargs: Keyword arguments of the client call
+    
+    Returns:
+        Estimated token count (0 for calls without text input, e.g. Whisper)
+    """
+    characters = 0
+    for message in kwargs.get("messages") or []:
+        content = message.get("content") if isinstance(message, dict) else None
+        if isinstance(content, str):
+            characters += len(content)
+    text_input = kwargs.get("input")
+    if isinstance(text_input, str):
+        characters += len(text_input)
+    elif isinstance(text_input, list):
+        characters += sum(len(item) for item in text_input if isinstance(item, str))
+    
+    if not characters and "messages" not in kwargs:
+        return 0
+    return characters // 4 + int(kwargs.get("max_tokens") or 0)
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    AIMD concurrency limit.
+    
+    The limit grows by 1/limit after each healthy response (about one slot
+    per round of requests) and is halved when the provider signals
+    pressure: a 429, or rate-limit headers showing the quota nearly spent.
+    """
+    
+    def __init__(self, initial: int, minimum: int, maximum: int):
+        """
+        Initialize limit.
+        
+        Args:
+            initial: Starting concurrency
+            minimum: Lowest concurrency the limit can shrink to
+            maximum: Highest concurrency the limit can grow to
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+    
+    async def acquire(self) -> None:
+        """Wait for a free slot."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+    
+    async def release(self) -> None:
+        """Free a slot."""
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+    
+    def increase(self) -> None:
+        """Additive increase after a healthy response."""
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+    
+    def decrease(self) -> None:
+        """Multiplicative decrease, at most once per cooldown."""
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_COOLDOWN_SECONDS:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit / 2)
+        logger.info(f"OpenAI concurrency limit reduced to {int(self.limit)}")
+
+
+class OpenAIScheduler:
+    """
+    Shared scheduler for all OpenAI calls.
+    
+    Each call waits for a request token (OPENAI_REQUESTS_PER_MINUTE), an
+    estimated-token allowance (OPENAI_TOKENS_PER_MINUTE) and a concurrency
+    slot from an AIMD limit driven by x-ratelimit-* headers. 429s, 5xx and
+    connection errors are retried with full-jitter exponential backoff,
+    honoring Retry-After; a 429 also pauses every call until the requested
+    time has passed. Attempts go through the "openai" circuit breaker, so
+    while OpenAI is down calls fail fast into the callers' fallbacks;
+    transcriptions, which can take minutes, go through the "whisper" breaker
+    instead so their latency does not open the chat and embedding one. A
+    request's slot is held, and its outcome reported to the breaker, until
+    its worker thread finishes, even if the caller stopped waiting.
+    Waiting, calls and retries are bounded by the request deadline, if any.
+    """
+    
+    def __init__(self):
+        """Initialize scheduler from settings."""
+        self.requests = get_rate_limiter("openai")
+        self.breaker = get_circuit_breaker("openai")
+        self.transcription_breaker = get_circuit_breaker("whisper")
+        tokens_per_minute = settings.openai_tokens_per_minute
+        # Allow bursts of about ten seconds' worth of tokens
+        self.tokens = TokenBucket(tokens_per_minute, burst=int(tokens_per_minute / 6) or None)
+        self.concurrency = AdaptiveConcurrencyLimit(
+            initial=settings.openai_initial_concurrency,
+            minimum=settings.openai_min_concurrency,
+            maximum=settings.openai_max_concurrency
+        )
+        self.max_retries = settings.openai_max_retries
+        self.retry_base_seconds = settings.openai_retry_base_seconds
+        self.retry_max_seconds = settings.openai_retry_max_seconds
+        self._paused_until = 0.0
+        self.retries = 0
+        self.rate_limited = 0
+    
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Delay before the next attempt: full jitter, but never before Retry-After."""
+        ceiling = min(self.retry_max_seconds, self.retry_base_seconds * (2 ** attempt))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.retry_max_seconds))
+        return delay
+    
+    def _observe_headers(self, headers: Any) -> None:
+        """Adjust concurrency from x-ratelimit-* response headers."""
+        low_quota = False
+        for kind in ("requests", "tokens"):
+            try:
+                limit = float(headers.get(f"x-ratelimit-limit-{kind}") or 0)
+                remaining = float(headers.get(f"x-ratelimit-remaining-{kind}") or limit)
+            except (TypeError, ValueError):
+                continue
+            if limit > 0 and remaining / limit < LOW_QUOTA_FRACTION:
+                low_quota = True
+                # Hold new calls until this quota window resets
+                reset = _parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    self._paused_until = max(self._paused_until, time.monotonic() + reset)
+        
+        if low_quota:
+            self.concurrency.decrease()
+        else:
+            self.concurrency.increase()
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, (RateLimitError, InternalServerError, APIConnectionError)):
+            return True
+        return isinstance(error, APIStatusError) and error.status_code >= 500
+    
+    async def _wait_for_capacity(self, estimated_tokens: int) -> None:
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+        await self.requests.acquire()
+        if estimated_tokens:
+            await self.tokens.acquire(estimated_tokens)
+    
+    async def _within_deadline(self, awaitable: Awaitable[T]) -> T:
+        """Await within the current request's remaining budget."""
+        remaining = remaining_seconds()
+        if remaining is None:
+            return await awaitable
+        if remaining <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            else:
+                awaitable.cancel()
+        else:
+            try:
+                return await asyncio.wait_for(awaitable, remaining)
+            except asyncio.TimeoutError:
+                pass
+        drop_stage()
+        raise DeadlineExceeded("Request deadline reached before the OpenAI call completed")
+    
+    def _invoke(
+        self,
+        fn: Callable[..., T],
+        args: tuple,
+        kwargs: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> T:
+        """
+        Run the client call, reading rate-limit headers when the SDK exposes them.
+        
+        For SDK methods, timeout (the remaining request budget) is passed on
+        so the HTTP request itself is abandoned at the deadline.
+        """
+        owner = getattr(fn, "__self__", None)
+        raw_client = getattr(owner, "with_raw_response", None)
+        raw_fn = getattr(raw_client, getattr(fn, "__name__", ""), None)
+        if raw_fn is None:
+            return fn(*args, **kwargs)
+        if timeout is not None and "timeout" not in kwargs:
+            kwargs = {**kwargs, "timeout": timeout}
+        raw_response = raw_fn(*args, **kwargs)
+        self._observe_headers(raw_response.headers)
+        return raw_response.parse()
+    
+    async def _attempt(self, breaker: CircuitBreaker, fn: Callable[..., T], args: tuple, kwargs: Dict[str, Any]) -> T:
+        """
+        Make one request in a worker thread, holding a concurrency slot until the thread finishes.
+        
+        The slot is released and the outcome reported to the circuit breaker
+        only once the request is really over. call() shields this task, so a
+        caller cancelled by its deadline or a lost hedge does not free the
+        slot while the HTTP request is still running.
+        """
+        await self.concurrency.acquire()
+        started = time.monotonic()
+        try:
+            result = await asyncio.to_thread(self._invoke, fn, args, kwargs, remaining_seconds())
+        except Exception as e:
+            # 429s are handled by backoff and AIMD; only outages count against the circuit
+            if self._is_retryable(e) and not isinstance(e, RateLimitError):
+                breaker.record_failure(time.monotonic() - started)
+            else:
+                breaker.record_success(time.monotonic() - started)
+            raise
+        else:
+            breaker.record_success(time.monotonic() - started)
+            return result
+        finally:
+            await self.concurrency.release()
+    
+    async def call(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Run a blocking OpenAI client call under the shared limits, with retries.
+        
+        Args:
+            fn: Client method (e.g. client.chat.completions.create) or any
+                blocking callable that makes one OpenAI request
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+        
+        Returns:
+            Whatever fn returns
+        
+        Raises:
+            CircuitOpenError: If the OpenAI circuit is open
+            DeadlineExceeded: If the request deadline passes first
+            Exception: The last error, once it is not retryable or retries run out
+        """
+        return await self._call(self.breaker, fn, args, kwargs)
+    
+    async def transcribe(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Run a blocking Whisper call like call(), under the "whisper" circuit breaker."""
+        return await self._call(self.transcription_breaker, fn, args, kwargs)
+    
+    async def _call(self, breaker: CircuitBreaker, fn: Callable[..., T], args: tuple, kwargs: Dict[str, Any]) -> T:
+        estimated_tokens = _estimate_tokens(kwargs)
+        attempt = 0
+        while True:
+            await self._within_deadline(self._wait_for_capacity(estimated_tokens))
+            if not breaker.allow_request():
+                raise CircuitOpenError(breaker.name)
+            request = asyncio.ensure_future(self._attempt(breaker, fn, args, kwargs))
+            # Retrieve the outcome even if nobody awaits it any more
+            request.add_done_callback(lambda task: task.cancelled() or task.exception())
+            try:
+                return await self._within_deadline(asyncio.shield(request))
+            except Exception as e:
+                if isinstance(e, DeadlineExceeded):
+                    raise
+                if not self._is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                response = getattr(e, "response", None)
+                retry_after = _retry_after(getattr(response, "headers", None))
+                if isinstance(e, RateLimitError):
+                    self.rate_limited += 1
+                    self.concurrency.decrease()
+                    if retry_after:
+                        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+                delay = self._backoff(attempt, retry_after)
+                remaining = remaining_seconds()
+                if remaining is not None and delay >= remaining:
+                    # No time left to wait out the backoff
+                    raise
+                logger.warning(f"OpenAI call failed ({type(e).__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+            
+            self.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get current limits and retry counters."""
+        return {
+            "concurrencyLimit": int(self.concurrency.limit),
+            "inFlight": self.concurrency.in_flight,
+            "retries": self.retries,
+            "rateLimited": self.rate_limited
+        }
+
+
+_scheduler: Optional[OpenAIScheduler] = None
+
+
+def get_openai_scheduler() -> OpenAIScheduler:
+    """Get the process-wide OpenAI scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = OpenAIScheduler()
+    return _scheduler
+
+
+async def call_openai(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a blocking OpenAI call through the shared scheduler.
+    
+    The call runs in a worker thread so concurrent analyses are not
+    serialized on the event loop.
+    
+    Args:
+        fn: Client method, e.g. client.chat.completions.create
+        *args: Positional arguments for fn
+        **kwargs: Keyword arguments for fn
+    
+    Returns:
+        Whatever fn returns
+    """
+    return await get_openai_scheduler().call(fn, *args, **kwargs)
+
+
+async def call_openai_transcription(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a blocking Whisper call through the shared scheduler.
+    
+    Like call_openai, but under its own circuit breaker with the longer
+    WHISPER_SLOW_CALL_SECONDS threshold.
+    
+    Args:
+        fn: Blocking callable making one transcription request
+        *args: Positional arguments for fn
+        **kwargs: Keyword arguments for fn
+    
+    Returns:
+        Whatever fn returns
+    """
+    return await get_openai_scheduler().transcribe(fn, *args, **kwargs)
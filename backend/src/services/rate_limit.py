@@ -0,0 +1,74 @@
+"""Per-provider rate limiting for outbound API calls."""
+import asyncio
+import time
+from typing import Dict, Optional
+from src.config.settings import settings
+
+
+class TokenBucket:
+    """
+    Async token bucket allowing a steady request rate with short bursts.
+    
+    Waiters are served in arrival order: the lock is held while a caller
+    sleeps for its token, so later callers queue behind it.
+    """
+    
+    def __init__(self, requests_per_minute: float, burst: Optional[int] = None):
+        """
+        Initialize token bucket.
+        
+        Args:
+            requests_per_minute: Sustained rate; 0 or less disables limiting
+            burst: Maximum tokens held at once (defaults to one second's worth, at least 1)
+        """
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(burst) if burst else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    async def acquire(self, amount: float = 1) -> None:
+        """
+        Wait until amount tokens are available and take them.
+        
+        Args:
+            amount: Tokens to take (requests, or estimated LLM tokens);
+                capped at the bucket capacity so large requests still proceed
+        """
+        if self.rate <= 0:
+            return
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            if self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+
+_limiters: Dict[str, TokenBucket] = {}
+
+
+def get_rate_limiter(provider: str) -> TokenBucket:
+    """
+    Get the shared rate limiter for a provider ("openai" or "newsapi").
+    
+    Args:
+        provider: Provider name
+    
+    Returns:
+        Process-wide TokenBucket for the provider
+    """
+    if provider not in _limiters:
+        rates = {
+            "openai": settings.openai_requests_per_minute,
+            "newsapi": settings.newsapi_requests_per_minute
+        }
+        _limiters[provider] = TokenBucket(rates.get(provider, 0))
+    return _limiters[provider]
+
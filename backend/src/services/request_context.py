@@ -0,0 +1,165 @@
+"""Per-request deadline propagated through the analysis pipeline."""
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's time budget has run out."""
+
+
+class Deadline:
+    """Time budget for one request, shared by every stage working on it."""
+    
+    def __init__(self, seconds: float):
+        """
+        Initialize deadline.
+        
+        Args:
+            seconds: Total budget for the request
+        """
+        self.budget = seconds
+        self.started = time.monotonic()
+        self.expires_at = self.started + seconds
+        self.dropped_stages: List[str] = []
+    
+    def remaining(self) -> float:
+        """Get the seconds left before the deadline (0 once it has passed)."""
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    def drop(self, stage: str) -> None:
+        """Record that a stage was skipped or cut short by the deadline."""
+        if stage not in self.dropped_stages:
+            self.dropped_stages.append(stage)
+            logger.warning(f"Deadline: dropped stage {stage} with {self.remaining():.1f}s left")
+    
+    def summary(self) -> Dict[str, Any]:
+        """Get the budget, time used and dropped stages for the response."""
+        return {
+            "budgetSeconds": self.budget,
+            "elapsedSeconds": round(time.monotonic() - self.started, 2),
+            "droppedStages": list(self.dropped_stages)
+        }
+
+
+_deadline: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+_stage: ContextVar[Optional[str]] = ContextVar("stage", default=None)
+
+
+def resolve_deadline_seconds(requested: Optional[float]) -> float:
+    """
+    Pick the budget for a request.
+    
+    Args:
+        requested: Budget asked for by the client, if any
+    
+    Returns:
+        The client's budget capped at REQUEST_DEADLINE_MAX_SECONDS, or
+        REQUEST_DEADLINE_SECONDS when none was given (0 means no deadline)
+    """
+    if requested is not None and requested > 0:
+        return min(requested, settings.request_deadline_max_seconds)
+    return settings.request_deadline_seconds
+
+
+def start_deadline(seconds: float) -> Optional[Deadline]:
+    """
+    Start a deadline for the current request (the current async context).
+    
+    Tasks created afterwards inherit it, so every stage sees the same budget.
+    
+    Args:
+        seconds: Budget in seconds; 0 or less means no deadline
+    
+    Returns:
+        The new Deadline, or None if no deadline applies
+    """
+    deadline = Deadline(seconds) if seconds > 0 else None
+    _deadline.set(deadline)
+    return deadline
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Get the current request's deadline, if any."""
+    return _deadline.get()
+
+
+def remaining_seconds() -> Optional[float]:
+    """Get the seconds left for the current request, or None without a deadline."""
+    deadline = _deadline.get()
+    return deadline.remaining() if deadline else None
+
+
+def has_time_for(seconds: float) -> bool:
+    """Check whether at least seconds remain (always True without a deadline)."""
+    remaining = remaining_seconds()
+    return remaining is None or remaining >= seconds
+
+
+def drop_stage(stage: Optional[str] = None) -> None:
+    """
+    Record a stage dropped by the deadline.
+    
+    Args:
+        stage: Stage name; defaults to the stage currently running (see stage_scope)
+    """
+    deadline = _deadline.get()
+    stage = stage or _stage.get()
+    if deadline and stage:
+        deadline.drop(stage)
+
+
+@contextmanager
+def stage_scope(stage: str) -> Iterator[None]:
+    """Name the pipeline stage running in this context, for drop_stage()."""
+    token = _stage.set(stage)
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+
+async def run_stage(
+    stage: str,
+    fn: Callable[[], Awaitable[T]],
+    fallback: T,
+    min_seconds: float = 0.0
+) -> T:
+    """
+    Run an optional pipeline stage within the remaining budget.
+    
+    The stage is skipped if less than min_seconds remain, and cut short when
+    the deadline passes; either way it is recorded as dropped and fallback
+    is returned.
+    
+    Args:
+        stage: Stage name reported in the response
+        fn: Zero-argument coroutine function running the stage
+        fallback: Result to use if the stage is dropped
+        min_seconds: Minimum remaining time worth starting the stage with
+    
+    Returns:
+        The stage's result, or fallback
+    """
+    deadline = _deadline.get()
+    with stage_scope(stage):
+        if deadline is None:
+            return await fn()
+        
+        remaining = deadline.remaining()
+        if remaining <= 0 or remaining < min_seconds:
+            deadline.drop(stage)
+            return fallback
+        try:
+            return await asyncio.wait_for(fn(), remaining)
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            deadline.drop(stage)
+            return fallback
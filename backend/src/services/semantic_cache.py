@@ -0,0 +1,181 @@
+"""Semantic near-duplicate cache: reuse news correlation for almost identical transcripts."""
+import copy
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from src.config.settings import settings
+from src.services.correlation_jobs import get_correlation_scheduler
+from src.services.openai_scheduler import call_openai
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 1536
+
+
+class _Entry:
+    """A cached analysis: its filters, and its correlation or background run id."""
+    
+    def __init__(self, filters: Tuple[str, str], correlation: Optional[Dict[str, Any]], analysis_id: Optional[str]):
+        self.filters = filters
+        self.correlation = correlation
+        self.analysis_id = analysis_id
+        self.created_at = time.monotonic()
+    
+    def resolve(self) -> Optional[Dict[str, Any]]:
+        """The correlation, once available (background runs complete after the analysis is cached)."""
+        if self.correlation is None and self.analysis_id:
+            run = get_correlation_scheduler().get(self.analysis_id)
+            if run and run.status == "complete" and reusable_correlation(run.correlation):
+                self.correlation = run.correlation
+        return self.correlation
+
+
+def reusable_correlation(correlation: Optional[Dict[str, Any]]) -> bool:
+    """Whether a correlation is worth reusing: present, and not an error or a stale-news result."""
+    return bool(correlation) and not correlation.get("error") and not correlation.get("newsFromCache")
+
+
+def _filters(airline_filter: Optional[str], theme_filter: Optional[str]) -> Tuple[str, str]:
+    return ((airline_filter or "").lower(), (theme_filter or "").lower())
+
+
+class SemanticCache:
+    """
+    In-memory index of recent transcript embeddings and their news correlation.
+    
+    Analysts often record the same rumour in slightly different words. A
+    transcript whose embedding has at least SEMANTIC_CACHE_THRESHOLD cosine
+    similarity to one analyzed in the last SEMANTIC_CACHE_TTL_SECONDS, with
+    the same filters, reuses that analysis's correlation and claim
+    verification instead of running the LLM pipeline again.
+    
+    Embeddings are unit vectors in a preallocated ring of
+    SEMANTIC_CACHE_MAX_ENTRIES rows, so a lookup is one matrix-vector product.
+    """
+    
+    def __init__(self):
+        """Initialize empty cache from settings."""
+        self.threshold = settings.semantic_cache_threshold
+        self.ttl_seconds = settings.semantic_cache_ttl_seconds
+        self.max_entries = max(1, settings.semantic_cache_max_entries)
+        self.vectors = np.zeros((self.max_entries, EMBEDDING_DIMENSIONS), dtype=np.float32)
+        self.entries: List[Optional[_Entry]] = [None] * self.max_entries
+        self.next_slot = 0
+        self.hits = 0
+        self.misses = 0
+        self.embedding_failures = 0
+    
+    async def embed(self, client, transcription: str) -> Optional[np.ndarray]:
+        """
+        Embed a transcript as a unit vector.
+        
+        Args:
+            client: OpenAI client
+            transcription: Transcribed text
+        
+        Returns:
+            Embedding, or None if the request failed (the cache is then skipped)
+        """
+        if not transcription.strip():
+            return None
+        try:
+            response = await call_openai(client.embeddings.create, model=EMBEDDING_MODEL, input=transcription[:8000])
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed: {str(e)}")
+            self.embedding_failures += 1
+            return None
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0 or vector.shape != (EMBEDDING_DIMENSIONS,):
+            self.embedding_failures += 1
+            return None
+        return vector / norm
+    
+    def lookup(
+        self,
+        embedding: np.ndarray,
+        airline_filter: Optional[str] = None,
+        theme_filter: Optional[str] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """
+        Find the most similar recent transcript with a reusable correlation.
+        
+        Args:
+            embedding: Unit embedding from embed()
+            airline_filter: The new analysis's airline filter
+            theme_filter: The new analysis's theme filter
+        
+        Returns:
+            (copy of the cached correlation, similarity) on a hit; on a
+            miss (None, similarity of the nearest cached transcript, or None
+            when the cache is empty)
+        """
+        similarities = self.vectors @ embedding
+        now = time.monotonic()
+        filters = _filters(airline_filter, theme_filter)
+        candidates = np.flatnonzero(similarities >= self.threshold)
+        for slot in candidates[np.argsort(-similarities[candidates])]:
+            entry = self.entries[slot]
+            if entry is None or entry.filters != filters or now - entry.created_at > self.ttl_seconds:
+                continue
+            correlation = entry.resolve()
+            if correlation is not None:
+                self.hits += 1
+                return copy.deepcopy(correlation), float(similarities[slot])
+        self.misses += 1
+        occupied = any(entry is not None for entry in self.entries)
+        return None, float(similarities.max()) if occupied else None
+    
+    def add(
+        self,
+        embedding: np.ndarray,
+        analysis: Dict[str, Any],
+        airline_filter: Optional[str] = None,
+        theme_filter: Optional[str] = None
+    ) -> None:
+        """
+        Cache a full analysis's correlation (or its pending background run).
+        
+        Args:
+            embedding: Unit embedding of its transcript
+            analysis: Analysis result
+            airline_filter: Its airline filter
+            theme_filter: Its theme filter
+        """
+        correlation = analysis.get("correlation")
+        analysis_id = analysis.get("analysisId") if analysis.get("correlationStatus") else None
+        if not reusable_correlation(correlation) and analysis_id is None:
+            return
+        slot = self.next_slot
+        self.vectors[slot] = embedding
+        self.entries[slot] = _Entry(
+            _filters(airline_filter, theme_filter),
+            copy.deepcopy(correlation) if reusable_correlation(correlation) else None,
+            analysis_id
+        )
+        self.next_slot = (slot + 1) % self.max_entries
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit, miss and size counts for /api/metrics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": sum(1 for entry in self.entries if entry is not None),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else None,
+            "embeddingFailures": self.embedding_failures
+        }
+
+
+_cache: Optional[SemanticCache] = None
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Get the process-wide semantic cache."""
+    global _cache
+    if _cache is None:
+        _cache = SemanticCache()
+    return _cache
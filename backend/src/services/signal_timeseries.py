@@ -0,0 +1,260 @@
+"""Rolling per-airline time series of sentiment, market signals and predictions."""
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from src.config.settings import settings
+from src.services.local_analysis import classify_market_signal
+
+logger = logging.getLogger(__name__)
+
+# Aggregation windows reported for every series
+WINDOWS_DAYS = {"7d": 7, "30d": 30}
+
+# Market signal strengths as values
+STRENGTH_VALUES = {"Strong": 1.0, "Moderate": 2 / 3, "Weak": 1 / 3}
+
+# Columns of the running sums: count, sum t, sum v, sum t*v, sum t*t (t is the bucket index)
+_COUNT, _T, _V, _TV, _TT = range(5)
+
+
+class RollingSeries:
+    """
+    One time series in fixed-width buckets, held in a ring buffer.
+    
+    Each slot holds the running totals of (count, sum t, sum v, sum t*v,
+    sum t*t) up to and including its bucket. Any window's count, mean and
+    least-squares slope then come from the difference of two slots, in
+    constant time whatever the window length.
+    """
+    
+    def __init__(self, capacity: int):
+        """
+        Initialize empty series.
+        
+        Args:
+            capacity: Buckets kept; must exceed the longest window
+        """
+        self.capacity = capacity
+        self.prefix = np.zeros((capacity, 5))
+        self.total = np.zeros(5)
+        self.first: Optional[int] = None
+        self.head: Optional[int] = None
+    
+    def add(self, bucket: int, value: float) -> bool:
+        """
+        Add an observation.
+        
+        Args:
+            bucket: Bucket index (timestamp // bucket width)
+            value: Observed value
+        
+        Returns:
+            False if the bucket is older than the ring holds
+        """
+        t = float(bucket)
+        row = np.array([1.0, t, value, t * value, t * t])
+        if self.head is None:
+            self.first = self.head = bucket
+        elif bucket > self.head:
+            # Carry the running totals forward through the skipped buckets
+            for skipped in range(max(self.head + 1, bucket - self.capacity + 1), bucket + 1):
+                self.prefix[skipped % self.capacity] = self.total
+            self.head = bucket
+        elif bucket <= self.head - self.capacity:
+            return False
+        
+        # Late observations also move the totals of every later bucket
+        for later in range(bucket, self.head + 1):
+            self.prefix[later % self.capacity] += row
+        self.total += row
+        self.first = min(self.first, bucket)
+        return True
+    
+    def _totals_through(self, bucket: int) -> np.ndarray:
+        if self.head is None or bucket < self.first:
+            return np.zeros(5)
+        if bucket >= self.head:
+            return self.total
+        if bucket <= self.head - self.capacity:
+            raise ValueError(f"Bucket {bucket} is no longer held")
+        return self.prefix[bucket % self.capacity]
+    
+    def window(self, end_bucket: int, length: int) -> Dict[str, Optional[float]]:
+        """
+        Aggregate the buckets (end_bucket - length, end_bucket].
+        
+        Args:
+            end_bucket: Newest bucket in the window, at or after the newest
+                observation's bucket
+            length: Window length in buckets (less than the capacity)
+        
+        Returns:
+            {"count", "mean", "slope"} with slope in value per bucket
+            (None when the window has fewer than two distinct buckets)
+        """
+        sums = self._totals_through(end_bucket) - self._totals_through(end_bucket - length)
+        count = sums[_COUNT]
+        if count < 0.5:
+            return {"count": 0, "mean": None, "slope": None}
+        denominator = count * sums[_TT] - sums[_T] ** 2
+        slope = (count * sums[_TV] - sums[_T] * sums[_V]) / denominator if denominator > 1e-9 else None
+        return {"count": int(round(count)), "mean": float(sums[_V] / count), "slope": float(slope) if slope is not None else None}
+
+
+def _airlines(analysis: Dict[str, Any]) -> List[str]:
+    names = analysis.get("allAirlines") or [analysis.get("primaryAirline")]
+    return [name for name in dict.fromkeys(names) if name and name != settings.default_unknown_airline]
+
+
+def series_observations(analysis: Dict[str, Any]) -> List[Tuple[str, str, float]]:
+    """
+    Get the (airline, metric, value) observations an analysis adds.
+    
+    Every airline the analysis names gets its sentiment score ("sentiment"),
+    the strength of each market signal ("signal:<name>", Strong 1, Moderate
+    2/3, Weak 1/3) and each predicted probability ("prediction:<name>",
+    0 to 1). Signals and predictions are free LLM text, so they are mapped
+    onto the MARKET_SIGNAL_RULES signal names (see classify_market_signal)
+    and dropped when none applies; the metric vocabulary stays fixed.
+    
+    Args:
+        analysis: Analysis result
+    
+    Returns:
+        Observations
+    """
+    metrics = []
+    score = (analysis.get("sentiment") or {}).get("score")
+    if score is not None:
+        metrics.append(("sentiment", float(score)))
+    for signal in analysis.get("marketSignals") or []:
+        if isinstance(signal, dict) and signal.get("signal"):
+            name = classify_market_signal(str(signal["signal"]))
+            if name:
+                metrics.append((f"signal:{name}", STRENGTH_VALUES.get(signal.get("strength"), 2 / 3)))
+    for prediction in analysis.get("predictiveProbabilities") or []:
+        if isinstance(prediction, dict) and prediction.get("event") and prediction.get("probability") is not None:
+            name = classify_market_signal(str(prediction["event"]))
+            if name:
+                metrics.append((f"prediction:{name}", float(prediction["probability"]) / 100))
+    return [(airline, metric, value) for airline in _airlines(analysis) for metric, value in metrics]
+
+
+class SignalTimeSeries:
+    """
+    Per-airline, per-metric rolling series (see RollingSeries).
+    
+    Buckets are TIMESERIES_BUCKET_SECONDS wide, and enough are kept for the
+    longest window in WINDOWS_DAYS. At most TIMESERIES_MAX_SERIES series are
+    held; a new series then replaces the one observed least recently.
+    """
+    
+    def __init__(self):
+        """Initialize empty series from settings."""
+        self.bucket_seconds = settings.timeseries_bucket_seconds
+        self.window_buckets = {
+            name: max(1, math.ceil(days * 86400 / self.bucket_seconds))
+            for name, days in WINDOWS_DAYS.items()
+        }
+        self.capacity = max(self.window_buckets.values()) + 1
+        self.max_series = settings.timeseries_max_series
+        # (airline lower-case, metric lower-case) -> (airline, metric, series)
+        self.series: Dict[Tuple[str, str], Tuple[str, str, RollingSeries]] = {}
+        self.observations = 0
+        self.dropped = 0
+        self.evicted = 0
+    
+    def add(self, analysis: Dict[str, Any], timestamp: float) -> None:
+        """
+        Add an analysis's observations.
+        
+        Args:
+            analysis: Analysis result
+            timestamp: Unix time the analysis was stored
+        """
+        bucket = int(timestamp // self.bucket_seconds)
+        for airline, metric, value in series_observations(analysis):
+            key = (airline.lower(), metric.lower())
+            entry = self.series.get(key)
+            if entry is None:
+                if len(self.series) >= self.max_series:
+                    self._evict_idlest()
+                entry = self.series[key] = (airline, metric, RollingSeries(self.capacity))
+            if entry[2].add(bucket, value):
+                self.observations += 1
+            else:
+                self.dropped += 1
+    
+    def _evict_idlest(self) -> None:
+        idlest = min(self.series, key=lambda key: self.series[key][2].head)
+        del self.series[idlest]
+        self.evicted += 1
+    
+    def query(
+        self,
+        airline: Optional[str] = None,
+        metric: Optional[str] = None,
+        now: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get window aggregates for every matching series.
+        
+        Args:
+            airline: Optional airline (case-insensitive)
+            metric: Optional metric, or a prefix ending in ":" such as
+                "signal:" (case-insensitive)
+            now: Optional Unix time the windows end at (default now; not
+                before the newest observation)
+        
+        Returns:
+            [{"airline", "metric", "windows": {"7d": {"count", "mean",
+            "slopePerDay"}, "30d": {...}}}], series with the most
+            observations in the longest window first
+        """
+        end_bucket = int((now if now is not None else time.time()) // self.bucket_seconds)
+        buckets_per_day = 86400 / self.bucket_seconds
+        airline_key = airline.lower() if airline else None
+        metric_key = metric.lower() if metric else None
+        longest = max(self.window_buckets, key=self.window_buckets.get)
+        
+        results = []
+        for (series_airline, series_metric), (name, metric_name, series) in self.series.items():
+            if airline_key and series_airline != airline_key:
+                continue
+            if metric_key and not (series_metric == metric_key or (metric_key.endswith(":") and series_metric.startswith(metric_key))):
+                continue
+            windows = {}
+            for window_name, length in self.window_buckets.items():
+                aggregate = series.window(end_bucket, length)
+                windows[window_name] = {
+                    "count": aggregate["count"],
+                    "mean": round(aggregate["mean"], 4) if aggregate["mean"] is not None else None,
+                    "slopePerDay": round(aggregate["slope"] * buckets_per_day, 4) if aggregate["slope"] is not None else None
+                }
+            if windows[longest]["count"]:
+                results.append({"airline": name, "metric": metric_name, "windows": windows})
+        results.sort(key=lambda item: item["windows"][longest]["count"], reverse=True)
+        return results
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get series and observation counts for /api/metrics."""
+        return {
+            "series": len(self.series),
+            "bucketSeconds": self.bucket_seconds,
+            "observations": self.observations,
+            "dropped": self.dropped,
+            "evicted": self.evicted
+        }
+
+
+_timeseries: Optional[SignalTimeSeries] = None
+
+
+def get_signal_timeseries() -> SignalTimeSeries:
+    """Get the process-wide signal time series."""
+    global _timeseries
+    if _timeseries is None:
+        _timeseries = SignalTimeSeries()
+    return _timeseries
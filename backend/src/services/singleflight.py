@@ -0,0 +1,86 @@
+"""Coalesce identical concurrent calls into a single execution."""
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Build a singleflight key from JSON-serializable parts.
+    
+    Args:
+        *parts: Values identifying the call (text, filters, ...)
+    
+    Returns:
+        sha256 hex digest of the parts
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time; concurrent callers share its result.
+    
+    The first caller for a key starts the call as a task. Callers arriving
+    while it is in flight wait on the same task. Every caller gets its own
+    deep copy of the result, so no caller can mutate another's. Nothing is kept once the
+    call finishes: this deduplicates concurrent work, it is not a cache.
+    """
+    
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+    
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        timeout: Optional[float] = None
+    ) -> Tuple[T, bool]:
+        """
+        Run fn() for key, or join the call already in flight for key.
+        
+        The call runs in the first caller's context (e.g. its request
+        deadline); callers joining it only bound their own wait.
+        
+        Args:
+            key: Identity of the call (see make_key)
+            fn: Zero-argument coroutine function doing the work
+            timeout: Longest a joining caller waits for the shared call
+        
+        Returns:
+            Tuple of (result, whether it was shared from another caller's call)
+        
+        Raises:
+            asyncio.TimeoutError: If a joining caller's timeout passes first
+                (the shared call keeps running)
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self.shared += 1
+            logger.info(f"Joining in-flight call {key[:12]}")
+            # shield() so a follower's cancellation or timeout doesn't cancel the shared call
+            result = await asyncio.wait_for(asyncio.shield(task), timeout)
+            return copy.deepcopy(result), True
+        
+        self.calls += 1
+        task = asyncio.create_task(fn())
+        self._calls[key] = task
+        task.add_done_callback(lambda _: self._calls.pop(key, None))
+        # The call keeps running for any followers if this caller is cancelled
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result), False
+    
+    def stats(self) -> Dict[str, int]:
+        """Get counts of executed and shared calls."""
+        return {"inFlight": len(self._calls), "calls": self.calls, "shared": self.shared}
@@ -0,0 +1,138 @@
+"""Tiered airline detection: skip the LLM detector when keyword detection is decisive."""
+import asyncio
+import logging
+import random
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from src.config.settings import settings
+from src.services.request_context import start_deadline
+
+logger = logging.getLogger(__name__)
+
+
+def keyword_detection_gap(keyword_airlines: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Check whether keyword detection alone is decisive.
+    
+    Decisive means one High-relevance airline scoring at least
+    TIERED_DETECTION_MIN_SCORE and at least TIERED_DETECTION_MIN_MARGIN
+    times the runner-up's score (weak partial matches, such as "go" inside
+    "indigo", do not make a result ambiguous).
+    
+    Args:
+        keyword_airlines: Airlines from detect_airlines_in_text, best first
+    
+    Returns:
+        None if decisive, otherwise why the AI detector is needed:
+        "empty", "ambiguous" or "lowConfidence"
+    """
+    if not keyword_airlines:
+        return "empty"
+    top = keyword_airlines[0]
+    if len(keyword_airlines) > 1:
+        runner_up = keyword_airlines[1]
+        if runner_up.get("relevance") == "High" or top.get("score", 0) < runner_up.get("score", 0) * settings.tiered_detection_min_margin:
+            return "ambiguous"
+    if top.get("relevance") != "High" or top.get("score", 0) < settings.tiered_detection_min_score:
+        return "lowConfidence"
+    return None
+
+
+class TieredDetectionStats:
+    """
+    Counts how often the AI airline detector was skipped, and how the tiers agree.
+    
+    A TIERED_DETECTION_SHADOW_RATE share of skipped calls still run the AI
+    detector in the background. Its top airline is only compared with the
+    keyword tier's, never used, so the skip rule can be checked against
+    live traffic.
+    """
+    
+    def __init__(self):
+        """Initialize counters."""
+        self.skipped = 0
+        self.called: Dict[str, int] = {}
+        self.shadow_sampled = 0
+        self.shadow_agreed = 0
+        self.shadow_disagreed = 0
+        self.shadow_failed = 0
+        self._shadow_tasks: Set[asyncio.Task] = set()
+    
+    def record_called(self, reason: str) -> None:
+        """Record an AI detector call and why it was needed."""
+        self.called[reason] = self.called.get(reason, 0) + 1
+    
+    def record_skipped(
+        self,
+        keyword_airlines: List[Dict[str, Any]],
+        detect: Callable[[], Awaitable[List[Dict[str, Any]]]]
+    ) -> None:
+        """
+        Record a skipped AI detector call, sampling it for a shadow comparison.
+        
+        Args:
+            keyword_airlines: The decisive keyword result
+            detect: Zero-argument coroutine function running the AI detector
+        """
+        self.skipped += 1
+        if random.random() >= settings.tiered_detection_shadow_rate:
+            return
+        self.shadow_sampled += 1
+        task = asyncio.create_task(self._shadow(keyword_airlines[0]["airline"], detect))
+        # Keep a reference so the task is not garbage collected mid-run
+        self._shadow_tasks.add(task)
+        task.add_done_callback(self._shadow_tasks.discard)
+    
+    async def _shadow(
+        self,
+        keyword_airline: str,
+        detect: Callable[[], Awaitable[List[Dict[str, Any]]]]
+    ) -> None:
+        # Off the request path, so not bound by the request's deadline
+        start_deadline(0)
+        try:
+            ai_airlines = await detect()
+        except Exception as e:
+            self.shadow_failed += 1
+            logger.warning(f"Shadow AI airline detection failed: {str(e)}")
+            return
+        if not ai_airlines:
+            # detect_airlines_with_ai returns [] when it fails
+            self.shadow_failed += 1
+            return
+        ai_airline = ai_airlines[0].get("airline", "")
+        if ai_airline.lower() == keyword_airline.lower():
+            self.shadow_agreed += 1
+        else:
+            self.shadow_disagreed += 1
+            logger.info(f"Tiered detection disagreement: keyword tier found {keyword_airline}, AI found {ai_airline}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get skip and shadow agreement counts for /api/metrics."""
+        called = sum(self.called.values())
+        compared = self.shadow_agreed + self.shadow_disagreed
+        return {
+            "enabled": settings.tiered_detection_enabled,
+            "skipped": self.skipped,
+            "called": called,
+            "calledBecause": dict(self.called),
+            "skipRate": round(self.skipped / (self.skipped + called), 3) if self.skipped + called else None,
+            "shadow": {
+                "sampled": self.shadow_sampled,
+                "inFlight": len(self._shadow_tasks),
+                "agreed": self.shadow_agreed,
+                "disagreed": self.shadow_disagreed,
+                "failed": self.shadow_failed,
+                "agreementRate": round(self.shadow_agreed / compared, 3) if compared else None
+            }
+        }
+
+
+_stats: Optional[TieredDetectionStats] = None
+
+
+def get_tiered_detection_stats() -> TieredDetectionStats:
+    """Get the process-wide tiered detection counters."""
+    global _stats
+    if _stats is None:
+        _stats = TieredDetectionStats()
+    return _stats
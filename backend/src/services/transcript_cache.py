@@ -0,0 +1,256 @@
+"""Persistent transcript cache keyed by audio content."""
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+import numpy as np
+from src.config.settings import settings
+from src.services.audio import is_wav_file, resample, to_mono
+
+logger = logging.getLogger(__name__)
+
+# Fingerprint parameters: 8 kHz mono, 64 ms frames, 17 log-spaced bands
+FINGERPRINT_SAMPLE_RATE = 8000
+FINGERPRINT_FRAME_SIZE = 512
+FINGERPRINT_BANDS = 17
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def fingerprint_samples(samples: np.ndarray, sample_rate: int) -> Optional[np.ndarray]:
+    """
+    Compute a perceptual fingerprint of decoded PCM audio.
+    
+    Each frame yields one bit per adjacent band pair, set when the energy
+    difference between the bands grows from the previous frame. The bits
+    survive re-encoding, resampling and gain changes of the same recording.
+    
+    Args:
+        samples: Samples shaped (frames, channels) or mono
+        sample_rate: Sample rate in Hz
+    
+    Returns:
+        Boolean array shaped (frames - 1, bands - 1), or None if the
+        recording is too short
+    """
+    signal = resample(to_mono(samples), sample_rate, FINGERPRINT_SAMPLE_RATE)
+    frame_count = len(signal) // FINGERPRINT_FRAME_SIZE
+    if frame_count < 3:
+        return None
+    
+    frames = signal[:frame_count * FINGERPRINT_FRAME_SIZE].reshape(frame_count, FINGERPRINT_FRAME_SIZE)
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(FINGERPRINT_FRAME_SIZE), axis=1)) ** 2
+    
+    # Log-spaced band edges between 300 Hz and 3 kHz (speech range)
+    bin_hz = FINGERPRINT_SAMPLE_RATE / FINGERPRINT_FRAME_SIZE
+    edges = np.geomspace(300, 3000, FINGERPRINT_BANDS + 1) / bin_hz
+    edges = edges.astype(int)
+    band_energy = np.stack([
+        spectrum[:, edges[i]:max(edges[i + 1], edges[i] + 1)].sum(axis=1)
+        for i in range(FINGERPRINT_BANDS)
+    ], axis=1)
+    
+    band_diff = np.diff(band_energy, axis=1)
+    return (band_diff[1:] - band_diff[:-1]) > 0
+
+
+def fingerprint_distance(first: np.ndarray, second: np.ndarray) -> float:
+    """Bit error rate between two fingerprints, cropped to the shorter one."""
+    length = min(len(first), len(second))
+    if length == 0:
+        return 1.0
+    return float(np.mean(first[:length] != second[:length]))
+
+
+class TranscriptCache:
+    """
+    Local on-disk cache of Whisper transcripts.
+    
+    Entries are keyed by the sha256 of the audio bytes plus the transcription
+    model and language, so byte-identical re-uploads never reach Whisper.
+    When fingerprinting is enabled, WAV uploads are also matched perceptually
+    against earlier recordings to catch re-encoded copies.
+    """
+    
+    def __init__(self, cache_dir: Optional[str] = None):
+        """Initialize transcript cache."""
+        self.cache_dir = cache_dir or settings.transcript_cache_dir
+        self.fingerprint_enabled = settings.transcript_fingerprint_enabled
+        self.fingerprint_threshold = settings.transcript_fingerprint_threshold
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._fingerprints: Optional[List[Dict]] = None
+    
+    @staticmethod
+    def audio_hash(audio_file: BinaryIO) -> str:
+        """Get the sha256 hex digest of an audio file, reading it in chunks (blocking; call it from a worker thread)."""
+        digest = hashlib.sha256()
+        audio_file.seek(0)
+        for chunk in iter(lambda: audio_file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+        audio_file.seek(0)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def cache_key(audio_hash: str, model: str, language: str) -> str:
+        """Build a cache key from the audio hash, model and language."""
+        return hashlib.sha256(f"{audio_hash}:{model}:{language}".encode("utf-8")).hexdigest()
+    
+    def _identifiable(self, fingerprint: np.ndarray) -> bool:
+        # Silence sets no bits. Two recordings silent in the same frames
+        # differ only in their active frames, where about half the bits are
+        # set, so a fingerprint whose set share is within the match threshold
+        # would match any other mostly silent upload.
+        return float(np.mean(fingerprint)) > self.fingerprint_threshold
+    
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached transcript by exact key.
+        
+        Args:
+            key: Cache key from cache_key()
+        
+        Returns:
+            Cached transcript text or None
+        """
+        path = self._entry_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f).get("text")
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable transcript cache entry {key}: {str(e)}")
+            return None
+    
+    def find_by_fingerprint(
+        self,
+        fingerprint: np.ndarray,
+        model: str,
+        language: str
+    ) -> Optional[str]:
+        """
+        Find a transcript for a perceptually matching recording.
+        
+        Args:
+            fingerprint: Fingerprint from fingerprint_for()
+            model: Transcription model the entry must have been produced with
+            language: Language the entry must have been produced with
+        
+        Returns:
+            Cached transcript text or None
+        """
+        for entry in self._load_fingerprints():
+            if entry["model"] != model or entry["language"] != language:
+                continue
+            # Re-encodes keep the duration; skip clearly different recordings
+            if abs(len(entry["fingerprint"]) - len(fingerprint)) > max(2, len(fingerprint) // 50):
+                continue
+            if fingerprint_distance(entry["fingerprint"], fingerprint) <= self.fingerprint_threshold:
+                return self.get(entry["key"])
+        return None
+    
+    def put(
+        self,
+        key: str,
+        text: str,
+        model: str,
+        language: str,
+        fingerprint: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Store a transcript in the cache.
+        
+        Args:
+            key: Cache key from cache_key()
+            text: Transcript text
+            model: Transcription model used
+            language: Language used
+            fingerprint: Optional perceptual fingerprint of the audio
+        """
+        entry = {
+            "text": text,
+            "model": model,
+            "language": language,
+            "createdAt": datetime.now().isoformat()
+        }
+        if fingerprint is not None:
+            entry["fingerprint"] = {
+                "frames": len(fingerprint),
+                "bits": np.packbits(fingerprint).tobytes().hex()
+            }
+        
+        try:
+            temp_path = self._entry_path(key) + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(temp_path, self._entry_path(key))
+        except OSError as e:
+            logger.warning(f"Failed to write transcript cache entry: {str(e)}")
+            return
+        
+        if fingerprint is not None and self._fingerprints is not None:
+            self._fingerprints.append({
+                "key": key,
+                "model": model,
+                "language": language,
+                "fingerprint": fingerprint
+            })
+    
+    def _load_fingerprints(self) -> List[Dict]:
+        """Load stored fingerprints into memory on first use."""
+        if self._fingerprints is not None:
+            return self._fingerprints
+        
+        self._fingerprints = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.cache_dir, name), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            stored = entry.get("fingerprint")
+            if not stored:
+                continue
+            bits = np.unpackbits(np.frombuffer(bytes.fromhex(stored["bits"]), dtype=np.uint8))
+            width = FINGERPRINT_BANDS - 1
+            fingerprint = bits[:stored["frames"] * width].reshape(stored["frames"], width).astype(bool)
+            if not self._identifiable(fingerprint):
+                continue
+            self._fingerprints.append({
+                "key": name[:-len(".json")],
+                "model": entry.get("model"),
+                "language": entry.get("language"),
+                "fingerprint": fingerprint
+            })
+        return self._fingerprints
+    
+    def fingerprint_for(self, decoded: Optional[Tuple[Any, int]], filename: str) -> Optional[np.ndarray]:
+        """
+        Compute a fingerprint if fingerprinting is enabled and the upload was decoded.
+        
+        Blocking (resampling and an FFT over the whole recording); call it
+        from a worker thread.
+        
+        Args:
+            decoded: (samples, sample_rate) of the upload, or None if it
+                was not decoded
+            filename: Original filename
+        
+        Returns:
+            Fingerprint from fingerprint_samples(), or None when there is
+            none or it is too close to silence to identify the recording
+            (the upload is then only matched by its exact hash)
+        """
+        if not self.fingerprint_enabled or decoded is None or not is_wav_file(filename):
+            return None
+        fingerprint = fingerprint_samples(*decoded)
+        if fingerprint is None or not self._identifiable(fingerprint):
+            return None
+        return fingerprint
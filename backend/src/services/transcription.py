@@ -1,24 +1,44 @@
 """Transcription service for converting audio to text."""
+import asyncio
+import io
 import os
-import tempfile
-from typing import Optional
-from openai import OpenAI
+import logging
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
 from src.config.settings import settings
+from src.services.audio import is_wav_file, read_wav, write_wav
+from src.services.audio_preprocessing import preprocess_audio
+from src.services.audio_segmentation import plan_segments, stitch_transcripts
+from src.services.openai_scheduler import call_openai_transcription, create_openai_client
+from src.services.transcript_cache import TranscriptCache
+
+logger = logging.getLogger(__name__)
 
 
 class TranscriptionService:
     """Service for transcribing audio files to text."""
     
-    def __init__(self):
-        """Initialize transcription service."""
-        if not settings.openai_api_key:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
-        self.client = OpenAI(api_key=settings.openai_api_key)
+    def __init__(self, client=None):
+        """
+        Initialize transcription service.
+        
+        Args:
+            client: Optional client exposing audio.transcriptions.create();
+                defaults to an OpenAI client (pass a local fake in tests)
+        """
+        if client is None:
+            if not settings.openai_api_key:
+                raise ValueError("OPENAI_API_KEY environment variable is required")
+            client = create_openai_client()
+        self.client = client
         self.model = settings.transcription_model
+        self.cache = TranscriptCache() if settings.transcript_cache_enabled else None
+        self.max_upload_bytes = settings.whisper_max_upload_mb * 1024 * 1024
+        # Uploads holding decoded samples at once (see transcribe_file)
+        self.decode_slots = asyncio.Semaphore(max(1, settings.audio_decode_max_concurrency))
     
     async def transcribe_audio(
-        self, 
-        audio_file: bytes, 
+        self,
+        audio_file: bytes,
         filename: str,
         language: Optional[str] = None
     ) -> str:
@@ -29,39 +49,262 @@ class TranscriptionService:
             audio_file: Audio file bytes
             filename: Original filename
             language: Optional language code (e.g., 'en', 'hi')
-            
+        
         Returns:
             Transcribed text
-            
+        
         Raises:
             Exception: If transcription fails
         """
+        result = await self.transcribe_with_metadata(audio_file, filename, language)
+        return result["text"]
+    
+    async def transcribe_with_metadata(
+        self,
+        audio_file: bytes,
+        filename: str,
+        language: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Transcribe audio bytes to text, reusing cached transcripts when possible.
+        
+        Args:
+            audio_file: Audio file bytes
+            filename: Original filename
+            language: Optional language code (e.g., 'en', 'hi')
+        
+        Returns:
+            Result dict as returned by transcribe_file()
+        
+        Raises:
+            Exception: If transcription fails
+        """
+        return await self.transcribe_file(io.BytesIO(audio_file), filename, language)
+    
+    async def transcribe_file(
+        self,
+        audio_file: BinaryIO,
+        filename: str,
+        language: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Transcribe an audio file object to text.
+        
+        The file object (e.g. the upload's spool file) is hashed in chunks.
+        Non-WAV uploads are handed straight to the transcription client. WAV
+        uploads are decoded into memory when fingerprinting, preprocessing
+        (on by default) or chunking is enabled: the float32 samples, their
+        mono and resampled copies and the re-encoded upload take three to
+        four times the file size. At most AUDIO_DECODE_MAX_CONCURRENCY
+        uploads hold decoded samples at once; others wait their turn, and
+        the samples are released before the Whisper requests. Decoding and
+        preprocessing run in worker threads.
+        
+        Args:
+            audio_file: Seekable binary file object
+            filename: Original filename
+            language: Optional language code (e.g., 'en', 'hi')
+        
+        Returns:
+            Dict with "text", "cacheHit" and "cacheMatch" ("exact",
+            "fingerprint" or None) describing where the text came from,
+            "segments" (number of Whisper requests made) and
+            "preprocessing" (bytes/seconds saved, or None if not applied)
+        
+        Raises:
+            Exception: If transcription fails
+        """
+        language = language or "en"
+        cache_key = None
+        fingerprint = None
+        
+        # Hashing, decoding and fingerprinting read the whole upload; keep them off the event loop
+        if self.cache:
+            audio_hash = await asyncio.to_thread(self.cache.audio_hash, audio_file)
+            cache_key = self.cache.cache_key(audio_hash, self.model, language)
+            cached_text = self.cache.get(cache_key)
+            if cached_text is not None:
+                logger.info(f"Transcript cache hit for {filename}")
+                return {"text": cached_text, "cacheHit": True, "cacheMatch": "exact", "segments": 0, "preprocessing": None}
+        
+        audio_file.seek(0, os.SEEK_END)
+        size_bytes = audio_file.tell()
+        audio_file.seek(0)
+        
+        async with self.decode_slots:
+            # One decode serves the fingerprint, preprocessing and chunking
+            decoded = await asyncio.to_thread(self._decode_wav, audio_file, filename)
+            if self.cache:
+                fingerprint = await asyncio.to_thread(self.cache.fingerprint_for, decoded, filename)
+                if fingerprint is not None:
+                    cached_text = self.cache.find_by_fingerprint(fingerprint, self.model, language)
+                    if cached_text is not None:
+                        logger.info(f"Transcript cache fingerprint match for {filename}")
+                        # Store under the new key so the next identical upload is an exact hit
+                        self.cache.put(cache_key, cached_text, self.model, language)
+                        return {"text": cached_text, "cacheHit": True, "cacheMatch": "fingerprint", "segments": 0, "preprocessing": None}
+            
+            preprocessing = None
+            if decoded is not None and settings.audio_preprocessing_enabled:
+                processed, preprocessing = await asyncio.to_thread(self._preprocess, decoded, size_bytes)
+                if processed is not None:
+                    decoded, wav_bytes = processed
+                    audio_file = io.BytesIO(wav_bytes)
+                    size_bytes = len(wav_bytes)
+            
+            segments = await asyncio.to_thread(self._split_long_recording, decoded, size_bytes, filename)
+            # Only the encoded upload or segments are needed from here on
+            decoded = None
+        
+        if segments:
+            text = await self._transcribe_segments(segments, language)
+        else:
+            text = await self._request_transcription(audio_file, filename, language)
+        
+        if self.cache:
+            self.cache.put(cache_key, text, self.model, language, fingerprint=fingerprint)
+        
+        return {
+            "text": text,
+            "cacheHit": False,
+            "cacheMatch": None,
+            "segments": len(segments) or 1,
+            "preprocessing": preprocessing
+        }
+    
+    def _decode_wav(self, audio_file: BinaryIO, filename: str) -> Optional[Tuple[Any, int]]:
+        """
+        Decode a WAV upload when fingerprinting, preprocessing or chunking needs its samples.
+        
+        Returns None for other formats, undecodable files, or when none of
+        them is enabled, in which case the file is sent to Whisper as-is.
+        Blocking; call it from a worker thread.
+        """
+        if not is_wav_file(filename):
+            return None
+        fingerprinting = self.cache is not None and self.cache.fingerprint_enabled
+        if not (fingerprinting or settings.audio_preprocessing_enabled or settings.transcription_chunking_enabled):
+            return None
+        
         try:
-            # Create temporary file for audio
-            with tempfile.NamedTemporaryFile(
-                delete=False, 
-                suffix=os.path.splitext(filename)[1]
-            ) as temp_file:
-                temp_file.write(audio_file)
-                temp_file_path = temp_file.name
+            return read_wav(audio_file)
+        except ValueError as e:
+            logger.warning(f"Cannot decode {filename}, sending as uploaded: {str(e)}")
+            return None
+        finally:
+            audio_file.seek(0)
+    
+    @staticmethod
+    def _preprocess(
+        decoded: Tuple[Any, int],
+        size_bytes: int
+    ) -> Tuple[Optional[Tuple[Tuple[Any, int], bytes]], Dict[str, Any]]:
+        """
+        Preprocess decoded audio and encode it as WAV (blocking).
+        
+        Returns:
+            Tuple of ((decoded samples, sample rate), WAV bytes) or None when
+            preprocessing would not shrink the upload, and the stats dict
+        """
+        samples, sample_rate, stats = preprocess_audio(decoded[0], decoded[1], size_bytes)
+        if not stats["applied"]:
+            logger.info(f"Preprocessing would not shrink the upload ({size_bytes} bytes), sending it as uploaded")
+            return None, stats
+        return ((samples.reshape(-1, 1), sample_rate), write_wav(samples, sample_rate)), stats
+    
+    def _split_long_recording(
+        self,
+        decoded: Optional[Tuple[Any, int]],
+        size_bytes: int,
+        filename: str
+    ) -> List[bytes]:
+        """
+        Split a long decoded recording into overlapping WAV segments.
+        
+        Returns an empty list when the recording should be sent as one
+        request: chunking is disabled, the audio was not decoded locally,
+        or the recording is short enough and under the upload limit.
+        Blocking; call it from a worker thread.
+        """
+        if not settings.transcription_chunking_enabled or decoded is None:
+            return []
+        
+        samples, sample_rate = decoded
+        duration = len(samples) / sample_rate
+        if duration <= settings.transcription_chunk_min_duration_seconds and size_bytes <= self.max_upload_bytes:
+            return []
+        
+        # Keep each encoded 16-bit segment comfortably under the upload limit
+        bytes_per_second = sample_rate * samples.shape[1] * 2
+        max_segment_seconds = min(
+            settings.transcription_chunk_seconds,
+            0.9 * self.max_upload_bytes / bytes_per_second
+        )
+        bounds = plan_segments(
+            samples.mean(axis=1),
+            sample_rate,
+            max_segment_seconds,
+            settings.transcription_chunk_overlap_seconds
+        )
+        logger.info(f"Split {filename} ({duration:.0f}s) into {len(bounds)} segments")
+        return [write_wav(samples[start:end], sample_rate) for start, end in bounds]
+    
+    async def _transcribe_segments(self, segments: List[bytes], language: str) -> str:
+        """Transcribe segments concurrently with a bounded pool and stitch the text."""
+        semaphore = asyncio.Semaphore(settings.transcription_max_concurrency)
+        
+        async def transcribe_segment(index: int, segment: bytes) -> str:
+            async with semaphore:
+                return await self.transcribe_wav_segment(segment, language, f"segment_{index:03d}.wav")
+        
+        # gather() keeps results in segment order regardless of completion order
+        texts = await asyncio.gather(*(
+            transcribe_segment(index, segment) for index, segment in enumerate(segments)
+        ))
+        return stitch_transcripts(texts)
+    
+    def _transcribe_with_whisper(self, audio_file: BinaryIO, filename: str, language: str) -> str:
+        """Send an audio file object to OpenAI Whisper (rewound, so retries resend it whole)."""
+        audio_file.seek(0)
+        # The filename tells Whisper which container format to decode
+        transcript = self.client.audio.transcriptions.create(
+            model=self.model,
+            file=(os.path.basename(filename), audio_file),
+            language=language,
+            response_format="text"
+        )
             
-            try:
-                # Transcribe using OpenAI Whisper
-                with open(temp_file_path, "rb") as audio:
-                    transcript = self.client.audio.transcriptions.create(
-                        model=self.model,
-                        file=audio,
-                        language=language or "en",
-                        response_format="text"
-                    )
-                
-                return transcript if isinstance(transcript, str) else transcript.text
-                
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
-                    
+        return transcript if isinstance(transcript, str) else transcript.text
+        
+    async def _request_transcription(self, audio_file: BinaryIO, filename: str, language: str) -> str:
+        """Transcribe through the shared OpenAI scheduler, which retries 429s and 5xx."""
+        try:
+            return await call_openai_transcription(self._transcribe_with_whisper, audio_file, filename, language)
         except Exception as e:
             raise Exception(f"Transcription failed: {str(e)}")
-
+    
+    async def transcribe_wav_segment(
+        self,
+        segment: bytes,
+        language: Optional[str] = None,
+        filename: str = "segment.wav"
+    ) -> str:
+        """
+        Transcribe a short in-memory WAV segment without blocking the event loop.
+        
+        Segments skip the transcript cache; they are pieces of a larger
+        recording (or of a live stream) rather than user uploads.
+        
+        Args:
+            segment: WAV file bytes
+            language: Optional language code (e.g., 'en', 'hi')
+            filename: Name sent to Whisper for the segment
+            
+        Returns:
+            Transcribed text
+        """
+        return await self._request_transcription(
+            io.BytesIO(segment),
+            filename,
+            language or "en"
+        )
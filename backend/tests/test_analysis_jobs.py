@@ -0,0 +1,43 @@
+"""Background analysis jobs: watching a job's status changes."""
+import asyncio
+from src.services.analysis_jobs import AnalysisJobStore
+
+
+def test_watch_yields_final_status_reached_between_updates():
+    async def run():
+        store = AnalysisJobStore()
+        release = asyncio.Event()
+        
+        async def analyze(job_id):
+            await release.wait()
+            return {"summary": "done"}
+        
+        job = store.start("transcript", {"summary": "provisional"}, analyze)
+        updates = store.watch(job, timeout=1)
+        first = await updates.__anext__()
+        
+        # The job finishes while the caller is still busy with the first update
+        release.set()
+        while not job.done:
+            await asyncio.sleep(0.01)
+        
+        statuses = [first["status"]] + [update["status"] async for update in updates]
+        return statuses, job
+    
+    statuses, job = asyncio.run(run())
+    assert statuses == ["pending", "complete"]
+    assert job.analysis == {"summary": "done"}
+
+
+def test_watch_gives_up_after_timeout_without_a_change():
+    async def run():
+        store = AnalysisJobStore()
+        
+        async def analyze(job_id):
+            await asyncio.sleep(1)
+            return {}
+        
+        job = store.start("transcript", {}, analyze)
+        return [update["status"] async for update in store.watch(job, timeout=0.05)]
+    
+    assert asyncio.run(run()) == ["pending", "running"]
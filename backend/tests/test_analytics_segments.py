@@ -0,0 +1,68 @@
+"""Analytics segment compaction from a small analysis store, including recovery from an interrupted run."""
+import json
+import sqlite3
+import pytest
+from src.config.settings import settings
+from src.services import analytics_segments
+from src.services.analytics_segments import AnalyticsSegments
+
+DAY = 86400
+
+
+def _store(path: str, rows: int, start: int = 0) -> None:
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS analyses (seq INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL, "
+        "primary_airline TEXT, sentiment TEXT, sentiment_score REAL, themes TEXT)"
+    )
+    connection.executemany(
+        "INSERT INTO analyses (created_at, primary_airline, sentiment, sentiment_score, themes) VALUES (?, ?, ?, ?, ?)",
+        [
+            (1700000000 + i * DAY, "IndiGo" if i % 2 else "Air India", "Negative" if i % 3 else "Positive", 0.1 * (i % 5), json.dumps(["delays"]))
+            for i in range(start, start + rows)
+        ]
+    )
+    connection.commit()
+    connection.close()
+
+
+@pytest.fixture
+def segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "analytics_segment_rows", 4)
+    store_path = str(tmp_path / "analyses.db")
+    _store(store_path, 6)
+    return AnalyticsSegments(str(tmp_path / "segments"), store_path)
+
+
+def _airline_counts(segments: AnalyticsSegments) -> dict:
+    return {group["key"]: group["count"] for group in segments.query("airline")["groups"]}
+
+
+def test_compaction_fills_segments_and_appends_to_the_last(segments):
+    assert segments.compact() == 6
+    assert [segment["rows"] for segment in segments.manifest["segments"]] == [4, 2]
+    
+    _store(segments.store_path, 3, start=6)
+    assert segments.compact() == 3
+    assert [segment["rows"] for segment in segments.manifest["segments"]] == [4, 4, 1]
+    assert _airline_counts(segments) == {"IndiGo": 4, "Air India": 5}
+
+
+def test_compaction_recovers_from_a_run_that_died_before_saving_its_manifest(segments, monkeypatch):
+    segments.compact()
+    _store(segments.store_path, 3, start=6)
+    
+    write_json = analytics_segments._write_json
+    
+    def crash(path, data):
+        raise OSError("disk full")
+    
+    # The segments are written, but the manifest (and its segment counter) is not
+    monkeypatch.setattr(analytics_segments, "_write_json", crash)
+    with pytest.raises(OSError):
+        segments.compact()
+    monkeypatch.setattr(analytics_segments, "_write_json", write_json)
+    
+    restarted = AnalyticsSegments(segments.directory, segments.store_path)
+    assert restarted.compact() == 3
+    assert _airline_counts(restarted) == {"IndiGo": 4, "Air India": 5}
@@ -0,0 +1,75 @@
+"""Claim verification through the claim cache, with fake embeddings and LLM."""
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from src.config.settings import settings
+from src.services import claim_cache
+from src.services.circuit_breaker import get_circuit_breaker
+from src.services.correlation import CorrelationEngine
+
+CLAIM = "IndiGo is hiring 500 pilots"
+ARTICLES = [
+    {"title": "IndiGo to hire 500 pilots", "url": "https://example.com/hiring", "fullText": "IndiGo plans to hire 500 pilots."},
+    {"title": "Jet fuel prices rise", "url": "https://example.com/fuel", "fullText": "Fuel costs rose again."}
+]
+
+
+class FakeEmbeddings:
+    """Embeds texts mentioning pilots along one axis and the rest along another; article requests fail while failing is set."""
+    
+    def __init__(self):
+        self.failing = False
+    
+    def create(self, model, input):
+        if self.failing and input != CLAIM:
+            raise ConnectionError("embedding service unavailable")
+        vector = [0.0] * 1536
+        vector[0 if "pilots" in input else 1] = 1.0
+        return SimpleNamespace(data=[SimpleNamespace(embedding=vector)])
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+    
+    def create(self, model, messages, **kwargs):
+        self.calls += 1
+        content = json.dumps({"status": "verified", "confidence": 0.9, "reason": "reported", "articleUrls": [ARTICLES[0]["url"]]})
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason="stop")],
+            usage=None
+        )
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(settings, "openai_api_key", "test")
+    monkeypatch.setattr(settings, "openai_max_retries", 0)
+    monkeypatch.setattr(settings, "claim_cache_enabled", True)
+    monkeypatch.setattr(claim_cache, "_cache", None)
+    monkeypatch.setattr(get_circuit_breaker("openai"), "enabled", False)
+    engine = CorrelationEngine()
+    engine.client = SimpleNamespace(
+        embeddings=FakeEmbeddings(),
+        chat=SimpleNamespace(completions=FakeCompletions())
+    )
+    return engine
+
+
+def _verify(engine):
+    articles = [dict(article) for article in ARTICLES]
+    return asyncio.run(engine._verify_claim_against_news({"text": CLAIM}, articles, ["IndiGo"]))
+
+
+def test_verification_with_failed_article_embeddings_is_not_cached(engine):
+    engine.client.embeddings.failing = True
+    assert _verify(engine)["status"] == "unverified"
+    assert claim_cache.get_claim_verification_cache().get(CLAIM) is None
+    
+    # Once embeddings recover the claim is verified, and then answered from the cache
+    engine.client.embeddings.failing = False
+    assert _verify(engine)["status"] == "verified"
+    assert _verify(engine)["status"] == "verified"
+    assert engine.client.chat.completions.calls == 1
+    assert claim_cache.get_claim_verification_cache().hits == 1
@@ -0,0 +1,39 @@
+"""Background correlation runs: storage limits."""
+import asyncio
+from src.config.settings import settings
+from src.services.correlation_jobs import CorrelationScheduler
+
+
+def test_size_limit_evicts_finished_runs_only(monkeypatch):
+    monkeypatch.setattr(settings, "analysis_job_max_entries", 2)
+    monkeypatch.setattr(settings, "correlation_max_concurrency", 4)
+    
+    async def run():
+        scheduler = CorrelationScheduler()
+        release = asyncio.Event()
+        
+        async def slow():
+            await release.wait()
+            return {"correlationScore": 0.5}
+        
+        async def fast():
+            return {"correlationScore": 0.1}
+        
+        scheduler.submit("finished", fast)
+        await asyncio.sleep(0.01)
+        for analysis_id in ("running-1", "running-2", "running-3"):
+            scheduler.submit(analysis_id, slow)
+        await asyncio.sleep(0.01)
+        # Over the limit, but only the finished run may go
+        stored = list(scheduler.runs)
+        
+        release.set()
+        await asyncio.sleep(0.01)
+        runs = {analysis_id: scheduler.get(analysis_id) for analysis_id in stored}
+        return stored, runs
+    
+    stored, runs = asyncio.run(run())
+    assert stored == ["running-1", "running-2", "running-3"]
+    # Once they finish, the oldest are evicted down to the limit
+    assert runs["running-1"] is None
+    assert runs["running-2"].status == runs["running-3"].status == "complete"
@@ -0,0 +1,119 @@
+"""BM25 prefilter ranking, and its recall on a labelled news set at the configured top k.
+
+Run as a module (python -m tests.test_lexical_prefilter) to print recall for a range of k.
+"""
+import random
+from typing import Any, Dict, List
+from src.config.settings import settings
+from src.services.lexical_prefilter import BM25Index, prefilter_articles, prefilter_recall
+
+AIRLINES = ["IndiGo", "Air India", "SpiceJet", "Akasa Air", "Vistara", "Emirates", "Qatar Airways", "Lufthansa", "Delta", "United"]
+
+# Three headlines per topic; a query's relevant articles are its airline's three
+TOPICS = {
+    "hiring": ["{a} to hire {n} pilots as fleet grows", "{a} opens recruitment drive for first officers", "{a} plans to add cabin crew and pilots this year"],
+    "fleet": ["{a} places order for {n} Airbus A320neo jets", "{a} takes delivery of new Boeing 787", "{a} expands fleet with leased narrowbodies"],
+    "finance": ["{a} reports quarterly loss amid fuel costs", "{a} posts record profit on strong demand", "{a} raises funds through share sale"],
+    "safety": ["{a} flight makes emergency landing after engine issue", "DGCA probes {a} over maintenance lapses", "{a} grounds aircraft after tail strike"],
+    "routes": ["{a} launches new route to Singapore", "{a} adds daily flights between Delhi and Dubai", "{a} suspends service to Kathmandu"],
+    "strike": ["{a} pilots threaten strike over pay", "{a} crew call off sick disrupting flights", "{a} reaches wage deal with unions"]
+}
+
+# How an analyst might say the same thing in a transcript
+PARAPHRASES = {
+    "hiring": "{a} looking to bring on {n} new aviators",
+    "fleet": "{a} is buying {n} new planes",
+    "finance": "{a} is bleeding money right now",
+    "safety": "{a} had a scary incident with an engine",
+    "routes": "{a} will start flying to Singapore",
+    "strike": "{a} cockpit staff may walk out over salaries"
+}
+
+GENERAL_NEWS = [
+    "Airport traffic hits record high in summer", "Aviation regulator issues new drone rules",
+    "Jet fuel prices rise for third month", "Air cargo volumes recover",
+    "Travel demand strong ahead of holidays", "Monsoon causes delays at Mumbai airport",
+    "Airbus raises production targets", "Boeing faces new certification review",
+    "New terminal opens at Bengaluru airport", "Airline stocks rally on lower oil"
+]
+
+CANDIDATES = 120
+
+
+def labelled_cases(queries: int = 60, seed: int = 7) -> List[Dict[str, Any]]:
+    """
+    Build the labelled set for prefilter_recall.
+    
+    Each query names an airline and a topic, in a headline's words (even
+    queries) or paraphrased (odd queries). Its 120 candidates hold the three
+    relevant articles, about 10% same-topic news of other airlines, 15% news
+    of the same airline on other topics, and general aviation news.
+    """
+    rng = random.Random(seed)
+    cases = []
+    for q in range(queries):
+        airline = rng.choice(AIRLINES)
+        topic = rng.choice(list(TOPICS))
+        number = rng.choice([50, 100, 500])
+        relevant = [f"{headline.format(a=airline, n=number)}. {rng.choice(GENERAL_NEWS)}" for headline in TOPICS[topic]]
+        others = []
+        while len(relevant) + len(others) < CANDIDATES:
+            draw = rng.random()
+            if draw < 0.1:
+                other_airline = rng.choice([name for name in AIRLINES if name != airline])
+                others.append(rng.choice(TOPICS[topic]).format(a=other_airline, n=number))
+            elif draw < 0.25:
+                other_topic = rng.choice([name for name in TOPICS if name != topic])
+                others.append(rng.choice(TOPICS[other_topic]).format(a=airline, n=number))
+            else:
+                others.append(f"{rng.choice(GENERAL_NEWS)} {rng.choice(GENERAL_NEWS)}")
+        documents = relevant + others
+        order = list(range(len(documents)))
+        rng.shuffle(order)
+        paraphrased = q % 2 == 1
+        cases.append({
+            "query": (PARAPHRASES[topic] if paraphrased else TOPICS[topic][0]).format(a=airline, n=number),
+            "documents": [documents[i] for i in order],
+            "relevant": [position for position, i in enumerate(order) if i < len(relevant)],
+            "paraphrased": paraphrased
+        })
+    return cases
+
+
+def test_top_k_ranks_matching_documents_first():
+    index = BM25Index([
+        "Jet fuel prices rise for third month",
+        "IndiGo to hire 500 pilots as fleet grows",
+        "Airport traffic hits record high",
+        "SpiceJet pilots threaten strike over pay"
+    ])
+    
+    assert index.top_k("IndiGo hiring pilots", 2) == [1, 3]
+    # No shared term: document order
+    assert index.top_k("monsoon", 2) == [0, 1]
+
+
+def test_prefilter_articles_keeps_article_order():
+    articles = [{"title": text} for text in ["Airline stocks rally", "IndiGo pilots", "Air cargo recovers", "IndiGo fleet"]]
+    index = BM25Index([article["title"] for article in articles])
+    
+    assert prefilter_articles(index, articles, "IndiGo", 2) == [articles[1], articles[3]]
+    assert prefilter_articles(index, articles, "IndiGo", 0) == articles
+
+
+def test_default_top_k_keeps_relevant_articles():
+    cases = labelled_cases()
+    
+    assert prefilter_recall(cases, settings.correlation_prefilter_top_k) >= 0.95
+    assert prefilter_recall(cases, settings.claim_prefilter_top_k) >= 0.95
+    # Keeping everything keeps every relevant article
+    assert prefilter_recall(cases, CANDIDATES) == 1.0
+
+
+if __name__ == "__main__":
+    cases = labelled_cases()
+    exact = [case for case in cases if not case["paraphrased"]]
+    paraphrased = [case for case in cases if case["paraphrased"]]
+    print("k    all    exact  paraphrased")
+    for k in (10, 20, 30, 40, 50, 60):
+        print(f"{k:<4} {prefilter_recall(cases, k):.2f}   {prefilter_recall(exact, k):.2f}   {prefilter_recall(paraphrased, k):.2f}")
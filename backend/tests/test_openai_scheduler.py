@@ -0,0 +1,169 @@
+"""OpenAI scheduler against a local fake server: 429 retries, Retry-After, AIMD and slot accounting."""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from openai import OpenAI, RateLimitError
+from src.config.settings import settings
+from src.services.circuit_breaker import CircuitBreaker, CircuitOpenError, get_circuit_breaker
+from src.services.openai_scheduler import OpenAIScheduler
+from src.services.request_context import DeadlineExceeded, start_deadline
+
+COMPLETION = {
+    "id": "chatcmpl-test",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-test",
+    "choices": [{
+        "index": 0,
+        "message": {"role": "assistant", "content": "ok"},
+        "finish_reason": "stop"
+    }]
+}
+
+
+class FakeOpenAIServer:
+    """
+    Chat completions endpoint that answers the first rate_limited requests with 429.
+    
+    Each 429 carries "Retry-After: retry_after". Request arrival times are
+    recorded so tests can check the client waited.
+    """
+    
+    def __init__(self, rate_limited: int, retry_after: float):
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+        self.arrivals = []
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                server.arrivals.append(time.monotonic())
+                if len(server.arrivals) <= server.rate_limited:
+                    body = json.dumps({"error": {"message": "Rate limit reached", "type": "requests"}}).encode()
+                    self.send_response(429)
+                    self.send_header("Retry-After", str(server.retry_after))
+                else:
+                    body = json.dumps(COMPLETION).encode()
+                    self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+    
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+    
+    def __enter__(self):
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(settings, "openai_initial_concurrency", 8)
+    monkeypatch.setattr(settings, "openai_max_retries", 3)
+    monkeypatch.setattr(settings, "openai_retry_base_seconds", 0.01)
+    monkeypatch.setattr(settings, "openai_retry_max_seconds", 5)
+    monkeypatch.setattr(settings, "openai_requests_per_minute", 0)
+    monkeypatch.setattr(settings, "openai_tokens_per_minute", 0)
+    breaker = get_circuit_breaker("openai")
+    monkeypatch.setattr(breaker, "enabled", False)
+    return OpenAIScheduler()
+
+
+def _client(base_url: str) -> OpenAI:
+    return OpenAI(api_key="test", base_url=base_url, max_retries=0)
+
+
+def test_rate_limited_call_is_retried_after_retry_after(scheduler):
+    with FakeOpenAIServer(rate_limited=2, retry_after=0.3) as server:
+        client = _client(server.base_url)
+        response = asyncio.run(scheduler.call(
+            client.chat.completions.create,
+            model="gpt-test",
+            messages=[{"role": "user", "content": "hello"}]
+        ))
+    
+    assert response.choices[0].message.content == "ok"
+    assert len(server.arrivals) == 3
+    gaps = [later - earlier for earlier, later in zip(server.arrivals, server.arrivals[1:])]
+    # Backoff is jittered but never shorter than Retry-After
+    assert all(gap >= 0.3 for gap in gaps)
+    assert scheduler.rate_limited == 2
+    assert scheduler.retries == 2
+    # Two 429s within the cooldown halve the limit once
+    assert int(scheduler.concurrency.limit) == 4
+    assert scheduler.concurrency.in_flight == 0
+
+
+def test_rate_limit_error_is_raised_once_retries_run_out(scheduler, monkeypatch):
+    monkeypatch.setattr(scheduler, "max_retries", 1)
+    with FakeOpenAIServer(rate_limited=5, retry_after=0.05) as server:
+        client = _client(server.base_url)
+        with pytest.raises(RateLimitError):
+            asyncio.run(scheduler.call(
+                client.chat.completions.create,
+                model="gpt-test",
+                messages=[{"role": "user", "content": "hello"}]
+            ))
+    
+    assert len(server.arrivals) == 2
+    assert scheduler.concurrency.in_flight == 0
+
+
+def test_slot_is_held_until_abandoned_request_finishes(scheduler):
+    finished = threading.Event()
+    
+    def slow_request():
+        time.sleep(0.5)
+        finished.set()
+        return "late"
+    
+    async def run():
+        start_deadline(0.1)
+        with pytest.raises(DeadlineExceeded):
+            await scheduler.call(slow_request)
+        # The caller gave up, but the request is still running in its thread
+        assert not finished.is_set()
+        assert scheduler.concurrency.in_flight == 1
+        while scheduler.concurrency.in_flight:
+            await asyncio.sleep(0.05)
+        assert finished.is_set()
+    
+    asyncio.run(run())
+
+
+def test_slow_transcriptions_do_not_open_the_chat_breaker(scheduler):
+    scheduler.breaker = CircuitBreaker("openai", slow_call_seconds=0.05, minimum_calls=2)
+    scheduler.transcription_breaker = CircuitBreaker("whisper", slow_call_seconds=0.05, minimum_calls=2)
+    
+    def slow_transcription():
+        time.sleep(0.1)
+        return "transcript"
+    
+    async def run():
+        for _ in range(2):
+            await scheduler.transcribe(slow_transcription)
+        with pytest.raises(CircuitOpenError):
+            await scheduler.transcribe(slow_transcription)
+        # Chat and embedding calls still go through
+        return await scheduler.call(lambda: "completion")
+    
+    assert asyncio.run(run()) == "completion"
+    assert scheduler.transcription_breaker.state == "open"
+    assert scheduler.breaker.state == "closed"
@@ -0,0 +1,40 @@
+"""Transcript cache fingerprints: re-encoded copies match, silent recordings do not."""
+import numpy as np
+import pytest
+from src.config.settings import settings
+from src.services.audio import resample
+from src.services.transcript_cache import TranscriptCache
+
+SAMPLE_RATE = 16000
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "transcript_fingerprint_enabled", True)
+    return TranscriptCache(str(tmp_path))
+
+
+def _store(cache: TranscriptCache, samples: np.ndarray, text: str) -> None:
+    fingerprint = cache.fingerprint_for((samples, SAMPLE_RATE), "call.wav")
+    cache.put(cache.cache_key(text, "whisper-1", "en"), text, "whisper-1", "en", fingerprint)
+
+
+def test_resampled_copy_matches_by_fingerprint(cache):
+    recording = np.random.default_rng(0).uniform(-0.3, 0.3, 5 * SAMPLE_RATE).astype(np.float32)
+    _store(cache, recording, "the original call")
+    
+    # Same recording, resampled and quieter
+    copy = resample(recording, SAMPLE_RATE, 22050) * 0.5
+    fingerprint = cache.fingerprint_for((copy, 22050), "copy.wav")
+    assert cache.find_by_fingerprint(fingerprint, "whisper-1", "en") == "the original call"
+
+
+def test_silent_recordings_are_not_fingerprinted(cache):
+    silence = np.zeros(5 * SAMPLE_RATE, dtype=np.float32)
+    _store(cache, silence, "a silent call")
+    
+    assert cache.fingerprint_for((silence, SAMPLE_RATE), "other.wav") is None
+    # Mostly silent recordings would match each other too
+    mostly_silent = silence.copy()
+    mostly_silent[-SAMPLE_RATE:] = np.random.default_rng(1).uniform(-0.3, 0.3, SAMPLE_RATE)
+    assert cache.fingerprint_for((mostly_silent, SAMPLE_RATE), "other.wav") is None
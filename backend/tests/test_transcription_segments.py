@@ -0,0 +1,128 @@
+"""Long-recording transcription: splitting, bounded concurrency and stitching, against a fake Whisper client."""
+import asyncio
+import threading
+import time
+import numpy as np
+import pytest
+from src.config.settings import settings
+from src.services.audio import read_wav, write_wav
+from src.services.audio_segmentation import plan_segments, stitch_transcripts
+from src.services.transcription import TranscriptionService
+
+SAMPLE_RATE = 8000
+DURATION_SECONDS = 60
+# The fake "hears" one word every quarter second
+WORD_SECONDS = 0.25
+
+
+class FakeTranscriptions:
+    """
+    Stand-in for client.audio.transcriptions.
+    
+    Each segment is located in the original recording by its first samples,
+    and transcribed as the words spoken between its start and end.
+    """
+    
+    def __init__(self, recording: bytes):
+        self.recording = recording
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.segments = []
+    
+    def create(self, model, file, language, response_format):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            # Give concurrent requests time to overlap
+            time.sleep(0.05)
+            pcm = file[1].read()[44:]
+            start = self.recording.find(pcm[:400]) // 2
+            end = start + len(pcm) // 2
+            with self.lock:
+                self.segments.append((start, end))
+            first = int(np.ceil(start / SAMPLE_RATE / WORD_SECONDS))
+            last = int(np.ceil(end / SAMPLE_RATE / WORD_SECONDS))
+            return " ".join(f"word{i}" for i in range(first, last))
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class FakeClient:
+    def __init__(self, recording: bytes):
+        self.audio = type("Audio", (), {"transcriptions": FakeTranscriptions(recording)})()
+
+
+@pytest.fixture
+def chunked_settings(monkeypatch):
+    monkeypatch.setattr(settings, "transcript_cache_enabled", False)
+    monkeypatch.setattr(settings, "audio_preprocessing_enabled", False)
+    monkeypatch.setattr(settings, "transcription_chunking_enabled", True)
+    monkeypatch.setattr(settings, "transcription_chunk_min_duration_seconds", 10)
+    monkeypatch.setattr(settings, "transcription_chunk_seconds", 8)
+    monkeypatch.setattr(settings, "transcription_chunk_overlap_seconds", 2)
+    monkeypatch.setattr(settings, "transcription_max_concurrency", 3)
+
+
+def _noise(seconds: float) -> np.ndarray:
+    return (np.random.default_rng(0).uniform(-0.5, 0.5, int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def test_plan_segments_covers_recording_with_overlap():
+    samples = _noise(DURATION_SECONDS)
+    bounds = plan_segments(samples, SAMPLE_RATE, max_segment_seconds=8, overlap_seconds=2)
+    
+    assert bounds[0][0] == 0
+    assert bounds[-1][1] == len(samples)
+    for (start, end), (next_start, _) in zip(bounds, bounds[1:]):
+        assert end - start <= 8 * SAMPLE_RATE
+        assert next_start == end - 2 * SAMPLE_RATE
+
+
+def test_plan_segments_cuts_at_silence():
+    samples = _noise(20)
+    # A quiet stretch inside the search window of the first cut
+    samples[6 * SAMPLE_RATE:int(6.5 * SAMPLE_RATE)] = 0
+    bounds = plan_segments(samples, SAMPLE_RATE, max_segment_seconds=8, overlap_seconds=2)
+    
+    assert 6 * SAMPLE_RATE <= bounds[0][1] <= int(6.5 * SAMPLE_RATE)
+
+
+def test_short_recording_is_one_segment():
+    samples = _noise(5)
+    assert plan_segments(samples, SAMPLE_RATE, max_segment_seconds=8, overlap_seconds=2) == [(0, len(samples))]
+
+
+def test_stitch_transcripts_drops_overlap_and_partial_words():
+    texts = [
+        "the flight was delayed by two hours",
+        "two hours. Passengers were rebooked",
+        "ooked were rebooked on the evening service"
+    ]
+    # Case and punctuation are ignored; a partial word cut at the boundary is skipped
+    assert stitch_transcripts(texts) == (
+        "the flight was delayed by two hours Passengers were rebooked on the evening service"
+    )
+
+
+def test_long_recording_is_split_transcribed_concurrently_and_stitched(chunked_settings):
+    samples = _noise(DURATION_SECONDS)
+    recording = write_wav(samples, SAMPLE_RATE)
+    # Segments are re-encoded from the decoded samples; locate them in the re-encoded whole
+    client = FakeClient(write_wav(read_wav(recording)[0], SAMPLE_RATE)[44:])
+    service = TranscriptionService(client=client)
+    
+    result = asyncio.run(service.transcribe_with_metadata(recording, "call.wav"))
+    
+    fake = client.audio.transcriptions
+    expected_words = int(DURATION_SECONDS / WORD_SECONDS)
+    assert result["segments"] == len(fake.segments) > 1
+    assert result["text"] == " ".join(f"word{i}" for i in range(expected_words))
+    assert 1 < fake.max_active <= settings.transcription_max_concurrency
+    
+    segments = sorted(fake.segments)
+    assert segments[0][0] == 0 and segments[-1][1] == len(samples)
+    # Consecutive segments share the configured overlap
+    assert all(start < previous_end for (_, previous_end), (start, _) in zip(segments, segments[1:]))
@@ -1,18 +1,20 @@
 export async function GET(request) {
+  const backendUrl = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000'
+
   try {
-    // Get user from query params or headers (if available)
+    // Forward pagination and filters (limit, cursor, airline, severity, since, until)
     const url = new URL(request.url)
-    const userEmail = url.searchParams.get('user') || null
+    const response = await fetch(`${backendUrl}/api/alerts${url.search}`, { cache: 'no-store' })
 
-    // Note: In a real app, you'd get this from session/auth
-    // For now, we'll generate alerts from all recordings
-    // In production, filter by authenticated user
+    const data = await response.json().catch(() => ({ error: 'Unknown error' }))
+    if (!response.ok) {
+      return Response.json(
+        { error: data.detail || data.error || 'Failed to fetch alerts' },
+        { status: response.status }
+      )
+    }
 
-    // Since this is a server-side route, we can't access localStorage directly
-    // Return empty array - alerts will be generated client-side from recordings
-    // Or you could implement a backend API endpoint for alerts
-    
-    return Response.json([])
+    return Response.json(data)
   } catch (error) {
     console.error('Alerts error:', error)
     return Response.json(
@@ -21,5 +23,3 @@ export async function GET(request) {
     )
   }
 }
-
-
@@ -1,10 +1,20 @@
-export async function GET() {
+export async function GET(request) {
+  const backendUrl = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000'
+
   try {
-    // Note: Server-side routes can't access localStorage
-    // Return empty array - insights are loaded client-side from localStorage
-    // In production, you'd fetch from a backend database
-    
-    return Response.json([])
+    // Forward pagination and filters (limit, cursor, airline, theme, sentiment, since, until)
+    const url = new URL(request.url)
+    const response = await fetch(`${backendUrl}/api/insights${url.search}`, { cache: 'no-store' })
+
+    const data = await response.json().catch(() => ({ error: 'Unknown error' }))
+    if (!response.ok) {
+      return Response.json(
+        { error: data.detail || data.error || 'Failed to fetch insights' },
+        { status: response.status }
+      )
+    }
+
+    return Response.json(data)
   } catch (error) {
     console.error('Insights error:', error)
     return Response.json(
@@ -13,5 +23,3 @@ export async function GET() {
     )
   }
 }
-
-